@@ -0,0 +1,39 @@
+"""
+ASGI config for Task API project.
+
+Exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django, WebSocket connections (/ws/...) to Channels consumers.
+Run it with an ASGI server, e.g. gunicorn with uvicorn workers
+(see compose/production/django/start and start-websocket), together with
+API_ASYNC_VIEWS=True to serve the read endpoints by async views.
+
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+# This allows easy placement of apps within the interior
+# task_api directory.
+ROOT_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(ROOT_DIR / "task_api"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+# Django должен быть настроен до импорта потребителей и моделей
+django_application = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+
+from task_api.authentication.middleware import JWTAuthMiddleware  # noqa: E402
+from task_api.tasks.routing import websocket_urlpatterns  # noqa: E402
+
+# Проверка Origin не нужна: соединение аутентифицируется токеном, а не cookie,
+# поэтому чужая страница не может открыть его от имени пользователя
+application = ProtocolTypeRouter(
+    {
+        "http": django_application,
+        "websocket": JWTAuthMiddleware(URLRouter(websocket_urlpatterns)),
+    }
+)
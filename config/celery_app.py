@@ -9,9 +9,22 @@
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
+# из двух рассылок напоминаний работает выбранная в TASK_REMINDER_MODE, другая сразу завершается
 app.conf.beat_schedule = {
+    "send-due-reminders": {
+        "task": "task_api.tasks.tasks.send_due_reminders",
+        "schedule": crontab(),
+    },
     "send-deadline-reminders": {
         "task": "task_api.tasks.tasks.send_deadline_reminders",
         "schedule": crontab(hour=9, minute=0),
     },
+    "reconcile-task-stats": {
+        "task": "task_api.tasks.tasks.reconcile_task_stats",
+        "schedule": crontab(minute=0),
+    },
+    "purge-task-tombstones": {
+        "task": "task_api.tasks.tasks.purge_task_tombstones",
+        "schedule": crontab(hour=3, minute=30),
+    },
 }
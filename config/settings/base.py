@@ -25,6 +25,7 @@
 
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 DJANGO_APPS = [
     "django.contrib.auth",
@@ -43,6 +44,7 @@
     "django_filters",
     "drf_spectacular",
     "django_celery_beat",
+    "channels",
 ]
 
 LOCAL_APPS = [
@@ -155,8 +157,26 @@
 CELERY_WORKER_SEND_TASK_EVENTS = True
 CELERY_TASK_SEND_SENT_EVENT = True
 
+# orjson вместо стандартного json для ответов и тел запросов API
+API_ORJSON_ENABLED = env.bool("API_ORJSON_ENABLED", default=True)
+if API_ORJSON_ENABLED:
+    API_JSON_RENDERER = "task_api.utils.renderers.ORJSONRenderer"
+    API_JSON_PARSER = "task_api.utils.parsers.ORJSONParser"
+else:
+    API_JSON_RENDERER = "rest_framework.renderers.JSONRenderer"
+    API_JSON_PARSER = "rest_framework.parsers.JSONParser"
+
+# асинхронные представления чтения задач и поиска пользователей (для запуска под ASGI)
+API_ASYNC_VIEWS = env.bool("API_ASYNC_VIEWS", default=False)
+
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_RENDERER_CLASSES": (API_JSON_RENDERER, "rest_framework.renderers.BrowsableAPIRenderer"),
+    "DEFAULT_PARSER_CLASSES": (
+        API_JSON_PARSER,
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("task_api.authentication.backends.AsyncJWTAuthentication",),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -168,6 +188,59 @@
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
+# Подсчет количества в CountingPageNumberPagination
+PAGINATION_COUNT_CAP = env.int("PAGINATION_COUNT_CAP", default=1000)
+PAGINATION_COUNT_CACHE_TIMEOUT = env.int("PAGINATION_COUNT_CACHE_TIMEOUT", default=300)
+# оценка планировщика меньше порога заменяется точным COUNT
+PAGINATION_ESTIMATE_THRESHOLD = env.int("PAGINATION_ESTIMATE_THRESHOLD", default=10000)
+
+USER_SEARCH_MIN_LENGTH = env.int("USER_SEARCH_MIN_LENGTH", default=3)
+USER_SEARCH_MAX_RESULTS = env.int("USER_SEARCH_MAX_RESULTS", default=20)
+USER_SEARCH_CACHE_TIMEOUT = env.int("USER_SEARCH_CACHE_TIMEOUT", default=30)
+
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "CONFIG": {"hosts": [env("REDIS_URL")]},
+    }
+}
+# события изменений задач через WebSocket (/ws/tasks/)
+TASK_EVENTS_ENABLED = env.bool("TASK_EVENTS_ENABLED", default=True)
+TASK_EVENTS_FLUSH_DELAY = env.float("TASK_EVENTS_FLUSH_DELAY", default=0.5)
+TASK_EVENTS_MAX_BATCH = env.int("TASK_EVENTS_MAX_BATCH", default=500)
+
+TASK_LIST_CACHE_ENABLED = env.bool("TASK_LIST_CACHE_ENABLED", default=True)
+TASK_LIST_CACHE_TIMEOUT = env.int("TASK_LIST_CACHE_TIMEOUT", default=60)
+TASK_BULK_MAX_ITEMS = env.int("TASK_BULK_MAX_ITEMS", default=1000)
+TASK_SHARE_MAX_PAIRS = env.int("TASK_SHARE_MAX_PAIRS", default=10000)
+TASK_EXPORT_CHUNK_SIZE = env.int("TASK_EXPORT_CHUNK_SIZE", default=2000)
+TASK_IMPORT_BATCH_SIZE = env.int("TASK_IMPORT_BATCH_SIZE", default=1000)
+TASK_IMPORT_MAX_BATCH_SIZE = env.int("TASK_IMPORT_MAX_BATCH_SIZE", default=10000)
+TASK_IMPORT_MAX_ERRORS = env.int("TASK_IMPORT_MAX_ERRORS", default=100)
+# напоминания о сроках: per_task — по каждой задаче за TASK_REMINDER_OFFSETS до срока (раз в минуту),
+# digest — одно письмо владельцу о задачах со сроком завтра (раз в день)
+TASK_REMINDER_MODE = env.str("TASK_REMINDER_MODE", default="per_task")
+# размер порции чтения задач и задержка первого повтора письма, с
+TASK_REMINDER_CHUNK_SIZE = env.int("TASK_REMINDER_CHUNK_SIZE", default=2000)
+TASK_REMINDER_RETRY_DELAY = env.int("TASK_REMINDER_RETRY_DELAY", default=60)
+# рассылка делится на части по диапазонам владельцев, у каждой части свой лимит времени, с
+TASK_REMINDER_SHARD_SIZE = env.int("TASK_REMINDER_SHARD_SIZE", default=500)
+TASK_REMINDER_SHARD_SOFT_TIME_LIMIT = env.int("TASK_REMINDER_SHARD_SOFT_TIME_LIMIT", default=4 * 60)
+TASK_REMINDER_SHARD_TIME_LIMIT = env.int("TASK_REMINDER_SHARD_TIME_LIMIT", default=5 * 60)
+# напоминания по каждой задаче: за сколько минут до срока, размер пачки и время одного прохода очереди, с
+TASK_REMINDER_OFFSETS = [
+    timedelta(minutes=minutes)
+    for minutes in env.list("TASK_REMINDER_OFFSETS_MINUTES", cast=int, default=[7 * 24 * 60, 24 * 60, 60])
+]
+TASK_REMINDER_BATCH_SIZE = env.int("TASK_REMINDER_BATCH_SIZE", default=100)
+TASK_REMINDER_DRAIN_TIME = env.int("TASK_REMINDER_DRAIN_TIME", default=45)
+# пауза перед повтором напоминания удваивается с каждой неудачей; после стольких попыток
+# напоминание пропускается и записывается в журнал TaskReminderDelivery
+TASK_REMINDER_MAX_ATTEMPTS = env.int("TASK_REMINDER_MAX_ATTEMPTS", default=5)
+# дельта-синхронизация (/api/tasks/sync/): срок жизни токена и следов удалений, размер порции
+TASK_SYNC_TOKEN_MAX_AGE = timedelta(days=env.int("TASK_SYNC_TOKEN_MAX_AGE_DAYS", default=30))
+TASK_SYNC_PAGE_SIZE = env.int("TASK_SYNC_PAGE_SIZE", default=500)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=env.int("JWT_ACCESS_TOKEN_LIFETIME", default=60)),
     "REFRESH_TOKEN_LIFETIME": timedelta(minutes=env.int("JWT_REFRESH_TOKEN_LIFETIME", default=1440)),
@@ -14,7 +14,9 @@
 SECRET_KEY = env("DJANGO_SECRET_KEY")
 ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["akarpov.ru"])
 
-DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+# под ASGI каждый запрос выполняет синхронный код в своем потоке, и постоянные соединения
+# не переиспользуются, а копятся до исчерпания max_connections; нужен внешний пул (pgbouncer)
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=0 if API_ASYNC_VIEWS else 60)  # noqa: F405
 
 CACHES = {
     "default": {
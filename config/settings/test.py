@@ -25,6 +25,13 @@
     }
 }
 
+CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+# Поколения сбрасываются в on_commit, который не выполняется внутри тестовой транзакции;
+# тесты кэша включают его сами
+TASK_LIST_CACHE_ENABLED = False
+PAGINATION_COUNT_CACHE_TIMEOUT = 0
+
 # Use in-memory SQLite for tests (much faster and isolated)
 DATABASES = {
     "default": {
@@ -5,3 +5,6 @@ class AuthConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "task_api.authentication"
     verbose_name = "Аутентификация"
+
+    def ready(self):
+        from task_api.authentication import schema  # noqa: F401
@@ -0,0 +1,47 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from task_api.authentication.backends import AsyncJWTAuthentication
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Аутентификация WebSocket-соединений access-токеном SimpleJWT.
+
+    Токен берется из заголовка Authorization, а если его нет — из параметра `?token=`:
+    браузерный WebSocket не умеет передавать заголовки. Без токена или с неверным
+    токеном в `scope["user"]` попадает AnonymousUser.
+    """
+
+    token_query_param = "token"
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.backend = AsyncJWTAuthentication()
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope, user=await self.authenticate(scope))
+        return await super().__call__(scope, receive, send)
+
+    async def authenticate(self, scope):
+        raw_token = self.get_raw_token(scope)
+        if raw_token is None:
+            return AnonymousUser()
+        try:
+            validated_token = self.backend.get_validated_token(raw_token)
+            # вне HTTP-запроса Django не закрывает соединения с БД сам, это делает database_sync_to_async
+            return await database_sync_to_async(self.backend.get_user)(validated_token)
+        except (AuthenticationFailed, InvalidToken, TokenError):
+            return AnonymousUser()
+
+    def get_raw_token(self, scope):
+        header = dict(scope.get("headers", ())).get(b"authorization")
+        if header is not None:
+            return self.backend.get_raw_token(header)
+        values = parse_qs(scope.get("query_string", b"").decode()).get(self.token_query_param)
+        return values[0].encode() if values else None
@@ -0,0 +1,6 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class AsyncJWTScheme(SimpleJWTScheme):
+    # расширение simplejwt в drf-spectacular не распространяется на подклассы
+    target_class = "task_api.authentication.backends.AsyncJWTAuthentication"
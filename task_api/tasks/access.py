@@ -0,0 +1,166 @@
+import operator
+from collections import defaultdict
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+
+from task_api.tasks import sync
+from task_api.tasks.models import Task, TaskAccess, TaskShare
+from task_api.utils.iterables import chunked
+
+
+def _sort_values(task):
+    return {field: getattr(task, field) for field in TaskAccess.SORT_FIELDS}
+
+
+def _upsert(rows, update_fields):
+    TaskAccess.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["user", "task"],
+        update_fields=[*update_fields, "seq"],
+    )
+
+
+def owner_access(task, seq):
+    return TaskAccess(
+        user_id=task.owner_id, task_id=task.pk, level=TaskAccess.Level.OWNER, seq=seq, **_sort_values(task)
+    )
+
+
+def share_access(share, seq, task=None):
+    task = task or share.task
+    return TaskAccess(user_id=share.user_id, task_id=task.pk, level=share.permission, seq=seq, **_sort_values(task))
+
+
+@transaction.atomic
+def create_task_access(tasks):
+    seq = sync.change_seq()
+    TaskAccess.objects.bulk_create([owner_access(task, seq) for task in tasks])
+
+
+@transaction.atomic
+def sync_task_access(tasks):
+    """Обновляет копии полей сортировки и строку владельца после изменения задач."""
+    tasks = list(tasks)
+    if not tasks:
+        return
+
+    seq = sync.change_seq()
+    task_ids = [task.pk for task in tasks]
+    source = Task.objects.filter(pk=OuterRef("task_id"))
+    TaskAccess.objects.filter(task_id__in=task_ids).update(
+        seq=seq, **{field: Subquery(source.values(field)[:1]) for field in TaskAccess.SORT_FIELDS}
+    )
+    former_owners = TaskAccess.objects.filter(task_id__in=task_ids, level=TaskAccess.Level.OWNER).exclude(
+        user_id=F("task__owner_id")
+    )
+    sync.add_tombstones(former_owners.values_list("user_id", "task_id"), seq)
+    former_owners.delete()
+    _upsert([owner_access(task, seq) for task in tasks], ["level", *TaskAccess.SORT_FIELDS])
+
+
+@transaction.atomic
+def touch_task_access(task_ids):
+    """Отмечает задачи измененными для всех, кто их видит, без изменения самих строк доступа."""
+    TaskAccess.objects.filter(task_id__in=task_ids).update(seq=sync.change_seq())
+
+
+@transaction.atomic
+def grant_share_access(shares):
+    shares = [share for share in shares if share.user_id != share.task.owner_id]
+    if shares:
+        seq = sync.change_seq()
+        _upsert([share_access(share, seq) for share in shares], ["level"])
+
+
+@transaction.atomic
+def revoke_share_access(shares):
+    shares = [share for share in shares if share.user_id != share.task.owner_id]
+    if shares:
+        sync.add_tombstones((share.user_id, share.task_id) for share in shares)
+        pairs = [Q(task_id=share.task_id, user_id=share.user_id) for share in shares]
+        TaskAccess.objects.filter(reduce(operator.or_, pairs)).exclude(level=TaskAccess.Level.OWNER).delete()
+
+
+def task_audience(tasks):
+    """Задачи, которые видит каждый пользователь: {user_id: [task_id, ...]} по строкам доступа и владельцам."""
+    tasks = list(tasks)
+    audience = defaultdict(set)
+    for user_id, task_id in TaskAccess.objects.filter(task__in=tasks).values_list("user_id", "task_id"):
+        audience[user_id].add(task_id)
+    for task in tasks:
+        audience[task.owner_id].add(task.pk)
+    return {user_id: sorted(task_ids) for user_id, task_ids in audience.items()}
+
+
+def missing_access():
+    """Задачи и расшаривания, для которых нет корректной строки доступа."""
+    owners = Task.objects.filter(
+        ~Exists(TaskAccess.objects.filter(task=OuterRef("pk"), user=OuterRef("owner"), level=TaskAccess.Level.OWNER))
+    )
+    shares = (
+        TaskShare.objects.exclude(user=F("task__owner"))
+        .filter(
+            ~Exists(
+                TaskAccess.objects.filter(task=OuterRef("task"), user=OuterRef("user"), level=OuterRef("permission"))
+            )
+        )
+        .select_related("task")
+    )
+    return owners, shares
+
+
+def stale_access():
+    """Строки доступа без владельца/расшаривания или с устаревшими копиями полей."""
+    orphaned = Q(level=TaskAccess.Level.OWNER) & ~Q(user=F("task__owner"))
+    orphaned |= ~Q(level=TaskAccess.Level.OWNER) & ~Exists(
+        TaskShare.objects.filter(task=OuterRef("task"), user=OuterRef("user"))
+    )
+    outdated = (
+        ~Q(status=F("task__status"))
+        | ~Q(priority=F("task__priority"))
+        | ~Q(status_rank=F("task__status_rank"))
+        | ~Q(priority_rank=F("task__priority_rank"))
+        | ~Q(created_at=F("task__created_at"))
+        | Q(deadline__isnull=True, task__deadline__isnull=False)
+        | Q(deadline__isnull=False, task__deadline__isnull=True)
+        | ~Q(deadline=F("task__deadline"))
+    )
+    return TaskAccess.objects.filter(orphaned), TaskAccess.objects.filter(outdated & ~orphaned)
+
+
+def check_task_access():
+    owners, shares = missing_access()
+    orphaned, outdated = stale_access()
+    return {
+        "missing_owner": owners.count(),
+        "missing_share": shares.count(),
+        "orphaned": orphaned.count(),
+        "outdated": outdated.count(),
+    }
+
+
+def rebuild_task_access(batch_size=1000):
+    """Доводит таблицу до согласованного состояния, не блокируя ее целиком."""
+    stats = check_task_access()
+    owners, shares = missing_access()
+    orphaned, outdated = stale_access()
+
+    for batch in chunked(owners.iterator(chunk_size=batch_size), batch_size):
+        with transaction.atomic():
+            seq = sync.change_seq()
+            _upsert([owner_access(task, seq) for task in batch], ["level", *TaskAccess.SORT_FIELDS])
+    for batch in chunked(shares.iterator(chunk_size=batch_size), batch_size):
+        with transaction.atomic():
+            seq = sync.change_seq()
+            _upsert([share_access(share, seq) for share in batch], ["level"])
+
+    with transaction.atomic():
+        sync.add_tombstones(orphaned.values_list("user_id", "task_id"))
+        orphaned.delete()
+    task_ids = outdated.values_list("task_id", flat=True).distinct()
+    for batch in chunked(task_ids.iterator(chunk_size=batch_size), batch_size):
+        sync_task_access(Task.objects.filter(pk__in=batch))
+    return stats
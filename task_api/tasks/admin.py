@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Task, TaskShare
+from task_api.utils.pagination import EstimatedCountPaginator
+
+from .models import Task, TaskImport, TaskShare
 
 
 class TaskShareInline(admin.TabularInline):
@@ -11,6 +13,9 @@ class TaskShareInline(admin.TabularInline):
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
+    # на больших таблицах количество — оценка планировщика, без второго COUNT по всей таблице
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = ["title", "owner", "status", "priority", "deadline", "created_at", "is_overdue"]
     list_filter = ["status", "priority", "created_at", "deadline"]
     search_fields = ["title", "description", "owner__email"]
@@ -28,11 +33,15 @@ class TaskAdmin(admin.ModelAdmin):
         ("Даты", {"fields": ("created_at", "updated_at")}),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_overdue()
+
     def is_overdue(self, obj):
         return obj.is_overdue
 
     is_overdue.boolean = True
     is_overdue.short_description = "Просрочена"
+    is_overdue.admin_order_field = "is_overdue"
 
 
 @admin.register(TaskShare)
@@ -42,3 +51,12 @@ class TaskShareAdmin(admin.ModelAdmin):
     search_fields = ["task__title", "user__email"]
     autocomplete_fields = ["task", "user"]
     date_hierarchy = "created_at"
+
+
+@admin.register(TaskImport)
+class TaskImportAdmin(admin.ModelAdmin):
+    list_display = ["id", "owner", "format", "status", "processed_rows", "created_count", "error_count", "created_at"]
+    list_filter = ["status", "format", "created_at"]
+    search_fields = ["owner__email"]
+    autocomplete_fields = ["owner"]
+    readonly_fields = ["processed_rows", "created_count", "error_count", "errors", "created_at", "updated_at"]
@@ -0,0 +1,96 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from task_api.tasks.models import Task, TaskAccess
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "Задача была изменена после получения. Загрузите ее заново"
+    default_code = "precondition_failed"
+
+
+def _etag(*parts):
+    return quote_etag(hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()[:32])
+
+
+def task_etag(task):
+    # updated_at меняется и при расшаривании (см. counters.adjust_shares_count),
+    # is_overdue — единственное поле ответа, которое меняется само со временем
+    return _etag(task.pk, task.updated_at.isoformat(), task.is_overdue)
+
+
+def task_last_modified(task):
+    if task.is_overdue:
+        return max(task.updated_at, task.deadline)
+    return task.updated_at
+
+
+def task_list_etag(user):
+    """
+    Версия списка задач пользователя одним запросом по его строкам TaskAccess.
+
+    Новая задача или новый доступ увеличивают max(id), изменение задачи — max(updated_at),
+    удаление или отзыв доступа — количество, наступивший дедлайн — число просроченных.
+    """
+    version = TaskAccess.objects.filter(user=user).aggregate(**_list_version())
+    return _etag(user.pk, *version.values())
+
+
+async def atask_list_etag(user):
+    version = await TaskAccess.objects.filter(user=user).aaggregate(**_list_version())
+    return _etag(user.pk, *version.values())
+
+
+def _list_version():
+    return {
+        "count": Count("pk"),
+        "last_access": Max("pk"),
+        "last_update": Max("task__updated_at"),
+        "overdue": Count("pk", filter=Task.overdue_q()),
+    }
+
+
+def claim_task_version(task):
+    """
+    Сравнение с заменой вместо блокировки строки: UPDATE пройдет, только если задачу
+    не изменили после чтения, а конкурентный запрос дождется фиксации и получит 0 строк.
+    """
+    claimed = Task.objects.filter(pk=task.pk, updated_at=task.updated_at).update(updated_at=timezone.now())
+    if not claimed:
+        raise PreconditionFailed()
+
+
+# ответ 304 по ETag/Last-Modified до сериализации и проверка If-Match для изменений;
+# без docstring, иначе drf-spectacular подставит его в описание операций
+class ConditionalRequestMixin:
+    def not_modified_response(self, etag, last_modified=None):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def check_if_match(self, etag):
+        """Возвращает True, если клиент передал конкретную версию и ее нужно закрепить."""
+        if_match = self.request.headers.get("If-Match")
+        if if_match is None:
+            return False
+        etags = parse_etags(if_match)
+        if "*" in etags:
+            return False
+        if etag not in etags:
+            raise PreconditionFailed()
+        return True
+
+    def set_validators(self, response, etag, last_modified=None):
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
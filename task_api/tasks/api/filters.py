@@ -1,9 +1,28 @@
-from django.utils import timezone
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
 from django_filters import rest_framework as filters
+from rest_framework.fields import BooleanField
+from rest_framework.filters import OrderingFilter, SearchFilter
 
 from task_api.tasks.models import Task
 
 
+def with_copied_fields(queryset):
+    """
+    После visible_to условия по задаче читают копии полей из строки доступа
+    пользователя, чтобы работали индексы TaskAccess (user, ...). Возвращает запрос
+    и префикс имен полей.
+    """
+    if "viewer_access" in queryset.query._filtered_relations:
+        return queryset.with_access_fields(), "access_"
+    return queryset, ""
+
+
 class TaskFilter(filters.FilterSet):
     status = filters.MultipleChoiceFilter(choices=Task.Status.choices)
     priority = filters.MultipleChoiceFilter(choices=Task.Priority.choices)
@@ -16,6 +35,99 @@ class Meta:
         fields = ["status", "priority", "deadline_after", "deadline_before"]
 
     def filter_overdue(self, queryset, name, value):
-        if value:
-            return queryset.filter(deadline__lt=timezone.now()).exclude(status=Task.Status.DONE)
-        return queryset.exclude(deadline__lt=timezone.now(), status__in=[Task.Status.NEW, Task.Status.IN_PROGRESS])
+        # true читается частичным индексом *_open_dl_idx, false — объединением индексов по сроку и статусу
+        queryset, prefix = with_copied_fields(queryset)
+        return queryset.overdue(value, prefix=prefix)
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    Сортировка по копиям полей из `view.ordering_paths` (например, из TaskAccess)
+    с добавлением `id` для однозначного порядка.
+    """
+
+    tiebreaker = "id"
+    rank_field = "rank"
+    overdue_field = "is_overdue"
+
+    def get_ordering(self, request, queryset, view):
+        # `rank` — сначала самые релевантные, поэтому направление обратное обычному
+        ordering = super().get_ordering(request, queryset, view) or []
+        return [self._flip_rank(term) for term in ordering]
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid = super().remove_invalid_fields(queryset, fields, view, request)
+        if self.rank_field not in queryset.query.annotations:
+            valid = [term for term in valid if term.lstrip("-") != self.rank_field]
+        return valid
+
+    def _flip_rank(self, term):
+        if term.lstrip("-") != self.rank_field:
+            return term
+        return self.rank_field if term.startswith("-") else "-" + self.rank_field
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+
+        paths = getattr(view, "ordering_paths", {})
+        fields = [term.lstrip("-") for term in ordering]
+        if self.overdue_field in fields and self.overdue_field not in queryset.query.annotations:
+            queryset, prefix = with_copied_fields(queryset)
+            queryset = queryset.with_overdue(prefix=prefix)
+        if self.tiebreaker not in fields:
+            ordering = [*ordering, ("-" if ordering[-1].startswith("-") else "") + self.tiebreaker]
+            fields.append(self.tiebreaker)
+        return queryset.order_by(
+            *(term[: len(term) - len(field)] + paths.get(field, field) for term, field in zip(ordering, fields))
+        )
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    Полнотекстовый поиск по `Task.search_vector` (GIN-индекс) с ранжированием.
+
+    Ищет одновременно в конфигурациях `view.search_configs`; с `?highlight=true`
+    добавляет фрагмент описания с подсветкой. На других СУБД (SQLite в тестах)
+    работает как обычный `SearchFilter` по `search_fields`.
+    """
+
+    highlight_param = "highlight"
+    rank_field = "rank"
+    snippet_field = "search_snippet"
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        terms = " ".join(self.get_search_terms(request))
+        if not terms:
+            return queryset
+
+        configs = getattr(view, "search_configs", ["russian", "english"])
+        query = reduce(
+            operator.or_,
+            (SearchQuery(terms, config=config, search_type="websearch") for config in configs),
+        )
+        # ts_rank возвращает real; double precision переживает круговой путь через курсор без потерь
+        queryset = queryset.filter(search_vector=query).annotate(
+            **{self.rank_field: Cast(SearchRank(F("search_vector"), query), FloatField())}
+        )
+        if self.wants_highlight(request):
+            queryset = queryset.annotate(
+                **{
+                    self.snippet_field: SearchHeadline(
+                        "description",
+                        query,
+                        config=configs[0],
+                        start_sel="<mark>",
+                        stop_sel="</mark>",
+                        max_fragments=2,
+                    )
+                }
+            )
+        return queryset
+
+    def wants_highlight(self, request):
+        return request.query_params.get(self.highlight_param, "").lower() in BooleanField.TRUE_VALUES
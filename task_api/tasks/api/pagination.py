@@ -0,0 +1,255 @@
+import base64
+import binascii
+import json
+import operator
+from datetime import datetime
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from task_api.utils.async_views import afetch
+from task_api.utils.pagination import CountingPageNumberPagination
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по набору ключей (keyset/seek).
+
+    В отличие от `CursorPagination` из DRF позиция курсора хранит значения
+    всех полей сортировки вместе с `id`, поэтому страница выбирается условием
+    `(field, id) > (value, id)` без OFFSET и без подсчета общего количества.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    tiebreaker = "id"
+    invalid_cursor_message = "Некорректный курсор"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(await afetch(self.page_queryset(queryset, request, view)))
+
+    def page_queryset(self, queryset, request, view):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.paths = self.get_ordering_paths(view)
+        self.keys = self.get_ordering_keys(view)
+        self.reverse, self.position = self.decode_cursor(request)
+
+        terms = [(field, descending != self.reverse) for field, descending in self.ordering]
+        queryset = queryset.order_by(*(self._order_expression(field, descending) for field, descending in terms))
+        if self.position is not None:
+            queryset = queryset.filter(self._following(terms, self.position))
+        # лишняя строка показывает, есть ли следующая страница
+        return queryset[: self.page_size + 1]
+
+    def finish_page(self, results):
+        page = results[: self.page_size]
+        has_more = len(results) > len(page)
+
+        if self.reverse:
+            page.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Курсор страницы. Пустое значение включает курсорную пагинацию без подсчета количества",
+                "schema": {"type": "string"},
+            }
+        ]
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(getattr(view, "ordering", None) or ["-" + self.tiebreaker])
+        for backend in getattr(view, "filter_backends", []):
+            if hasattr(backend, "get_ordering"):
+                ordering = list(backend().get_ordering(request, queryset, view) or ordering)
+                break
+
+        terms = [(term.lstrip("-"), term.startswith("-")) for term in ordering]
+        if all(field != self.tiebreaker for field, _ in terms):
+            terms.append((self.tiebreaker, terms[-1][1]))
+        return terms
+
+    def get_ordering_paths(self, view):
+        return getattr(view, "ordering_paths", {})
+
+    def get_ordering_keys(self, view):
+        # поле строки или модели, значение которого сравнивается при сортировке по полю API
+        return getattr(view, "ordering_keys", {})
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._instance_position(self.page[-1]) if self.page else self.position
+        return self.encode_cursor(position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._instance_position(self.page[0]) if self.page else self.position
+        return self.encode_cursor(position, reverse=True)
+
+    def encode_cursor(self, position, *, reverse):
+        payload = json.dumps(
+            {"p": [self._dump_value(value) for value in position], "r": int(reverse)},
+            separators=(",", ":"),
+        )
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return False, None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+            raw_position = payload["p"]
+            reverse = bool(payload["r"])
+            if len(raw_position) != len(self.ordering):
+                raise ValueError
+            position = [self._load_value(field, value) for (field, _), value in zip(self.ordering, raw_position)]
+        except (binascii.Error, KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message) from None
+        return reverse, position
+
+    def _instance_position(self, instance):
+        # строки values() из быстрого пути сериализации приходят словарями
+        if isinstance(instance, dict):
+            return [instance[self._key(field)] for field, _ in self.ordering]
+        return [getattr(instance, self._key(field)) for field, _ in self.ordering]
+
+    def _path(self, field):
+        return self.paths.get(field, field)
+
+    def _key(self, field):
+        return self.keys.get(field, field)
+
+    def _model_field(self, field):
+        try:
+            return self.model._meta.get_field(self._key(field))
+        except FieldDoesNotExist:
+            return None
+
+    def _order_expression(self, field, descending):
+        expression = F(self._path(field))
+        if descending:
+            return expression.desc(nulls_first=True)
+        return expression.asc(nulls_last=True)
+
+    def _following(self, terms, position):
+        conditions = []
+        equal = Q()
+        for (field, descending), value in zip(terms, position):
+            path = self._path(field)
+            beyond = self._beyond(field, path, descending, value)
+            if beyond is not None:
+                conditions.append(equal & beyond)
+            equal &= Q(**{f"{path}__isnull": True}) if value is None else Q(**{path: value})
+        if not conditions:
+            return Q(pk__in=[])
+        return reduce(operator.or_, conditions)
+
+    def _beyond(self, field, path, descending, value):
+        # NULL считается больше любого значения: в конце при ASC и в начале при DESC,
+        # как в btree-индексах PostgreSQL по умолчанию
+        model_field = self._model_field(field)
+        nullable = model_field is None or model_field.null
+        if descending:
+            if value is None:
+                return Q(**{f"{path}__isnull": False})
+            return Q(**{f"{path}__lt": value})
+        if value is None:
+            return None
+        condition = Q(**{f"{path}__gt": value})
+        if nullable:
+            condition |= Q(**{f"{path}__isnull": True})
+        return condition
+
+    def _dump_value(self, value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def _load_value(self, field, value):
+        model_field = self._model_field(field)
+        if value is None or model_field is None:
+            return value
+        return model_field.to_python(value)
+
+
+class PageNumberOrKeysetPagination(CountingPageNumberPagination):
+    """
+    Постраничная пагинация по умолчанию и курсорная по запросу (`?cursor=`).
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def use_keyset(self, request):
+        self.keyset = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            self.keyset.page_size = self.page_size
+        return self.keyset is not None
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            *self.keyset_pagination_class().get_schema_operation_parameters(view),
+        ]
@@ -1,17 +1,24 @@
 from rest_framework import permissions
 
+from task_api.tasks.models import TaskAccess
+
+
+def get_access_level(user, obj):
+    # уровень аннотирован в запросе задачи (TaskQuerySet.with_access_level), запрос — только без аннотации
+    if hasattr(obj, "access_level"):
+        return obj.access_level
+    return TaskAccess.objects.filter(task=obj, user=user).values_list("level", flat=True).first()
+
 
 class IsOwnerOrSharedWithEdit(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
+        level = get_access_level(request.user, obj)
         if request.method in permissions.SAFE_METHODS:
-            return obj.owner == request.user or obj.shares.filter(user=request.user).exists()
-
-        if obj.owner == request.user:
-            return True
+            return level is not None
 
-        return obj.shares.filter(user=request.user, permission="edit").exists()
+        return level in (TaskAccess.Level.OWNER, TaskAccess.Level.EDIT)
 
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user
+        return obj.owner_id == request.user.id
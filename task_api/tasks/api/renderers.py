@@ -0,0 +1,65 @@
+import csv
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.renderers import BaseRenderer
+
+
+class _Echo:
+    # csv.writer пишет строку в «файл» и сразу возвращает ее
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Один JSON-объект на строку. `stream` кодирует выгрузку по кускам."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def __init__(self):
+        self.json = import_string(settings.API_JSON_RENDERER)()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return self.json.render(data) + b"\n"
+
+    def stream(self, chunks, columns):
+        render = self.json.render
+        for records in chunks:
+            yield b"".join(render(record) + b"\n" for record in records)
+
+
+class CSVRenderer(BaseRenderer):
+    """CSV с заголовком из имен полей. `stream` кодирует выгрузку по кускам."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # так выводятся только ошибки: словарь — одной строкой с заголовком
+        if data is None:
+            return b""
+        records = data if isinstance(data, list) else [data]
+        columns = list(dict.fromkeys(key for record in records for key in record))
+        return b"".join(self.stream([records], columns))
+
+    def stream(self, chunks, columns):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns).encode()
+        for records in chunks:
+            lines = (writer.writerow([_csv_value(record.get(column)) for column in columns]) for record in records)
+            yield "".join(lines).encode()
@@ -0,0 +1,102 @@
+from django.utils import timezone
+from rest_framework import fields, relations
+from rest_framework.settings import api_settings
+
+from task_api.tasks.models import Task
+
+# поля, у которых представление значения из values() совпадает с самим значением
+_IDENTITY_FIELDS = (
+    fields.BooleanField,
+    fields.CharField,
+    fields.ChoiceField,
+    fields.IntegerField,
+    relations.PrimaryKeyRelatedField,
+)
+
+
+def _datetime_converter(field):
+    if getattr(field, "format", api_settings.DATETIME_FORMAT).lower() != "iso-8601":
+        return field.to_representation
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return convert
+
+
+def _converter(field):
+    if isinstance(field, fields.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, _IDENTITY_FIELDS):
+        return None
+    return field.to_representation
+
+
+def _is_overdue(row, now):
+    # как Task.is_overdue, но с одним моментом времени на всю страницу
+    deadline = row["deadline"]
+    return bool(deadline and row["status"] != Task.Status.DONE and now > deadline)
+
+
+class TaskRowSerializer:
+    """
+    Быстрая сериализация списка задач из строк `values()`.
+
+    Повторяет вывод `TaskSerializer` без создания экземпляров модели: для каждого поля
+    один раз выбирается ключ строки и функция преобразования значения.
+    """
+
+    # ключи values() для полей, которые не совпадают с именем колонки
+    sources = {"owner_email": "owner__email", "shared_with": "shares_count"}
+    # поля, которые вычисляются из других колонок строки
+    computed = {"is_overdue": (["deadline", "status"], _is_overdue)}
+    # аннотации запроса, которые выводятся только если есть в запросе
+    optional = ["search_snippet"]
+
+    def __init__(self, serializer, extra_keys=()):
+        self.serializer = serializer
+        self.extra_keys = list(extra_keys)
+
+    @classmethod
+    def supports(cls, serializer):
+        # расширения (?include=) требуют связанных объектов
+        return not any(name in serializer.fields for name in serializer.expansions)
+
+    def values(self, queryset):
+        annotations = queryset.query.annotations
+        self.plan = []
+        keys = dict.fromkeys(["id", *self.extra_keys])
+        for name, field in self.serializer.fields.items():
+            if name in self.optional and name not in annotations:
+                continue
+            if name in self.computed:
+                columns, compute = self.computed[name]
+                keys.update(dict.fromkeys(columns))
+                self.plan.append((name, None, compute))
+                continue
+            key = self.sources.get(name, name)
+            keys[key] = None
+            self.plan.append((name, key, _converter(field)))
+        self.names = [name for name, _, _ in self.plan]
+        return queryset.values(*keys)
+
+    def to_representation(self, rows):
+        now = timezone.now()
+        plan = self.plan
+        results = []
+        for row in rows:
+            item = {}
+            for name, key, convert in plan:
+                if key is None:
+                    item[name] = convert(row, now)
+                    continue
+                value = row[key]
+                item[name] = value if value is None or convert is None else convert(value)
+            results.append(item)
+        return results
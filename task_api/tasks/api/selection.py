@@ -0,0 +1,78 @@
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+from task_api.tasks.models import TaskShare
+
+
+def _split(value):
+    return [name.strip() for name in value.split(",") if name.strip()] if value else []
+
+
+def _plain_fields(serializer_class):
+    return [name for name in serializer_class.field_columns if name not in serializer_class.expansions]
+
+
+# ?fields= и ?include= для задач: урезают ответ и одновременно запрос к БД.
+# Применяется только к GET — при записи сериализатору нужны все поля.
+class TaskFieldSelectionMixin:
+    fields_query_param = "fields"
+    include_query_param = "include"
+    # колонки, которые нужны самому представлению независимо от ответа
+    required_columns = ["id"]
+
+    def get_field_selection(self):
+        if not hasattr(self, "_field_selection"):
+            self._field_selection = self._parse_field_selection()
+        return self._field_selection
+
+    def _parse_field_selection(self):
+        if self.request.method not in ("GET", "HEAD"):
+            return None, []
+
+        serializer_class = self.get_serializer_class()
+        fields = _split(self.request.query_params.get(self.fields_query_param))
+        include = _split(self.request.query_params.get(self.include_query_param))
+        plain = _plain_fields(serializer_class)
+
+        errors = {}
+        if unknown := [name for name in fields if name not in plain]:
+            errors[self.fields_query_param] = [f"Неизвестные поля: {', '.join(unknown)}"]
+        if unknown := [name for name in include if name not in serializer_class.expansions]:
+            errors[self.include_query_param] = [f"Неизвестные расширения: {', '.join(unknown)}"]
+        if errors:
+            raise ValidationError(errors)
+        return (fields or None), include
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, "swagger_fake_view", False):
+            # в схеме API показываются и поля расширений
+            context["include"] = self.get_serializer_class().expansions
+        elif getattr(self, "request", None) is not None:
+            context["fields"], context["include"] = self.get_field_selection()
+        return context
+
+    def get_required_columns(self):
+        return list(self.required_columns)
+
+    def select_fields(self, queryset):
+        fields, include = self.get_field_selection()
+        serializer_class = self.get_serializer_class()
+
+        selected = fields if fields is not None else _plain_fields(serializer_class)
+        columns = set(self.get_required_columns())
+        for name in [*selected, *include]:
+            columns.update(serializer_class.field_columns[name])
+
+        related = sorted({column.split("__")[0] for column in columns if "__" in column})
+        if related:
+            # внешний ключ должен загружаться вместе со связанной моделью
+            columns.update(related)
+            queryset = queryset.select_related(*related)
+        if fields is not None:
+            queryset = queryset.only(*columns)
+        if "shares" in include:
+            # список расшариваний видит только владелец задачи
+            shares = TaskShare.objects.filter(task__owner=self.request.user).select_related("user")
+            queryset = queryset.prefetch_related(Prefetch("shares", queryset=shares, to_attr="visible_shares"))
+        return queryset
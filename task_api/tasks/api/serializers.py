@@ -1,16 +1,52 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from task_api.tasks.models import Task, TaskShare
+from task_api.tasks.models import Task, TaskImport, TaskShare
+from task_api.users.api.serializers import UserSearchSerializer
 
 User = get_user_model()
 
 
+class TaskShareBriefSerializer(serializers.ModelSerializer):
+    user_email = serializers.EmailField(source="user.email", read_only=True)
+
+    class Meta:
+        model = TaskShare
+        fields = ["user", "user_email", "permission"]
+        read_only_fields = fields
+
+
 class TaskSerializer(serializers.ModelSerializer):
     owner_email = serializers.EmailField(source="owner.email", read_only=True)
     is_overdue = serializers.BooleanField(read_only=True)
-    shared_with = serializers.SerializerMethodField()
+    shared_with = serializers.IntegerField(source="shares_count", read_only=True)
+    # есть только в результатах полнотекстового поиска с ?highlight=true
+    search_snippet = serializers.CharField(read_only=True)
+    # расширения, только по ?include=
+    owner_profile = UserSearchSerializer(source="owner", read_only=True)
+    shares = TaskShareBriefSerializer(source="visible_shares", many=True, read_only=True)
+
+    # поля, которые выводятся только по запросу ?include=
+    expansions = ["owner_profile", "shares"]
+    # колонки модели, нужные каждому полю ответа (для .only() при ?fields=)
+    field_columns = {
+        "id": ["id"],
+        "title": ["title"],
+        "description": ["description"],
+        "status": ["status"],
+        "priority": ["priority"],
+        "deadline": ["deadline"],
+        "owner": ["owner"],
+        "owner_email": ["owner__email"],
+        "is_overdue": ["deadline", "status"],
+        "shared_with": ["shares_count"],
+        "created_at": ["created_at"],
+        "updated_at": ["updated_at"],
+        "search_snippet": [],
+        "owner_profile": ["owner__email", "owner__first_name", "owner__last_name"],
+        "shares": [],
+    }
 
     class Meta:
         model = Task
@@ -27,12 +63,21 @@ class Meta:
             "shared_with",
             "created_at",
             "updated_at",
+            "search_snippet",
+            "owner_profile",
+            "shares",
         ]
         read_only_fields = ["id", "owner", "created_at", "updated_at"]
 
-    @extend_schema_field(serializers.IntegerField)
-    def get_shared_with(self, obj) -> int:
-        return obj.shares.count()
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get("fields")
+        include = self.context.get("include", ())
+        return {
+            name: field
+            for name, field in fields.items()
+            if (name in include if name in self.expansions else selected is None or name in selected)
+        }
 
     def create(self, validated_data):
         validated_data["owner"] = self.context["request"].user
@@ -77,3 +122,144 @@ def validate_email(self, value):
             raise serializers.ValidationError("Нельзя поделиться задачей с владельцем")
 
         return value
+
+
+class TaskBatchShareSerializer(serializers.Serializer):
+    task_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    emails = serializers.ListField(child=serializers.EmailField(), allow_empty=False)
+    permission = serializers.ChoiceField(choices=TaskShare.Permission.choices)
+
+    def validate(self, attrs):
+        pairs = len(set(attrs["task_ids"])) * len(set(attrs["emails"]))
+        if pairs > settings.TASK_SHARE_MAX_PAIRS:
+            raise serializers.ValidationError(
+                f"Не больше {settings.TASK_SHARE_MAX_PAIRS} пар задача-пользователь за запрос"
+            )
+        return attrs
+
+
+class TaskBatchShareResultSerializer(serializers.Serializer):
+    task = serializers.IntegerField()
+    email = serializers.EmailField()
+    status = serializers.ChoiceField(choices=["created", "updated", "rejected"])
+    detail = serializers.CharField(required=False, help_text="Причина отказа")
+
+
+class TaskBatchShareResponseSerializer(serializers.Serializer):
+    summary = serializers.DictField(child=serializers.IntegerField())
+    results = TaskBatchShareResultSerializer(many=True)
+
+
+class TaskBulkModeSerializer(serializers.Serializer):
+    ATOMIC = "atomic"
+    PARTIAL = "partial"
+
+    mode = serializers.ChoiceField(
+        choices=[(ATOMIC, "Все или ничего"), (PARTIAL, "Сохранить корректные элементы")],
+        default=ATOMIC,
+    )
+
+    def validate_size(self, value):
+        if len(value) > settings.TASK_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(f"Не больше {settings.TASK_BULK_MAX_ITEMS} элементов за запрос")
+        return value
+
+
+class TaskBulkWriteSerializer(TaskBulkModeSerializer):
+    items = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_items(self, value):
+        return self.validate_size(value)
+
+
+class TaskBulkDeleteSerializer(TaskBulkModeSerializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+    def validate_ids(self, value):
+        return self.validate_size(value)
+
+
+class TaskBulkErrorSerializer(serializers.Serializer):
+    index = serializers.IntegerField(help_text="Позиция элемента в запросе")
+    errors = serializers.DictField(help_text="Ошибки полей элемента")
+
+
+class TaskBulkResultSerializer(serializers.Serializer):
+    results = TaskSerializer(many=True)
+    errors = TaskBulkErrorSerializer(many=True)
+
+
+class TaskBulkDeleteResultSerializer(serializers.Serializer):
+    results = serializers.ListField(child=serializers.IntegerField(), help_text="id удаленных задач")
+    errors = TaskBulkErrorSerializer(many=True)
+
+
+class TaskSyncSerializer(serializers.Serializer):
+    token = serializers.CharField(help_text="Токен для следующего запроса (?since=)")
+    reset = serializers.BooleanField(help_text="Полная выгрузка: локальную копию нужно заменить, а не дополнить")
+    has_more = serializers.BooleanField(help_text="Есть еще изменения, запросить сразу с новым токеном")
+    tasks = TaskSerializer(many=True, help_text="Созданные и измененные задачи")
+    deleted = serializers.ListField(
+        child=serializers.IntegerField(), help_text="id задач, которые удалены или больше не доступны"
+    )
+
+
+class TaskStatsSerializer(serializers.Serializer):
+    total = serializers.IntegerField(help_text="Всего задач, своих и расшаренных")
+    by_status = serializers.DictField(child=serializers.IntegerField(), help_text="Количество по статусам")
+    by_priority = serializers.DictField(child=serializers.IntegerField(), help_text="Количество по приоритетам")
+    overdue = serializers.IntegerField(help_text="Просроченные задачи")
+    checked_at = serializers.DateTimeField(help_text="Время последнего полного пересчета")
+
+
+class TaskImportSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True, help_text="Файл CSV или NDJSON")
+    format = serializers.ChoiceField(
+        choices=TaskImport.Format.choices, required=False, help_text="По умолчанию определяется по расширению файла"
+    )
+    batch_size = serializers.IntegerField(min_value=1, required=False)
+
+    class Meta:
+        model = TaskImport
+        fields = [
+            "id",
+            "file",
+            "format",
+            "status",
+            "batch_size",
+            "processed_rows",
+            "created_count",
+            "error_count",
+            "errors",
+            "detail",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = [
+            "status",
+            "processed_rows",
+            "created_count",
+            "error_count",
+            "errors",
+            "detail",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+
+    def validate_batch_size(self, value):
+        if value > settings.TASK_IMPORT_MAX_BATCH_SIZE:
+            raise serializers.ValidationError(f"Не больше {settings.TASK_IMPORT_MAX_BATCH_SIZE} строк в пачке")
+        return value
+
+    def validate(self, attrs):
+        attrs.setdefault("format", TaskImport.format_for(attrs["file"].name))
+        if attrs["format"] is None:
+            raise serializers.ValidationError({"format": "Не удалось определить формат по имени файла"})
+        attrs.setdefault("batch_size", settings.TASK_IMPORT_BATCH_SIZE)
+        return attrs
+
+    def create(self, validated_data):
+        validated_data["owner"] = self.context["request"].user
+        return super().create(validated_data)
@@ -1,17 +1,37 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
+    AsyncTaskDetailView,
+    AsyncTaskListCreateView,
     ShareTaskView,
+    TaskBatchShareView,
+    TaskBulkView,
     TaskDetailView,
+    TaskExportView,
+    TaskImportDetailView,
+    TaskImportListCreateView,
     TaskListCreateView,
     TaskShareDeleteView,
     TaskShareListView,
+    TaskStatsView,
+    TaskSyncView,
 )
 
 app_name = "tasks"
 
+if settings.API_ASYNC_VIEWS:
+    TaskListCreateView, TaskDetailView = AsyncTaskListCreateView, AsyncTaskDetailView  # noqa: F811
+
 urlpatterns = [
     path("", TaskListCreateView.as_view(), name="task-list"),
+    path("bulk/", TaskBulkView.as_view(), name="task-bulk"),
+    path("share/", TaskBatchShareView.as_view(), name="task-share-batch"),
+    path("stats/", TaskStatsView.as_view(), name="task-stats"),
+    path("sync/", TaskSyncView.as_view(), name="task-sync"),
+    path("export/", TaskExportView.as_view(), name="task-export"),
+    path("imports/", TaskImportListCreateView.as_view(), name="task-import-list"),
+    path("imports/<int:pk>/", TaskImportDetailView.as_view(), name="task-import-detail"),
     path("<int:pk>/", TaskDetailView.as_view(), name="task-detail"),
     path("<int:pk>/share/", ShareTaskView.as_view(), name="task-share"),
     path("<int:pk>/shares/", TaskShareListView.as_view(), name="task-shares"),
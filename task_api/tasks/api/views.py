@@ -1,20 +1,73 @@
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch, Q
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections, transaction
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
-from rest_framework import generics, status
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework import generics, serializers, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.fields import BooleanField
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from task_api.tasks.api.filters import TaskFilter
+from task_api.tasks import bulk, caching, export, stats, sync
+from task_api.tasks.api.conditional import (
+    ConditionalRequestMixin,
+    atask_list_etag,
+    claim_task_version,
+    task_etag,
+    task_last_modified,
+    task_list_etag,
+)
+from task_api.tasks.api.filters import TaskFilter, TaskOrderingFilter, TaskSearchFilter
+from task_api.tasks.api.pagination import KeysetPagination, PageNumberOrKeysetPagination
 from task_api.tasks.api.permissions import IsOwner, IsOwnerOrSharedWithEdit
-from task_api.tasks.api.serializers import ShareTaskSerializer, TaskSerializer, TaskShareSerializer
-from task_api.tasks.models import Task, TaskShare
+from task_api.tasks.api.renderers import CSVRenderer, NDJSONRenderer
+from task_api.tasks.api.rows import TaskRowSerializer
+from task_api.tasks.api.selection import TaskFieldSelectionMixin
+from task_api.tasks.api.serializers import (
+    ShareTaskSerializer,
+    TaskBatchShareResponseSerializer,
+    TaskBatchShareSerializer,
+    TaskBulkDeleteResultSerializer,
+    TaskBulkDeleteSerializer,
+    TaskBulkModeSerializer,
+    TaskBulkResultSerializer,
+    TaskBulkWriteSerializer,
+    TaskImportSerializer,
+    TaskSerializer,
+    TaskShareSerializer,
+    TaskStatsSerializer,
+    TaskSyncSerializer,
+)
+from task_api.tasks.models import Task, TaskAccess, TaskImport, TaskShare
+from task_api.tasks.tasks import import_tasks
+from task_api.utils.async_views import AsyncAPIViewMixin, aiterate
+from task_api.utils.iterables import chunked
+from task_api.utils.pagination import CACHED, CountingPageNumberPagination
 
 User = get_user_model()
 
+TASK_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        "status", OpenApiTypes.STR, description="Фильтр по статусу (можно указать несколько через запятую)"
+    ),
+    OpenApiParameter(
+        "priority", OpenApiTypes.STR, description="Фильтр по приоритету (можно указать несколько через запятую)"
+    ),
+    OpenApiParameter("deadline_after", OpenApiTypes.DATETIME, description="Дедлайн после указанной даты"),
+    OpenApiParameter("deadline_before", OpenApiTypes.DATETIME, description="Дедлайн до указанной даты"),
+    OpenApiParameter("is_overdue", OpenApiTypes.BOOL, description="Просроченные задачи"),
+]
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -22,20 +75,30 @@
         summary="Список задач",
         description="Получение списка задач пользователя (своих и расшаренных)",
         parameters=[
+            *TASK_FILTER_PARAMETERS,
+            OpenApiParameter("search", OpenApiTypes.STR, description="Полнотекстовый поиск по названию и описанию"),
             OpenApiParameter(
-                "status", OpenApiTypes.STR, description="Фильтр по статусу (можно указать несколько через запятую)"
+                "fields",
+                OpenApiTypes.STR,
+                description="Поля ответа через запятую, например id,title,status,priority",
             ),
             OpenApiParameter(
-                "priority", OpenApiTypes.STR, description="Фильтр по приоритету (можно указать несколько через запятую)"
+                "include",
+                OpenApiTypes.STR,
+                description="Дополнительные поля через запятую: owner_profile, shares",
+            ),
+            OpenApiParameter(
+                "highlight",
+                OpenApiTypes.BOOL,
+                description="Добавить в результаты поиска фрагмент описания с подсветкой (search_snippet)",
             ),
-            OpenApiParameter("deadline_after", OpenApiTypes.DATETIME, description="Дедлайн после указанной даты"),
-            OpenApiParameter("deadline_before", OpenApiTypes.DATETIME, description="Дедлайн до указанной даты"),
-            OpenApiParameter("is_overdue", OpenApiTypes.BOOL, description="Просроченные задачи"),
-            OpenApiParameter("search", OpenApiTypes.STR, description="Поиск по названию и описанию"),
             OpenApiParameter(
                 "ordering",
                 OpenApiTypes.STR,
-                description="Сортировка (доступные поля: created_at, deadline, priority, status)",
+                description=(
+                    "Сортировка (доступные поля: created_at, deadline, priority, status, is_overdue; "
+                    "rank — по релевантности, только вместе с search)"
+                ),
             ),
         ],
     ),
@@ -45,26 +108,86 @@
         description="Создание новой задачи",
     ),
 )
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskListCreateView(TaskFieldSelectionMixin, ConditionalRequestMixin, generics.ListCreateAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    pagination_class = PageNumberOrKeysetPagination
+    # количество кэшируется до изменения задач пользователя (поколение списков из caching)
+    count_strategy = CACHED
+    # просроченность меняется с ходом времени, а не при записи: с этим фильтром количество не кэшируется
+    time_dependent_params = ["is_overdue"]
+    filter_backends = [DjangoFilterBackend, TaskSearchFilter, TaskOrderingFilter]
     filterset_class = TaskFilter
     search_fields = ["title", "description"]
-    ordering_fields = ["created_at", "deadline", "priority", "status"]
+    search_configs = ["russian", "english"]
+    ordering_fields = ["created_at", "deadline", "priority", "status", "is_overdue", "rank"]
+    # priority и status сортируются по целочисленным ключам (low < medium < high, new < in_progress < done)
+    ordering_keys = Task.RANK_FIELDS
+    ordering_paths = {
+        field: f"viewer_access__{Task.RANK_FIELDS.get(field, field)}"
+        for field in ["created_at", "deadline", "priority", "status"]
+    }
     ordering = ["-created_at"]
+    # список читается через values() и TaskRowSerializer, без экземпляров модели
+    fast_serialization = True
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
             return Task.objects.none()
 
         user = self.request.user
-        return (
-            Task.objects.filter(Q(owner=user) | Q(shares__user=user))
-            .select_related("owner")
-            .prefetch_related(Prefetch("shares", queryset=TaskShare.objects.select_related("user")))
-            .distinct()
-        )
+        return self.select_fields(Task.objects.visible_to(user))
+
+    def get_required_columns(self):
+        columns = super().get_required_columns()
+        if KeysetPagination.cursor_query_param in self.request.query_params:
+            # курсор читает значения полей сортировки из последней строки страницы
+            columns.extend(TaskAccess.SORT_FIELDS)
+        return columns
+
+    def get_count_scope(self):
+        return f"tasks:{self.request.user.pk}:{caching.get_generation(self.request.user.pk)}"
+
+    async def aget_count_scope(self):
+        return f"tasks:{self.request.user.pk}:{await caching.aget_generation(self.request.user.pk)}"
+
+    def get_row_keys(self, queryset):
+        keys = self.get_required_columns()
+        keys.extend(name for name in ["rank", "is_overdue"] if name in queryset.query.annotations)
+        return keys
+
+    def list(self, request, *args, **kwargs):
+        etag = task_list_etag(request.user)
+        response = self.not_modified_response(etag)
+        if response is not None:
+            return response
+        return self.set_validators(self.cached_list(request, *args, **kwargs), etag)
+
+    def cached_list(self, request, *args, **kwargs):
+        if not settings.TASK_LIST_CACHE_ENABLED:
+            return self.list_page()
+
+        key = caching.page_key(request)
+        data = caching.get_page(key)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = self.list_page()
+        if response.status_code == status.HTTP_200_OK:
+            caching.set_page(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list_page(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        if not (self.fast_serialization and TaskRowSerializer.supports(serializer)):
+            page = self.paginate_queryset(queryset)
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+        rows = TaskRowSerializer(serializer, extra_keys=self.get_row_keys(queryset))
+        page = self.paginate_queryset(rows.values(queryset))
+        return self.get_paginated_response(rows.to_representation(page))
 
 
 @extend_schema_view(
@@ -72,6 +195,14 @@ def get_queryset(self):
         tags=["Задачи"],
         summary="Детали задачи",
         description="Получение информации о конкретной задаче",
+        parameters=[
+            OpenApiParameter("fields", OpenApiTypes.STR, description="Поля ответа через запятую"),
+            OpenApiParameter(
+                "include",
+                OpenApiTypes.STR,
+                description="Дополнительные поля через запятую: owner_profile, shares",
+            ),
+        ],
     ),
     update=extend_schema(
         tags=["Задачи"],
@@ -89,22 +220,284 @@ def get_queryset(self):
         description="Удаление задачи (только для владельца)",
     ),
 )
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailView(TaskFieldSelectionMixin, ConditionalRequestMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrSharedWithEdit]
+    # валидаторы ETag/Last-Modified
+    required_columns = ["id", "status", "deadline", "updated_at"]
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
             return Task.objects.none()
 
         user = self.request.user
-        return (
-            Task.objects.filter(Q(owner=user) | Q(shares__user=user))
-            .select_related("owner")
-            .prefetch_related(Prefetch("shares", queryset=TaskShare.objects.select_related("user")))
-            .distinct()
+        return self.select_fields(Task.objects.visible_to(user).with_access_level())
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = task_etag(instance), task_last_modified(instance)
+        response = self.not_modified_response(etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(instance)
+        return self.set_validators(Response(serializer.data), etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        instance = self.get_object()
+        compare = self.check_if_match(task_etag(instance))
+
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        if compare:
+            claim_task_version(instance)
+        self.perform_update(serializer)
+        return self.set_validators(Response(serializer.data), task_etag(instance), task_last_modified(instance))
+
+    def perform_destroy(self, instance):
+        # как массовое удаление: расшаривания и строки доступа уходят каскадом без построчных обработчиков
+        bulk.delete_tasks([instance])
+
+
+# Асинхронные варианты представлений для ASGI (API_ASYNC_VIEWS): чтение — в цикле событий
+# через асинхронный ORM, запись — синхронным кодом родительского класса.
+class AsyncTaskListCreateView(AsyncAPIViewMixin, TaskListCreateView):
+    async def aget(self, request, *args, **kwargs):
+        etag = await atask_list_etag(request.user)
+        response = self.not_modified_response(etag)
+        if response is not None:
+            return response
+        return self.set_validators(await self.acached_list(request), etag)
+
+    async def acached_list(self, request):
+        if not settings.TASK_LIST_CACHE_ENABLED:
+            return await self.alist_page()
+
+        key = await caching.apage_key(request)
+        data = await caching.aget_page(key)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = await self.alist_page()
+        if response.status_code == status.HTTP_200_OK:
+            await caching.aset_page(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def alist_page(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        if not (self.fast_serialization and TaskRowSerializer.supports(serializer)):
+            # расширениям (?include=) нужны связанные объекты, их сериализация обращается к БД
+            return await sync_to_async(self.list_page)()
+
+        rows = TaskRowSerializer(serializer, extra_keys=self.get_row_keys(queryset))
+        page = await self.paginator.apaginate_queryset(rows.values(queryset), self.request, view=self)
+        return self.get_paginated_response(rows.to_representation(page))
+
+
+class AsyncTaskDetailView(AsyncAPIViewMixin, TaskDetailView):
+    async def aget(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        etag, last_modified = task_etag(instance), task_last_modified(instance)
+        response = self.not_modified_response(etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(instance)
+        return self.set_validators(Response(serializer.data), etag, last_modified)
+
+
+@extend_schema(
+    tags=["Задачи"],
+    summary="Сводка по задачам",
+    description="Количество задач пользователя (своих и расшаренных) по статусам, приоритетам и просроченных",
+    responses=TaskStatsSerializer,
+)
+class TaskStatsView(generics.GenericAPIView):
+    serializer_class = TaskStatsSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get(self, request):
+        return Response(self.get_serializer(stats.user_stats(request.user)).data)
+
+
+@extend_schema(
+    tags=["Задачи"],
+    summary="Изменения задач с последней синхронизации",
+    description=(
+        "Задачи, созданные или измененные после выдачи токена, и id задач, которые удалены или стали "
+        "недоступны. Без since (или с устаревшим токеном) отдаются все задачи с reset=true. Пока has_more=true, "
+        "следующую порцию нужно запросить сразу с новым токеном"
+    ),
+    parameters=[OpenApiParameter("since", OpenApiTypes.STR, description="Токен из предыдущего ответа")],
+    responses=TaskSyncSerializer,
+)
+class TaskSyncView(generics.GenericAPIView):
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+    since_query_param = "since"
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Task.objects.none()
+
+        return Task.objects.visible_to(self.request.user).order_by("pk")
+
+    def get(self, request):
+        position, reset = self.get_position()
+        changed, deleted, position, has_more = sync.changes(
+            request.user, position, settings.TASK_SYNC_PAGE_SIZE, with_deleted=not reset
+        )
+        rows = TaskRowSerializer(self.get_serializer())
+        tasks = rows.to_representation(rows.values(self.get_queryset().filter(pk__in=changed))) if changed else []
+        return Response(
+            {
+                "token": sync.make_token(*position),
+                "reset": reset,
+                "has_more": has_more,
+                "tasks": tasks,
+                "deleted": deleted,
+            }
         )
 
+    def get_position(self):
+        token = self.request.query_params.get(self.since_query_param)
+        if not token:
+            return (0, 0), True
+        try:
+            return sync.read_token(token), False
+        except sync.TokenExpired:
+            return (0, 0), True
+        except (signing.BadSignature, ValueError):
+            raise ValidationError({self.since_query_param: "Недействительный токен синхронизации"}) from None
+
+
+@extend_schema_view(
+    post=extend_schema(
+        tags=["Задачи"],
+        summary="Массовое создание задач",
+        description=(
+            "Создание до TASK_BULK_MAX_ITEMS задач за запрос. В режиме atomic при любой ошибке "
+            "ничего не сохраняется, в режиме partial сохраняются корректные элементы"
+        ),
+        request=TaskBulkWriteSerializer,
+        responses={201: TaskBulkResultSerializer, 400: TaskBulkResultSerializer},
+    ),
+    patch=extend_schema(
+        tags=["Задачи"],
+        summary="Массовое изменение задач",
+        description="Частичное обновление задач; каждый элемент содержит id и изменяемые поля",
+        request=TaskBulkWriteSerializer,
+        responses={200: TaskBulkResultSerializer, 400: TaskBulkResultSerializer},
+    ),
+    delete=extend_schema(
+        tags=["Задачи"],
+        summary="Массовое удаление задач",
+        description="Удаление задач по списку id",
+        request=TaskBulkDeleteSerializer,
+        responses={200: TaskBulkDeleteResultSerializer, 400: TaskBulkDeleteResultSerializer},
+    ),
+)
+class TaskBulkView(generics.GenericAPIView):
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    write_permission = IsOwnerOrSharedWithEdit()
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Task.objects.none()
+
+        user = self.request.user
+        return Task.objects.visible_to(user).with_access_level().select_related("owner")
+
+    def post(self, request):
+        payload = self.validate_payload(TaskBulkWriteSerializer)
+        serializer = self.get_serializer()
+
+        tasks, errors = [], []
+        for index, item in enumerate(payload["items"]):
+            try:
+                data = serializer.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append({"index": index, "errors": exc.detail})
+                continue
+            tasks.append(Task(owner=request.user, **data))
+
+        if self.rejected(payload, tasks, errors):
+            return self.error_response(errors)
+        tasks = bulk.create_tasks(tasks)
+        return self.bulk_response(self.get_serializer(tasks, many=True).data, errors, status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        payload = self.validate_payload(TaskBulkWriteSerializer)
+        items = payload["items"]
+        tasks = self.get_queryset().in_bulk([item["id"] for item in items if isinstance(item.get("id"), int)])
+        serializer = self.get_serializer(partial=True)
+
+        changes, errors, seen = [], [], set()
+        for index, item in enumerate(items):
+            try:
+                task = self.writable_task(tasks, item.get("id"), seen)
+                data = serializer.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append({"index": index, "errors": exc.detail})
+                continue
+            for field, value in data.items():
+                setattr(task, field, value)
+            changes.append((task, data.keys()))
+
+        if self.rejected(payload, changes, errors):
+            return self.error_response(errors)
+        tasks = bulk.update_tasks(changes)
+        return self.bulk_response(self.get_serializer(tasks, many=True).data, errors)
+
+    def delete(self, request):
+        payload = self.validate_payload(TaskBulkDeleteSerializer)
+        tasks = self.get_queryset().in_bulk(payload["ids"])
+
+        allowed, errors, seen = [], [], set()
+        for index, task_id in enumerate(payload["ids"]):
+            try:
+                allowed.append(self.writable_task(tasks, task_id, seen))
+            except serializers.ValidationError as exc:
+                errors.append({"index": index, "errors": exc.detail})
+
+        if self.rejected(payload, allowed, errors):
+            return self.error_response(errors)
+        bulk.delete_tasks(allowed)
+        return self.bulk_response([task.pk for task in allowed], errors)
+
+    def validate_payload(self, serializer_class):
+        serializer = serializer_class(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def writable_task(self, tasks, task_id, seen):
+        if not isinstance(task_id, int):
+            raise serializers.ValidationError({"id": ["Обязательное поле."]})
+        if task_id in seen:
+            raise serializers.ValidationError({"id": ["Задача указана в запросе несколько раз"]})
+        seen.add(task_id)
+        task = tasks.get(task_id)
+        if task is None:
+            raise serializers.ValidationError({"id": ["Задача не найдена"]})
+        if not self.write_permission.has_object_permission(self.request, self, task):
+            raise serializers.ValidationError({"id": ["Недостаточно прав для изменения задачи"]})
+        return task
+
+    def rejected(self, payload, valid, errors):
+        return bool(errors) and (payload["mode"] == TaskBulkModeSerializer.ATOMIC or not valid)
+
+    def error_response(self, errors):
+        return self.bulk_response([], errors, status.HTTP_400_BAD_REQUEST)
+
+    def bulk_response(self, results, errors, status_code=status.HTTP_200_OK):
+        return Response({"results": results, "errors": errors}, status=status_code)
+
 
 @extend_schema_view(
     post=extend_schema(
@@ -131,6 +524,8 @@ def post(self, request, pk):
         user = User.objects.get(email=serializer.validated_data["email"])
         permission = serializer.validated_data["permission"]
 
+        # та же очередность, что и у пакетной выдачи доступа (bulk.share_tasks)
+        bulk.lock_tasks([task.pk])
         share, created = TaskShare.objects.update_or_create(
             task=task,
             user=user,
@@ -146,6 +541,195 @@ def post(self, request, pk):
         )
 
 
+@extend_schema_view(
+    post=extend_schema(
+        tags=["Расшаривание задач"],
+        summary="Поделиться несколькими задачами",
+        description=(
+            "Предоставить доступ ко всем перечисленным задачам всем пользователям из списка. "
+            "Результат возвращается для каждой пары задача-пользователь"
+        ),
+        responses={200: TaskBatchShareResponseSerializer},
+        operation_id="tasks_share_batch",
+    ),
+)
+class TaskBatchShareView(generics.GenericAPIView):
+    serializer_class = TaskBatchShareSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Task.objects.none()
+
+        return Task.objects.filter(owner=self.request.user)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task_ids = list(dict.fromkeys(serializer.validated_data["task_ids"]))
+        emails = list(dict.fromkeys(serializer.validated_data["emails"]))
+
+        tasks = self.get_queryset().in_bulk(task_ids)
+        users = {user.email: user for user in User.objects.filter(email__in=emails)}
+        task_errors = {task_id: "Задача не найдена" for task_id in task_ids if task_id not in tasks}
+        email_errors = {email: "Пользователь с таким email не найден" for email in emails if email not in users}
+        email_errors.update(
+            {email: "Нельзя поделиться задачей с владельцем" for email, user in users.items() if user == request.user}
+        )
+
+        created, updated = bulk.share_tasks(
+            [tasks[task_id] for task_id in task_ids if task_id not in task_errors],
+            [users[email] for email in emails if email not in email_errors],
+            serializer.validated_data["permission"],
+        )
+        created = {(share.task_id, share.user.email) for share in created}
+
+        results = []
+        for task_id in task_ids:
+            for email in emails:
+                detail = task_errors.get(task_id) or email_errors.get(email)
+                if detail:
+                    results.append({"task": task_id, "email": email, "status": "rejected", "detail": detail})
+                else:
+                    outcome = "created" if (task_id, email) in created else "updated"
+                    results.append({"task": task_id, "email": email, "status": outcome})
+
+        summary = Counter(result["status"] for result in results)
+        return Response(
+            {
+                "summary": {outcome: summary[outcome] for outcome in ["created", "updated", "rejected"]},
+                "results": results,
+            }
+        )
+
+
+@extend_schema(
+    tags=["Задачи"],
+    summary="Выгрузка задач",
+    description=(
+        "Потоковая выгрузка всех видимых задач (для сотрудников — всех задач) в NDJSON или CSV "
+        "с теми же фильтрами, что и у списка. С dump=true сотрудникам отдается полная копия "
+        "таблицы задач в CSV (в PostgreSQL — через COPY)"
+    ),
+    parameters=[
+        *TASK_FILTER_PARAMETERS,
+        OpenApiParameter("format", OpenApiTypes.STR, enum=["ndjson", "csv"], description="Формат выгрузки"),
+        OpenApiParameter("dump", OpenApiTypes.BOOL, description="Полная выгрузка таблицы (только для сотрудников)"),
+    ],
+    responses={(200, "application/x-ndjson"): OpenApiTypes.STR, (200, "text/csv"): OpenApiTypes.STR},
+)
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class TaskExportView(generics.GenericAPIView):
+    # поток читается уже после выхода из представления: держать открытой
+    # транзакцию ATOMIC_REQUESTS на все время выгрузки нельзя
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskFilter
+    pagination_class = None
+    dump_query_param = "dump"
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Task.objects.none()
+
+        user = self.request.user
+        queryset = Task.objects.all() if user.is_staff else Task.objects.visible_to(user)
+        return queryset.order_by("pk")
+
+    def get(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        renderer = request.accepted_renderer
+        chunk_size = settings.TASK_EXPORT_CHUNK_SIZE
+
+        if self.wants_dump():
+            if not isinstance(renderer, CSVRenderer):
+                raise ValidationError({self.dump_query_param: "Полная выгрузка доступна только в формате csv"})
+            if connections[queryset.db].vendor == "postgresql":
+                content = export.copy_csv(queryset)
+            else:
+                rows = queryset.values(*export.DUMP_COLUMNS).iterator(chunk_size=chunk_size)
+                content = renderer.stream(chunked(rows, chunk_size), export.DUMP_COLUMNS)
+        else:
+            rows = TaskRowSerializer(self.get_serializer())
+            values = rows.values(queryset).iterator(chunk_size=chunk_size)
+            content = renderer.stream(
+                (rows.to_representation(chunk) for chunk in chunked(values, chunk_size)), rows.names
+            )
+
+        content_type = (
+            renderer.media_type if renderer.charset is None else f"{renderer.media_type}; charset={renderer.charset}"
+        )
+        if isinstance(request._request, ASGIRequest):
+            content = aiterate(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="tasks.{renderer.format}"'
+        return response
+
+    def wants_dump(self):
+        if self.request.query_params.get(self.dump_query_param, "").lower() not in BooleanField.TRUE_VALUES:
+            return False
+        if not self.request.user.is_staff:
+            raise PermissionDenied("Полная выгрузка доступна только сотрудникам")
+        return True
+
+
+@extend_schema_view(
+    list=extend_schema(
+        tags=["Импорт задач"],
+        summary="Список импортов",
+        description="Импорты задач текущего пользователя",
+    ),
+    create=extend_schema(
+        tags=["Импорт задач"],
+        summary="Импорт задач из файла",
+        description=(
+            "Загрузка файла CSV или NDJSON с задачами. Файл обрабатывается в фоне пачками по batch_size строк; "
+            "ход импорта и ошибки строк доступны в задании импорта"
+        ),
+        responses={202: TaskImportSerializer},
+    ),
+)
+class TaskImportListCreateView(generics.ListCreateAPIView):
+    serializer_class = TaskImportSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return TaskImport.objects.none()
+
+        return TaskImport.objects.filter(owner=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    def perform_create(self, serializer):
+        job = serializer.save()
+        transaction.on_commit(lambda: import_tasks.delay(job.pk))
+
+
+@extend_schema_view(
+    retrieve=extend_schema(
+        tags=["Импорт задач"],
+        summary="Состояние импорта",
+        description="Ход импорта: обработанные строки, созданные задачи и ошибки строк",
+    ),
+)
+class TaskImportDetailView(generics.RetrieveAPIView):
+    serializer_class = TaskImportSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return TaskImport.objects.none()
+
+        return TaskImport.objects.filter(owner=self.request.user)
+
+
 @extend_schema_view(
     list=extend_schema(
         tags=["Расшаривание задач"],
@@ -156,13 +740,18 @@ def post(self, request, pk):
 class TaskShareListView(generics.ListAPIView):
     serializer_class = TaskShareSerializer
     permission_classes = [IsAuthenticated, IsOwner]
+    pagination_class = CountingPageNumberPagination
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
             return TaskShare.objects.none()
 
         task_id = self.kwargs.get("pk")
-        return TaskShare.objects.filter(task_id=task_id, task__owner=self.request.user).select_related("user", "task")
+        return (
+            TaskShare.objects.filter(task_id=task_id, task__owner=self.request.user)
+            .select_related("user", "task")
+            .order_by("created_at", "pk")
+        )
 
 
 @extend_schema_view(
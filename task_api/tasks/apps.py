@@ -5,3 +5,6 @@ class TasksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "task_api.tasks"
     verbose_name = "Задачи"
+
+    def ready(self):
+        from task_api.tasks import signals  # noqa: F401
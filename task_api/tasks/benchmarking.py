@@ -0,0 +1,63 @@
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import cycle
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from task_api.tasks import bulk
+from task_api.tasks.models import Task
+
+
+@contextmanager
+def rollback():
+    """Выполняет замер в транзакции и откатывает все созданные данные."""
+    with transaction.atomic():
+        try:
+            yield
+        finally:
+            transaction.set_rollback(True)
+
+
+def median_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def create_owner():
+    suffix = time.time_ns()
+    return get_user_model().objects.create_user(email=f"benchmark-{suffix}@example.com", password=None)
+
+
+def create_owners(count):
+    suffix = time.time_ns()
+    user_model = get_user_model()
+    owners = [user_model(email=f"benchmark-{suffix}-{number}@example.com") for number in range(count)]
+    for owner in owners:
+        owner.set_unusable_password()
+    return user_model.objects.bulk_create(owners)
+
+
+def create_tasks(owner, count):
+    now = timezone.now()
+    statuses = cycle(Task.Status.values)
+    priorities = cycle(Task.Priority.values)
+    tasks = [
+        Task(
+            title=f"Задача №{number}",
+            description="Описание задачи для замера производительности",
+            status=next(statuses),
+            priority=next(priorities),
+            deadline=now + timedelta(hours=number - count // 2) if number % 5 else None,
+            owner=owner,
+        )
+        for number in range(count)
+    ]
+    return bulk.create_tasks(tasks)
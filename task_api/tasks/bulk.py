@@ -0,0 +1,118 @@
+from itertools import groupby
+
+from django.db import transaction
+from django.utils import timezone
+
+from task_api.tasks import signals
+from task_api.tasks.models import Task, TaskShare
+
+BATCH_SIZE = 500
+
+
+@transaction.atomic
+def create_tasks(tasks, batch_size=BATCH_SIZE):
+    """Вставляет задачи пачками и выполняет те же действия, что и построчное сохранение."""
+    tasks = list(tasks)
+    now = timezone.now()
+    for task in tasks:
+        task.next_reminder_at = task.reminder_time_after(now)
+        task.set_sort_ranks()
+    tasks = Task.objects.bulk_create(tasks, batch_size=batch_size)
+    signals.tasks_saved(tasks, created=True)
+    return tasks
+
+
+@transaction.atomic
+def update_tasks(changes, batch_size=BATCH_SIZE):
+    """
+    Сохраняет изменения, переданные парами (задача, измененные поля).
+
+    Задачи с одинаковым набором полей обновляются одним bulk_update, поэтому
+    поля, которые не менялись, не перезаписываются значениями из памяти.
+    """
+
+    def field_set(change):
+        return sorted(change[1])
+
+    now = timezone.now()
+    tasks = []
+    for fields, group in groupby(sorted(changes, key=field_set), key=field_set):
+        group_tasks = [task for task, _ in group]
+        for task in group_tasks:
+            task.updated_at = now
+        if not set(Task.REMINDER_FIELDS).isdisjoint(fields):
+            # напоминания пересчитываются только при изменении срока или статуса
+            for task in group_tasks:
+                task.next_reminder_at = task.reminder_time_after(now)
+                task.reminder_attempts = 0
+            fields = [*fields, "next_reminder_at", "reminder_attempts"]
+        ranks = [rank for field, rank in Task.RANK_FIELDS.items() if field in fields]
+        if ranks:
+            for task in group_tasks:
+                task.set_sort_ranks()
+            fields = [*fields, *ranks]
+        Task.objects.bulk_update(group_tasks, [*fields, "updated_at"], batch_size=batch_size)
+        tasks.extend(group_tasks)
+    if tasks:
+        signals.tasks_saved(tasks, created=False)
+    return tasks
+
+
+@transaction.atomic
+def delete_tasks(tasks):
+    """
+    Удаляет задачи одним запросом на каждую связанную таблицу.
+
+    Расшаривания и строки доступа уходят каскадом вместе с задачами, поэтому
+    их построчные обработчики не нужны — достаточно сбросить кэш пользователей.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return 0
+    signals.tasks_deleted(tasks)
+    with signals.bulk_hooks():
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).delete()
+    return len(tasks)
+
+
+def lock_tasks(task_ids):
+    """
+    Блокирует строки задач до конца транзакции (в порядке id, без взаимоблокировок).
+
+    Расшаривания одной задачи выдаются по очереди: иначе параллельная вставка той же
+    пары (задача, пользователь) между чтением существующих расшариваний и upsert
+    была бы засчитана как созданная дважды.
+    """
+    list(Task.objects.select_for_update().filter(pk__in=task_ids).order_by("pk").values_list("pk", flat=True))
+
+
+@transaction.atomic
+def share_tasks(tasks, users, permission, batch_size=BATCH_SIZE):
+    """
+    Выдает доступ к каждой задаче каждому пользователю одним
+    INSERT ... ON CONFLICT (task, user) DO UPDATE на пачку.
+
+    Возвращает созданные и обновленные расшаривания.
+    """
+    tasks, users = list(tasks), list(users)
+    if not tasks or not users:
+        return [], []
+
+    lock_tasks([task.pk for task in tasks])
+    existing = set(TaskShare.objects.filter(task__in=tasks, user__in=users).values_list("task_id", "user_id"))
+    shares = [TaskShare(task=task, user=user, permission=permission) for task in tasks for user in users]
+    TaskShare.objects.bulk_create(
+        shares,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["task", "user"],
+        update_fields=["permission"],
+    )
+
+    created = [share for share in shares if (share.task_id, share.user_id) not in existing]
+    updated = [share for share in shares if (share.task_id, share.user_id) in existing]
+    if created:
+        signals.shares_saved(created, created=True)
+    if updated:
+        signals.shares_saved(updated, created=False)
+    return created, updated
@@ -0,0 +1,103 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY = "tasks:list:generation:{user_id}"
+PAGE_KEY = "tasks:list:page:{user_id}:{generation}:{digest}"
+HITS_KEY = "tasks:list:hits"
+MISSES_KEY = "tasks:list:misses"
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+async def _aincr(key):
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        return await cache.aincr(key)
+
+
+def get_generation(user_id):
+    # при потере ключа поколение начинается с текущего времени, а не с нуля,
+    # чтобы не совпасть с поколением уже закэшированных страниц
+    return cache.get_or_set(GENERATION_KEY.format(user_id=user_id), time.time_ns, timeout=None)
+
+
+async def aget_generation(user_id):
+    return await cache.aget_or_set(GENERATION_KEY.format(user_id=user_id), time.time_ns, timeout=None)
+
+
+def bump_generations(user_ids):
+    for user_id in user_ids:
+        try:
+            cache.incr(GENERATION_KEY.format(user_id=user_id))
+        except ValueError:
+            pass
+
+
+def invalidate_task_lists(user_ids):
+    """Сбрасывает закэшированные списки задач пользователей после фиксации транзакции."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        transaction.on_commit(lambda: bump_generations(user_ids))
+
+
+def page_key(request):
+    return _page_key(request, get_generation(request.user.pk))
+
+
+async def apage_key(request):
+    return _page_key(request, await aget_generation(request.user.pk))
+
+
+def _page_key(request, generation):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    # ссылки next/previous абсолютные, поэтому адрес запроса тоже входит в ключ
+    source = f"{request.build_absolute_uri(request.path)}?{query}"
+    return PAGE_KEY.format(
+        user_id=request.user.pk,
+        generation=generation,
+        digest=hashlib.sha256(source.encode()).hexdigest(),
+    )
+
+
+def get_page(key):
+    data = cache.get(key)
+    _incr(MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+async def aget_page(key):
+    data = await cache.aget(key)
+    await _aincr(MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+def set_page(key, data):
+    cache.set(key, data, settings.TASK_LIST_CACHE_TIMEOUT)
+
+
+async def aset_page(key, data):
+    await cache.aset(key, data, settings.TASK_LIST_CACHE_TIMEOUT)
+
+
+def cache_stats():
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+
+def reset_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
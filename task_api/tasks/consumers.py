@@ -0,0 +1,58 @@
+import asyncio
+
+from django.conf import settings
+
+from task_api.tasks import events
+from task_api.utils.channels import BaseConsumer
+
+
+class TaskEventsConsumer(BaseConsumer):
+    """
+    Поток изменений задач пользователя: создание, изменение и удаление задач, выдача и отзыв доступа.
+
+    События копятся TASK_EVENTS_FLUSH_DELAY секунд и уходят одним сообщением `tasks.changed`,
+    по одному событию на задачу, поэтому массовое изменение дает одно сообщение.
+    Если событий больше TASK_EVENTS_MAX_BATCH, вместо списка отправляется `tasks.resync`:
+    клиенту проще перечитать список.
+    """
+
+    # код закрытия для соединения без действительного токена (аналог HTTP 401)
+    unauthorized_code = 4401
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=self.unauthorized_code)
+            return
+
+        self.group = events.user_group(user.pk)
+        self.pending = {}
+        self.flush_task = None
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if getattr(self, "flush_task", None) is not None:
+            self.flush_task.cancel()
+        if hasattr(self, "group"):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if isinstance(content, dict) and content.get("type") == "ping":
+            await self.send_json({"type": "pong"})
+        else:
+            await self.send_error("Неизвестный тип сообщения")
+
+    async def task_events(self, message):
+        for event in message["events"]:
+            events.coalesce(self.pending, event)
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(settings.TASK_EVENTS_FLUSH_DELAY)
+        pending, self.pending, self.flush_task = self.pending, {}, None
+        if len(pending) > settings.TASK_EVENTS_MAX_BATCH:
+            await self.send_json({"type": "tasks.resync"})
+        else:
+            await self.send_json({"type": "tasks.changed", "data": {"events": list(pending.values())}})
@@ -0,0 +1,45 @@
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from task_api.tasks.models import Task, TaskShare
+from task_api.utils.iterables import chunked
+
+
+def adjust_shares_count(shares, sign):
+    # shared_with входит в ответ API, поэтому вместе со счетчиком обновляется и updated_at
+    deltas = Counter(share.task_id for share in shares)
+    by_delta = defaultdict(list)
+    for task_id, delta in deltas.items():
+        by_delta[delta].append(task_id)
+
+    now = timezone.now()
+    for delta, task_ids in by_delta.items():
+        # разошедшийся счетчик не уходит ниже нуля (CHECK поля) — его исправит recount_task_shares
+        count = Greatest(F("shares_count") - delta, 0) if sign < 0 else F("shares_count") + delta
+        Task.objects.filter(pk__in=task_ids).update(shares_count=count, updated_at=now)
+
+
+def recount_shares(batch_size=1000):
+    """Пересчитывает `shares_count` пачками по диапазонам id, возвращает число исправленных задач."""
+    shares = (
+        TaskShare.objects.filter(task=OuterRef("pk"))
+        .order_by()
+        .values("task")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    actual = Coalesce(Subquery(shares), Value(0))
+
+    fixed = 0
+    task_ids = Task.objects.order_by("pk").values_list("pk", flat=True)
+    for batch in chunked(task_ids.iterator(chunk_size=batch_size), batch_size):
+        fixed += (
+            Task.objects.filter(pk__gte=batch[0], pk__lte=batch[-1])
+            .alias(actual=actual)
+            .exclude(shares_count=F("actual"))
+            .update(shares_count=actual)
+        )
+    return fixed
@@ -0,0 +1,89 @@
+import asyncio
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+SHARE_GRANTED = "share.granted"
+SHARE_REVOKED = "share.revoked"
+
+# тип сообщения слоя каналов, обработчик — TaskEventsConsumer.task_events
+MESSAGE_TYPE = "task.events"
+
+
+def user_group(user_id):
+    return f"tasks.user.{user_id}"
+
+
+def event_key(event):
+    if "id" in event:
+        return "task", event["id"]
+    return "share", event["task"], event["user"]
+
+
+def coalesce(pending, event):
+    """
+    Добавляет событие в буфер `{ключ: событие}`, оставляя по одному событию на задачу или расшаривание.
+
+    Последнее событие заменяет предыдущее, кроме изменения только что созданной задачи:
+    для клиента это по-прежнему новая задача.
+    """
+    key = event_key(event)
+    previous = pending.get(key)
+    if previous is not None and previous["type"] == TASK_CREATED and event["type"] == TASK_UPDATED:
+        return
+    pending[key] = event
+
+
+def publish(events_by_user):
+    """Рассылает события пользователям после фиксации транзакции, одним сообщением на пользователя."""
+    events_by_user = {user_id: events for user_id, events in events_by_user.items() if user_id is not None and events}
+    if settings.TASK_EVENTS_ENABLED and events_by_user:
+        # ошибка слоя каналов не должна ломать уже зафиксированный запрос
+        transaction.on_commit(lambda: send(events_by_user), robust=True)
+
+
+def publish_tasks(event_type, audience):
+    publish(
+        {
+            user_id: [{"type": event_type, "id": task_id} for task_id in task_ids]
+            for user_id, task_ids in audience.items()
+        }
+    )
+
+
+def publish_shares(event_type, shares, audience=None):
+    """
+    События расшаривания получают владелец и получатель; `audience` ({user_id: [task_id, ...]}) —
+    те, у кого вместе с расшариванием изменилась задача (shared_with), им уходит task.updated.
+    """
+    events_by_user = defaultdict(list)
+    for share in shares:
+        event = {"type": event_type, "task": share.task_id, "user": share.user_id}
+        if event_type == SHARE_GRANTED:
+            event["permission"] = share.permission
+        for user_id in {share.user_id, share.task.owner_id}:
+            events_by_user[user_id].append(event)
+    for user_id, task_ids in (audience or {}).items():
+        events_by_user[user_id].extend({"type": TASK_UPDATED, "id": task_id} for task_id in task_ids)
+    publish(events_by_user)
+
+
+def send(events_by_user):
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(_group_send)(channel_layer, events_by_user)
+
+
+async def _group_send(channel_layer, events_by_user):
+    await asyncio.gather(
+        *(
+            channel_layer.group_send(user_group(user_id), {"type": MESSAGE_TYPE, "events": events})
+            for user_id, events in events_by_user.items()
+        )
+    )
@@ -0,0 +1,79 @@
+import queue
+import threading
+
+from django.db import connections
+
+from task_api.tasks.models import Task
+
+# колонки полной выгрузки: все поля таблицы, кроме служебного поискового вектора
+DUMP_COLUMNS = [field.attname for field in Task._meta.concrete_fields if field.name != "search_vector"]
+
+# сколько кусков COPY держать в памяти, пока клиент их не забрал
+_COPY_BUFFER = 16
+
+
+class _CopyCancelled(Exception):  # noqa: N818
+    pass
+
+
+class _QueueWriter:
+    # файл для copy_expert: отдает куски в очередь и ждет, пока клиент их заберет
+    def __init__(self, chunks, stopped):
+        self.chunks = chunks
+        self.stopped = stopped
+
+    def write(self, data):
+        self.put(data)
+        return len(data)
+
+    def put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.chunks.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+        raise _CopyCancelled
+
+
+def copy_csv(queryset, columns=DUMP_COLUMNS):
+    """
+    Потоково выгружает queryset в CSV через `COPY (...) TO STDOUT` (только PostgreSQL).
+
+    COPY выполняется в отдельном потоке со своим соединением и пишет в очередь
+    ограниченного размера, поэтому память не растет, а медленный клиент
+    притормаживает сервер БД, а не накапливает данные в процессе.
+    """
+    alias = queryset.db
+    sql, params = queryset.values(*columns).query.get_compiler(alias).as_sql()
+    chunks = queue.Queue(maxsize=_COPY_BUFFER)
+    stopped = threading.Event()
+    errors = []
+
+    def run():
+        writer = _QueueWriter(chunks, stopped)
+        try:
+            with connections[alias].cursor() as cursor:
+                query = cursor.mogrify(sql, params).decode()
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", writer)
+        except _CopyCancelled:
+            pass
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections[alias].close()
+            try:
+                writer.put(None)
+            except _CopyCancelled:
+                pass
+
+    thread = threading.Thread(target=run, name="task-export-copy", daemon=True)
+    thread.start()
+    try:
+        while (chunk := chunks.get()) is not None:
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,104 @@
+import codecs
+import csv
+from itertools import islice
+
+import orjson
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from task_api.tasks import bulk
+from task_api.tasks.api.serializers import TaskSerializer
+from task_api.tasks.models import Task, TaskImport
+from task_api.utils.iterables import chunked
+
+
+class ImportConflict(Exception):  # noqa: N818
+    """Контрольную точку сдвинул другой обработчик того же импорта."""
+
+
+def read_ndjson(file):
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            yield None, {"non_field_errors": [f"Некорректный JSON: {exc}"]}
+            continue
+        if not isinstance(record, dict):
+            yield None, {"non_field_errors": ["Ожидался JSON-объект"]}
+            continue
+        yield record, None
+
+
+def read_csv(file):
+    # пустая ячейка — значение не указано; лишние колонки без заголовка отбрасываются
+    for row in csv.DictReader(codecs.getreader("utf-8-sig")(file)):
+        yield {key: value for key, value in row.items() if key is not None and value != ""}, None
+
+
+READERS = {TaskImport.Format.NDJSON: read_ndjson, TaskImport.Format.CSV: read_csv}
+
+
+def run_import(job, file, on_progress=None):
+    """
+    Импортирует задачи из открытого в двоичном режиме файла, начиная с контрольной точки.
+
+    Файл читается построчно, каждая пачка из `job.batch_size` строк проверяется
+    правилами полей TaskSerializer и записывается одной транзакцией вместе
+    с контрольной точкой, поэтому после сбоя импорт продолжается без дублей.
+    """
+    serializer = TaskSerializer()
+    TaskImport.objects.filter(pk=job.pk).update(status=TaskImport.Status.RUNNING, detail="", updated_at=timezone.now())
+    job.status = TaskImport.Status.RUNNING
+
+    records = enumerate(READERS[job.format](file), start=1)
+    try:
+        for batch in chunked(islice(records, job.processed_rows, None), job.batch_size):
+            tasks, errors = [], []
+            for row, (record, error) in batch:
+                if error is None:
+                    try:
+                        tasks.append(Task(owner_id=job.owner_id, **serializer.run_validation(record)))
+                    except ValidationError as exc:
+                        error = exc.detail
+                if error is not None:
+                    errors.append({"row": row, "errors": error})
+            save_batch(job, len(batch), tasks, errors)
+            if on_progress is not None:
+                on_progress(job)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        finish(job, TaskImport.Status.FAILED, f"Не удалось прочитать файл: {exc}")
+        return job
+
+    finish(job, TaskImport.Status.DONE)
+    return job
+
+
+@transaction.atomic
+def save_batch(job, rows, tasks, errors):
+    # контрольная точка сдвигается только с того значения, с которого читалась пачка
+    kept = errors[: max(settings.TASK_IMPORT_MAX_ERRORS - len(job.errors), 0)]
+    moved = TaskImport.objects.filter(pk=job.pk, processed_rows=job.processed_rows).update(
+        processed_rows=F("processed_rows") + rows,
+        created_count=F("created_count") + len(tasks),
+        error_count=F("error_count") + len(errors),
+        errors=job.errors + kept,
+        updated_at=timezone.now(),
+    )
+    if not moved:
+        raise ImportConflict(job.pk)
+    bulk.create_tasks(tasks)
+
+    job.processed_rows += rows
+    job.created_count += len(tasks)
+    job.error_count += len(errors)
+    job.errors = job.errors + kept
+
+
+def finish(job, status, detail=""):
+    job.status, job.detail, job.finished_at = status, detail, timezone.now()
+    job.save(update_fields=["status", "detail", "finished_at", "updated_at"])
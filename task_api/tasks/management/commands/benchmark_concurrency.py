@@ -0,0 +1,97 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный замер запущенных развертываний API: пропускная способность и задержки "
+        "при параллельных запросах, например WSGI против ASGI с API_ASYNC_VIEWS"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets",
+            nargs="+",
+            metavar="NAME=URL",
+            help="Развертывания для сравнения, например wsgi=http://localhost:8000 asgi=http://localhost:8001",
+        )
+        parser.add_argument(
+            "--path",
+            dest="paths",
+            action="append",
+            help="Путь запроса, можно указать несколько (по умолчанию /api/tasks/)",
+        )
+        credentials = parser.add_mutually_exclusive_group(required=True)
+        credentials.add_argument("--email", help="Пользователь, для которого выпускается access-токен")
+        credentials.add_argument("--token", help="Готовый access-токен")
+        parser.add_argument("--concurrency", type=int, default=50, help="Число одновременных запросов")
+        parser.add_argument("--requests", type=int, default=1000, help="Число запросов на развертывание")
+        parser.add_argument("--workers", type=int, default=1, help="Число воркеров сервера, для расчета на воркер")
+        parser.add_argument("--timeout", type=float, default=30, help="Таймаут запроса в секундах")
+
+    def handle(self, *args, targets, paths, email, token, concurrency, requests, workers, timeout, **options):
+        targets = [self.parse_target(target) for target in targets]
+        headers = {"Authorization": f"Bearer {token or self.issue_token(email)}", "Accept": "application/json"}
+        paths = paths or ["/api/tasks/"]
+
+        self.stdout.write(
+            f"{'развертывание':<14} {'запр/с':>8} {'на воркер':>10} {'p50, мс':>8} {'p95, мс':>8} "
+            f"{'p99, мс':>8} {'ошибок':>7}"
+        )
+        for name, base_url in targets:
+            urls = [base_url + path for path in paths]
+
+            def fetch(url):
+                return self.fetch(url, headers, timeout)
+
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                # прогрев: соединения с БД и кэши процесса сервера
+                list(executor.map(fetch, islice(cycle(urls), concurrency)))
+                started = time.perf_counter()
+                results = list(executor.map(fetch, islice(cycle(urls), requests)))
+                elapsed = time.perf_counter() - started
+
+            latencies = [latency * 1000 for latency, ok in results]
+            errors = sum(not ok for _, ok in results)
+            throughput = len(results) / elapsed
+            p50, p95, p99 = self.percentiles(latencies)
+            self.stdout.write(
+                f"{name:<14} {throughput:>8.0f} {throughput / workers:>10.0f} {p50:>8.1f} {p95:>8.1f} "
+                f"{p99:>8.1f} {errors:>7}"
+            )
+
+    def parse_target(self, target):
+        name, separator, url = target.partition("=")
+        if not separator or not name or not url.startswith(("http://", "https://")):
+            raise CommandError(f"Ожидалось NAME=URL, получено {target!r}")
+        return name, url.rstrip("/")
+
+    def issue_token(self, email):
+        user = get_user_model().objects.filter(email=email).first()
+        if user is None:
+            raise CommandError(f"Пользователь {email} не найден")
+        return str(AccessToken.for_user(user))
+
+    def fetch(self, url, headers, timeout):
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    def percentiles(self, values):
+        if len(values) < 2:
+            return values * 3 if values else [0.0] * 3
+        quantiles = statistics.quantiles(values, n=100)
+        return quantiles[49], quantiles[94], quantiles[98]
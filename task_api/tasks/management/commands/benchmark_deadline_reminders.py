@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+from itertools import cycle
+
+from django.conf import settings
+from django.core import mail
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from task_api.tasks import bulk
+from task_api.tasks.benchmarking import create_owners, rollback
+from task_api.tasks.models import Task
+from task_api.tasks.reminders import REMINDER_STATUSES, due_window, send_reminders
+
+
+def send_per_task(day):
+    """Прежняя рассылка: письмо на каждую задачу, условие `deadline__date`."""
+    tasks = Task.objects.filter(deadline__date=day, status__in=REMINDER_STATUSES).select_related("owner")
+    for task in tasks:
+        send_mail(
+            subject=f"Напоминание: задача '{task.title}' должна быть выполнена завтра",
+            message=f"Название: {task.title}\nОписание: {task.description}\n",
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[task.owner.email],
+            fail_silently=True,
+        )
+
+
+class Command(BaseCommand):
+    help = "Сравнивает рассылку напоминаний по одной задаче и сводными письмами (почта в памяти)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=100_000, help="Число задач со сроком завтра")
+        parser.add_argument("--owners", type=int, default=1000, help="Число владельцев задач")
+
+    def handle(self, *args, tasks, owners, **options):
+        day = timezone.localdate() + timedelta(days=1)
+        start, _ = due_window(day)
+        with rollback(), override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"):
+            owner_cycle = cycle(create_owners(owners))
+            bulk.create_tasks(
+                Task(
+                    title=f"Задача №{number}",
+                    description="Описание задачи для замера производительности",
+                    status=REMINDER_STATUSES[number % 2],
+                    deadline=start + timedelta(seconds=number * 86400 // tasks),
+                    owner=next(owner_cycle),
+                )
+                for number in range(tasks)
+            )
+
+            self.stdout.write(f"{'способ':<12} {'время, с':>9} {'запросов':>9} {'писем':>7}")
+            for name, send in [("по задаче", send_per_task), ("сводками", send_reminders)]:
+                mail.outbox = []
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    send(day)
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(f"{name:<12} {elapsed:>9.2f} {len(queries):>9} {len(mail.outbox):>7}")
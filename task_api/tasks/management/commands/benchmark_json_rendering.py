@@ -0,0 +1,57 @@
+import io
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from task_api.tasks.api.serializers import TaskSerializer
+from task_api.tasks.benchmarking import create_owner, create_tasks, median_time, rollback
+from task_api.tasks.models import Task
+from task_api.utils.parsers import ORJSONParser
+from task_api.utils.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = "Сравнивает JSON-рендерер и парсер DRF с вариантами на orjson на выводе TaskSerializer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[20, 100, 1000], help="Размеры страниц")
+        parser.add_argument("--repeat", type=int, default=200, help="Число повторов для каждого размера")
+
+    def handle(self, *args, rows, repeat, **options):
+        with rollback():
+            owner = create_owner()
+            create_tasks(owner, max(rows))
+            request = APIRequestFactory().get("/api/tasks/")
+            force_authenticate(request, user=owner)
+            context = {"request": Request(request)}
+            tasks = list(Task.objects.visible_to(owner).select_related("owner").order_by("pk")[: max(rows)])
+
+            self.stdout.write(f"{'строк':>6} {'операция':>10} {'json, мс':>10} {'orjson, мс':>11} {'ускорение':>10}")
+            for count in rows:
+                data = TaskSerializer(tasks[:count], many=True, context=context).data
+                body = JSONRenderer().render(data)
+                if ORJSONRenderer().render(data) != body:
+                    self.stderr.write(self.style.ERROR(f"Вывод рендереров различается на {count} строках"))
+
+                self.compare(
+                    count, "рендер", JSONRenderer(), ORJSONRenderer(), lambda renderer: renderer.render(data), repeat
+                )
+                self.compare(
+                    count,
+                    "разбор",
+                    JSONParser(),
+                    ORJSONParser(),
+                    lambda parser: parser.parse(io.BytesIO(body), parser_context={"encoding": "utf-8"}),
+                    repeat,
+                )
+
+    def compare(self, count, operation, default, fast, run, repeat):
+        slow_time = median_time(lambda: run(default), repeat)
+        fast_time = median_time(lambda: run(fast), repeat)
+        speedup = slow_time / fast_time
+        self.stdout.write(
+            f"{count:>6} {operation:>10} {slow_time * 1000:>10.3f} {fast_time * 1000:>11.3f} {speedup:>9.1f}x"
+        )
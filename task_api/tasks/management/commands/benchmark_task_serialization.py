@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from task_api.tasks.api.rows import TaskRowSerializer
+from task_api.tasks.api.serializers import TaskSerializer
+from task_api.tasks.benchmarking import create_owner, create_tasks, median_time, rollback
+from task_api.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = "Сравнивает сериализацию списка задач через TaskSerializer и через строки values()"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[20, 100, 1000], help="Размеры страниц")
+        parser.add_argument("--repeat", type=int, default=50, help="Число повторов для каждого размера")
+
+    def handle(self, *args, rows, repeat, **options):
+        with rollback():
+            owner = create_owner()
+            create_tasks(owner, max(rows))
+            request = APIRequestFactory().get("/api/tasks/")
+            force_authenticate(request, user=owner)
+            context = {"request": Request(request)}
+            queryset = Task.objects.visible_to(owner).select_related("owner").order_by("pk")
+
+            self.stdout.write(f"{'строк':>6} {'TaskSerializer, мс':>20} {'values(), мс':>14} {'ускорение':>10}")
+            for count in rows:
+                page = queryset[:count]
+
+                def model_path(page=page):
+                    return TaskSerializer(list(page.all()), many=True, context=context).data
+
+                def rows_path(page=page):
+                    serializer = TaskRowSerializer(TaskSerializer(context=context))
+                    return serializer.to_representation(list(serializer.values(page)))
+
+                slow = median_time(model_path, repeat)
+                fast = median_time(rows_path, repeat)
+                self.stdout.write(f"{count:>6} {slow * 1000:>20.2f} {fast * 1000:>14.2f} {slow / fast:>9.1f}x")
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from task_api.tasks.imports import run_import
+from task_api.tasks.models import TaskImport
+
+
+class Command(BaseCommand):
+    help = "Импортирует задачи из локального файла CSV или NDJSON пачками с контрольной точкой"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу")
+        parser.add_argument("--owner", help="Email владельца задач (для нового импорта)")
+        parser.add_argument("--format", choices=TaskImport.Format.values, help="Формат файла")
+        parser.add_argument("--batch-size", type=int, default=settings.TASK_IMPORT_BATCH_SIZE, help="Строк в пачке")
+        parser.add_argument("--resume", type=int, metavar="ID", help="Продолжить импорт с контрольной точки")
+
+    def handle(self, *args, path, owner, format, batch_size, resume, **options):
+        path = Path(path)
+        if not path.is_file():
+            raise CommandError(f"Файл {path} не найден")
+
+        if resume is not None:
+            job = TaskImport.objects.filter(pk=resume).first()
+            if job is None:
+                raise CommandError(f"Импорт {resume} не найден")
+            self.stdout.write(f"Продолжение импорта {job.pk} со строки {job.processed_rows + 1}")
+        else:
+            job = self.create_job(path, owner, format, batch_size)
+            self.stdout.write(f"Импорт {job.pk}: {path}")
+
+        with path.open("rb") as file:
+            run_import(job, file, on_progress=self.report)
+
+        if job.status == TaskImport.Status.FAILED:
+            raise CommandError(job.detail)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово: обработано {job.processed_rows}, создано {job.created_count}, ошибок {job.error_count}"
+            )
+        )
+        for error in job.errors:
+            self.stdout.write(f"Строка {error['row']}: {error['errors']}")
+
+    def create_job(self, path, owner, format, batch_size):
+        if not owner:
+            raise CommandError("Укажите --owner для нового импорта")
+        user = get_user_model().objects.filter(email=owner).first()
+        if user is None:
+            raise CommandError(f"Пользователь {owner} не найден")
+        format = format or TaskImport.format_for(path.name)
+        if format is None:
+            raise CommandError("Не удалось определить формат по имени файла, укажите --format")
+        if batch_size < 1:
+            raise CommandError("--batch-size должен быть положительным")
+        return TaskImport.objects.create(owner=user, format=format, batch_size=batch_size)
+
+    def report(self, job):
+        self.stdout.write(f"Обработано {job.processed_rows}, создано {job.created_count}, ошибок {job.error_count}")
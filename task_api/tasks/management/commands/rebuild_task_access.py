@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_api.tasks.access import check_task_access, rebuild_task_access
+
+
+class Command(BaseCommand):
+    help = "Проверяет или перестраивает денормализованную таблицу доступа к задачам (TaskAccess)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Только проверить, ничего не изменяя")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, check=False, batch_size=1000, **options):
+        if check:
+            stats = check_task_access()
+        else:
+            stats = rebuild_task_access(batch_size=batch_size)
+
+        for name, value in stats.items():
+            self.stdout.write(f"{name}: {value}")
+
+        if check and any(stats.values()):
+            raise CommandError("Таблица доступа к задачам рассинхронизирована")
+        if not check:
+            self.stdout.write(self.style.SUCCESS("Таблица доступа к задачам синхронизирована"))
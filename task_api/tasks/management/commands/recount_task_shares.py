@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from task_api.tasks.counters import recount_shares
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сохраненное количество расшариваний задач (Task.shares_count)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, batch_size=1000, **options):
+        fixed = recount_shares(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Исправлено задач: {fixed}"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from task_api.tasks.caching import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Показывает число попаданий и промахов кэша списка задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Обнулить счетчики после вывода")
+
+    def handle(self, *args, reset=False, **options):
+        stats = cache_stats()
+        self.stdout.write(f"Попадания: {stats['hits']}")
+        self.stdout.write(f"Промахи: {stats['misses']}")
+        self.stdout.write(f"Доля попаданий: {stats['hit_ratio']:.1%}")
+        if reset:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Счетчики обнулены"))
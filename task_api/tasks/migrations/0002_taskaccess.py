@@ -0,0 +1,151 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:26
+
+from itertools import chain, islice
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SORT_FIELDS = ["status", "priority", "deadline", "created_at"]
+BATCH_SIZE = 2000
+
+
+def populate_task_access(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskShare = apps.get_model("tasks", "TaskShare")
+    TaskAccess = apps.get_model("tasks", "TaskAccess")
+
+    owners = (
+        TaskAccess(
+            user_id=task.owner_id,
+            task_id=task.pk,
+            level="owner",
+            **{field: getattr(task, field) for field in SORT_FIELDS},
+        )
+        for task in Task.objects.iterator(chunk_size=BATCH_SIZE)
+    )
+    shares = (
+        TaskAccess(
+            user_id=share.user_id,
+            task_id=share.task_id,
+            level=share.permission,
+            **{field: getattr(share.task, field) for field in SORT_FIELDS},
+        )
+        for share in TaskShare.objects.select_related("task")
+        .exclude(user_id=models.F("task__owner_id"))
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    rows = chain(owners, shares)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        TaskAccess.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskAccess",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "level",
+                    models.CharField(
+                        choices=[
+                            ("owner", "Владелец"),
+                            ("edit", "Редактирование"),
+                            ("view", "Просмотр"),
+                        ],
+                        max_length=10,
+                        verbose_name="Уровень доступа",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("new", "Новая"),
+                            ("in_progress", "В работе"),
+                            ("done", "Завершена"),
+                        ],
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("low", "Низкий"),
+                            ("medium", "Средний"),
+                            ("high", "Высокий"),
+                        ],
+                        max_length=20,
+                        verbose_name="Приоритет",
+                    ),
+                ),
+                (
+                    "deadline",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Крайний срок"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(verbose_name="Дата создания задачи"),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="access",
+                        to="tasks.task",
+                        verbose_name="Задача",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_access",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Доступ к задаче",
+                "verbose_name_plural": "Доступы к задачам",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-created_at", "-task"],
+                        name="tasks_taska_user_id_8be8c0_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "deadline", "task"],
+                        name="tasks_taska_user_id_c28534_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "priority", "task"],
+                        name="tasks_taska_user_id_9d8c51_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "status", "task"],
+                        name="tasks_taska_user_id_feef90_idx",
+                    ),
+                ],
+                "unique_together": {("user", "task")},
+            },
+        ),
+        migrations.RunPython(populate_task_access, migrations.RunPython.noop),
+    ]
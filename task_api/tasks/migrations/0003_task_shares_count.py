@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:28
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_shares_count(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskShare = apps.get_model("tasks", "TaskShare")
+
+    shares = (
+        TaskShare.objects.filter(task=OuterRef("pk"))
+        .order_by()
+        .values("task")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Task.objects.update(shares_count=Coalesce(Subquery(shares), Value(0)))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0002_taskaccess"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="shares_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество расшариваний"
+            ),
+        ),
+        migrations.RunPython(populate_shares_count, migrations.RunPython.noop),
+    ]
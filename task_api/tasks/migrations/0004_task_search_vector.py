@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:31
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# поиск ведется сразу по русской и английской морфологии (LANGUAGE_CODE = "ru-RU"),
+# заголовок весит больше описания
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION tasks_task_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.russian', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.russian', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tasks_task_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON tasks_task
+    FOR EACH ROW EXECUTE FUNCTION tasks_task_search_vector_update();
+
+UPDATE tasks_task SET title = title;
+
+CREATE INDEX tasks_task_search_vector_gin ON tasks_task USING gin (search_vector);
+"""
+
+DROP_TRIGGER = """
+DROP INDEX IF EXISTS tasks_task_search_vector_gin;
+DROP TRIGGER IF EXISTS tasks_task_search_vector_trigger ON tasks_task;
+DROP FUNCTION IF EXISTS tasks_task_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0003_task_shares_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Поисковый вектор"
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
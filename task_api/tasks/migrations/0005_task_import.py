@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tasks", "0004_task_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskImport",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("file", models.FileField(blank=True, upload_to="task_imports/", verbose_name="Файл")),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[("ndjson", "NDJSON"), ("csv", "CSV")], max_length=10, verbose_name="Формат"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В очереди"),
+                            ("running", "Выполняется"),
+                            ("done", "Завершен"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                ("batch_size", models.PositiveIntegerField(verbose_name="Размер пачки")),
+                ("processed_rows", models.PositiveIntegerField(default=0, verbose_name="Обработано строк")),
+                ("created_count", models.PositiveIntegerField(default=0, verbose_name="Создано задач")),
+                ("error_count", models.PositiveIntegerField(default=0, verbose_name="Строк с ошибками")),
+                ("errors", models.JSONField(blank=True, default=list, verbose_name="Ошибки")),
+                ("detail", models.TextField(blank=True, verbose_name="Причина ошибки")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Дата обновления")),
+                ("finished_at", models.DateTimeField(blank=True, null=True, verbose_name="Дата завершения")),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_imports",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Владелец",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Импорт задач",
+                "verbose_name_plural": "Импорты задач",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
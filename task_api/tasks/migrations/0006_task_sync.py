@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tasks", "0005_task_import"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskTombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("task_id", models.BigIntegerField(verbose_name="Задача")),
+                ("seq", models.BigIntegerField(verbose_name="Отметка изменения")),
+                ("deleted_at", models.DateTimeField(auto_now=True, verbose_name="Дата удаления")),
+            ],
+            options={
+                "verbose_name": "Удаленная задача",
+                "verbose_name_plural": "Удаленные задачи",
+            },
+        ),
+        migrations.AddField(
+            model_name="taskaccess",
+            name="seq",
+            field=models.BigIntegerField(default=0, verbose_name="Отметка изменения"),
+        ),
+        migrations.AddIndex(
+            model_name="taskaccess",
+            index=models.Index(fields=["user", "seq", "task"], name="tasks_taska_user_id_ed7135_idx"),
+        ),
+        migrations.AddField(
+            model_name="tasktombstone",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="task_tombstones",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tasktombstone",
+            index=models.Index(fields=["user", "seq", "task_id"], name="tasks_taskt_user_id_15dcd0_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tasktombstone",
+            index=models.Index(fields=["deleted_at"], name="tasks_taskt_deleted_f1de3a_idx"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="tasktombstone",
+            unique_together={("user", "task_id")},
+        ),
+    ]
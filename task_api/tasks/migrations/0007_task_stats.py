@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_user_trigram_indexes"),
+        ("tasks", "0006_task_sync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="task_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+                ("total", models.IntegerField(default=0, verbose_name="Всего")),
+                ("status_new", models.IntegerField(default=0, verbose_name="Новые")),
+                ("status_in_progress", models.IntegerField(default=0, verbose_name="В работе")),
+                ("status_done", models.IntegerField(default=0, verbose_name="Завершенные")),
+                ("priority_low", models.IntegerField(default=0, verbose_name="Низкий приоритет")),
+                ("priority_medium", models.IntegerField(default=0, verbose_name="Средний приоритет")),
+                ("priority_high", models.IntegerField(default=0, verbose_name="Высокий приоритет")),
+                ("overdue", models.IntegerField(default=0, verbose_name="Просроченные")),
+                ("checked_at", models.DateTimeField(verbose_name="Пересчитано")),
+            ],
+            options={
+                "verbose_name": "Сводка по задачам",
+                "verbose_name_plural": "Сводки по задачам",
+            },
+        ),
+    ]
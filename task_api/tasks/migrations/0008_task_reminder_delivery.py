@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tasks", "0007_task_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskReminderDelivery",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField(verbose_name="День срока")),
+                ("claim", models.CharField(max_length=32, verbose_name="Отправитель")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")),
+                ("sent_at", models.DateTimeField(blank=True, null=True, verbose_name="Дата отправки")),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_reminder_deliveries",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Владелец",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Отправка напоминания",
+                "verbose_name_plural": "Отправки напоминаний",
+                "indexes": [models.Index(fields=["day"], name="tasks_taskr_day_10c6ec_idx")],
+                "unique_together": {("owner", "day")},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:47
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def schedule_reminders(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    now = timezone.now()
+    tasks = (
+        Task.objects.filter(deadline__gt=now)
+        .exclude(status="done")
+        .order_by("pk")
+        .only("pk", "deadline")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    batch = []
+    for task in tasks:
+        times = [task.deadline - offset for offset in settings.TASK_REMINDER_OFFSETS]
+        task.next_reminder_at = min((time for time in times if time > now), default=None)
+        if task.next_reminder_at is not None:
+            batch.append(task)
+        if len(batch) == BATCH_SIZE:
+            Task.objects.bulk_update(batch, ["next_reminder_at"])
+            batch = []
+    Task.objects.bulk_update(batch, ["next_reminder_at"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0008_task_reminder_delivery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="next_reminder_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name="Следующее напоминание"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("next_reminder_at__isnull", False)),
+                fields=["next_reminder_at"],
+                name="tasks_task_next_reminder_idx",
+            ),
+        ),
+        migrations.RunPython(schedule_reminders, migrations.RunPython.noop),
+    ]
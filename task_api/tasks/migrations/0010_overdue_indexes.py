@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:50
+
+from django.db import migrations, models
+
+# миграция без общей транзакции: в PostgreSQL индексы строятся CONCURRENTLY
+# и не блокируют запись в tasks_task и tasks_taskaccess
+INDEXES = [
+    (
+        "task",
+        models.Index(
+            condition=models.Q(("status", "done"), _negated=True),
+            fields=["owner", "deadline"],
+            name="tasks_task_owner_open_dl_idx",
+        ),
+    ),
+    (
+        "taskaccess",
+        models.Index(
+            condition=models.Q(("status", "done"), _negated=True),
+            fields=["user", "deadline", "task"],
+            name="tasks_access_open_dl_idx",
+        ),
+    ),
+]
+
+
+def _concurrently(schema_editor):
+    return {"concurrently": True} if schema_editor.connection.vendor == "postgresql" else {}
+
+
+def add_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        schema_editor.add_index(apps.get_model("tasks", model_name), index, **_concurrently(schema_editor))
+
+
+def remove_indexes(apps, schema_editor):
+    for model_name, index in INDEXES:
+        schema_editor.remove_index(apps.get_model("tasks", model_name), index, **_concurrently(schema_editor))
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0009_task_next_reminder_at"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(add_indexes, remove_indexes)],
+            state_operations=[migrations.AddIndex(model_name=model_name, index=index) for model_name, index in INDEXES],
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:56
+
+from django.db import migrations, models
+from django.db.models import Case, Max, Value, When
+
+# миграция без общей транзакции: каждая пачка фиксируется отдельно и держит
+# блокировки строк недолго, индексы в PostgreSQL строятся CONCURRENTLY
+BATCH_SIZE = 5000
+STATUS_RANKS = {"new": 1, "in_progress": 2, "done": 3}
+PRIORITY_RANKS = {"low": 1, "medium": 2, "high": 3}
+
+NEW_INDEXES = [
+    ("task", models.Index(fields=["owner", "status_rank"], name="tasks_task_owner_i_1c150f_idx")),
+    ("task", models.Index(fields=["owner", "priority_rank"], name="tasks_task_owner_i_35a79e_idx")),
+    ("taskaccess", models.Index(fields=["user", "priority_rank", "task"], name="tasks_taska_user_id_cf535c_idx")),
+    ("taskaccess", models.Index(fields=["user", "status_rank", "task"], name="tasks_taska_user_id_4c0552_idx")),
+]
+OLD_INDEXES = [
+    ("taskaccess", models.Index(fields=["user", "priority", "task"], name="tasks_taska_user_id_9d8c51_idx")),
+    ("taskaccess", models.Index(fields=["user", "status", "task"], name="tasks_taska_user_id_feef90_idx")),
+]
+
+
+def _rank(field, ranks):
+    return Case(*(When(**{field: value}, then=Value(rank)) for value, rank in ranks.items()), default=Value(0))
+
+
+def fill_ranks(apps, schema_editor):
+    for model_name in ["Task", "TaskAccess"]:
+        model = apps.get_model("tasks", model_name)
+        last = model.objects.aggregate(last=Max("pk"))["last"] or 0
+        for start in range(0, last + 1, BATCH_SIZE):
+            model.objects.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).update(
+                status_rank=_rank("status", STATUS_RANKS), priority_rank=_rank("priority", PRIORITY_RANKS)
+            )
+
+
+def _concurrently(schema_editor):
+    return {"concurrently": True} if schema_editor.connection.vendor == "postgresql" else {}
+
+
+def add_indexes(apps, schema_editor):
+    for model_name, index in NEW_INDEXES:
+        schema_editor.add_index(apps.get_model("tasks", model_name), index, **_concurrently(schema_editor))
+    for model_name, index in OLD_INDEXES:
+        schema_editor.remove_index(apps.get_model("tasks", model_name), index, **_concurrently(schema_editor))
+
+
+def remove_indexes(apps, schema_editor):
+    for model_name, index in OLD_INDEXES:
+        schema_editor.add_index(apps.get_model("tasks", model_name), index, **_concurrently(schema_editor))
+    for model_name, index in NEW_INDEXES:
+        schema_editor.remove_index(apps.get_model("tasks", model_name), index, **_concurrently(schema_editor))
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0010_overdue_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="priority_rank",
+            field=models.PositiveSmallIntegerField(default=2, editable=False, verbose_name="Порядок приоритета"),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="status_rank",
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name="Порядок статуса"),
+        ),
+        migrations.AddField(
+            model_name="taskaccess",
+            name="priority_rank",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="Порядок приоритета"),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="taskaccess",
+            name="status_rank",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="Порядок статуса"),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_ranks, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(add_indexes, remove_indexes)],
+            state_operations=[
+                *(migrations.AddIndex(model_name=model_name, index=index) for model_name, index in NEW_INDEXES),
+                *(migrations.RemoveIndex(model_name=model_name, name=index.name) for model_name, index in OLD_INDEXES),
+            ],
+        ),
+    ]
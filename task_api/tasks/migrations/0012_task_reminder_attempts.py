@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0011_task_sort_ranks"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="taskreminderdelivery",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="reminder_attempts",
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name="Попыток напоминания"),
+        ),
+        migrations.AddField(
+            model_name="taskreminderdelivery",
+            name="error",
+            field=models.TextField(blank=True, verbose_name="Ошибка"),
+        ),
+        migrations.AddField(
+            model_name="taskreminderdelivery",
+            name="failed_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Дата отказа"),
+        ),
+        migrations.AddField(
+            model_name="taskreminderdelivery",
+            name="task",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reminder_failures",
+                to="tasks.task",
+                verbose_name="Задача",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskreminderdelivery",
+            name="claim",
+            field=models.CharField(blank=True, max_length=32, verbose_name="Отправитель"),
+        ),
+        migrations.AddConstraint(
+            model_name="taskreminderdelivery",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("task__isnull", True)),
+                fields=("owner", "day"),
+                name="tasks_reminder_delivery_owner_day_uniq",
+            ),
+        ),
+    ]
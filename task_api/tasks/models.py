@@ -1,8 +1,47 @@
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import BooleanField, Case, F, FilteredRelation, Q, Value, When
 from django.utils import timezone
 
 
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        # одна строка TaskAccess на пару (пользователь, задача) — DISTINCT не нужен
+        return self.alias(viewer_access=FilteredRelation("access", condition=Q(access__user=user))).filter(
+            viewer_access__user=user
+        )
+
+    def with_access_level(self):
+        # уровень доступа того же пользователя, что и в visible_to, из уже присоединенной строки
+        return self.annotate(access_level=F("viewer_access__level"))
+
+    def with_access_fields(self):
+        # копии полей задачи из строки доступа visible_to под именами access_<поле>: alias
+        # переиспользует ее join, а filter() по обратной связи присоединил бы TaskAccess еще раз
+        return self.alias(**{f"access_{field}": F(f"viewer_access__{field}") for field in TaskAccess.SORT_FIELDS})
+
+    # `prefix` — префикс копий полей задачи, например "access_" после with_access_fields
+    def overdue(self, value=True, now=None, prefix=""):
+        condition = Task.overdue_q(now, prefix) if value else Task.not_overdue_q(now, prefix)
+        return self.filter(condition)
+
+    def with_overdue(self, now=None, prefix=""):
+        """Аннотация `is_overdue`, вычисленная в SQL: по ней можно сортировать и агрегировать."""
+        return self.annotate(
+            is_overdue=Case(
+                When(Task.overdue_q(now, prefix), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        )
+
+
+class TaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
+
 class Task(models.Model):
     class Status(models.TextChoices):
         NEW = "new", "Новая"
@@ -14,20 +53,46 @@ class Priority(models.TextChoices):
         MEDIUM = "medium", "Средний"
         HIGH = "high", "Высокий"
 
+    # порядок сортировки — порядок значений в choices, а не алфавитный
+    STATUS_RANKS = {value: rank for rank, value in enumerate(Status.values, 1)}
+    PRIORITY_RANKS = {value: rank for rank, value in enumerate(Priority.values, 1)}
+
     title = models.CharField("Название", max_length=255)
     description = models.TextField("Описание", blank=True)
     status = models.CharField("Статус", max_length=20, choices=Status.choices, default=Status.NEW)
     priority = models.CharField("Приоритет", max_length=20, choices=Priority.choices, default=Priority.MEDIUM)
     deadline = models.DateTimeField("Крайний срок", null=True, blank=True)
+    # ключи сортировки по status и priority, задаются при сохранении (см. set_sort_ranks)
+    status_rank = models.PositiveSmallIntegerField("Порядок статуса", default=STATUS_RANKS[Status.NEW], editable=False)
+    priority_rank = models.PositiveSmallIntegerField(
+        "Порядок приоритета", default=PRIORITY_RANKS[Priority.MEDIUM], editable=False
+    )
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="owned_tasks",
         verbose_name="Владелец",
     )
+    shares_count = models.PositiveIntegerField("Количество расшариваний", default=0, editable=False)
+    # ближайшее напоминание о сроке (settings.TASK_REMINDER_OFFSETS до deadline);
+    # пересчитывается при изменении срока или статуса и после отправки напоминания
+    next_reminder_at = models.DateTimeField("Следующее напоминание", null=True, blank=True, editable=False)
+    # неудачные попытки отправить напоминание next_reminder_at, от них растет пауза до повтора
+    reminder_attempts = models.PositiveSmallIntegerField("Попыток напоминания", default=0, editable=False)
+    # заполняется триггером в PostgreSQL (см. миграцию 0004), GIN-индекс создается там же
+    search_vector = SearchVectorField("Поисковый вектор", null=True, editable=False)
     created_at = models.DateTimeField("Дата создания", auto_now_add=True)
     updated_at = models.DateTimeField("Дата обновления", auto_now=True)
 
+    objects = TaskManager()
+
+    # поля, которые обычное сохранение не трогает: счетчики меняются атомарными
+    # UPDATE ... SET x = x + 1, поисковый вектор — триггером, напоминание — рассылкой
+    # (и при изменении срока или статуса, см. save)
+    DB_MANAGED_FIELDS = ["shares_count", "search_vector", "next_reminder_at", "reminder_attempts"]
+    REMINDER_FIELDS = ["deadline", "status"]
+    RANK_FIELDS = {"status": "status_rank", "priority": "priority_rank"}
+
     class Meta:
         verbose_name = "Задача"
         verbose_name_plural = "Задачи"
@@ -35,19 +100,107 @@ class Meta:
         indexes = [
             models.Index(fields=["owner", "status"]),
             models.Index(fields=["owner", "priority"]),
+            models.Index(fields=["owner", "status_rank"]),
+            models.Index(fields=["owner", "priority_rank"]),
             models.Index(fields=["deadline"]),
             models.Index(fields=["-created_at"]),
+            # просроченные задачи владельца: завершенные в индекс не попадают
+            models.Index(
+                fields=["owner", "deadline"], name="tasks_task_owner_open_dl_idx", condition=~Q(status="done")
+            ),
+            # очередь напоминаний: в индекс попадают только задачи с запланированным напоминанием
+            models.Index(
+                fields=["next_reminder_at"],
+                name="tasks_task_next_reminder_idx",
+                condition=Q(next_reminder_at__isnull=False),
+            ),
         ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        reschedule = self.reminder_schedule_changed() and (
+            update_fields is None or not set(self.REMINDER_FIELDS).isdisjoint(update_fields)
+        )
+        if reschedule:
+            self.next_reminder_at = self.reminder_time_after(timezone.now())
+            self.reminder_attempts = 0
+        self.set_sort_ranks()
+        if not self._state.adding and update_fields is None:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DB_MANAGED_FIELDS
+            ]
+        if update_fields is not None:
+            update_fields = list(update_fields)
+            if reschedule:
+                update_fields.extend(
+                    field for field in ["next_reminder_at", "reminder_attempts"] if field not in update_fields
+                )
+            update_fields.extend(
+                rank for field, rank in self.RANK_FIELDS.items() if field in update_fields and rank not in update_fields
+            )
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+        self._loaded_schedule = self._reminder_schedule()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_schedule = instance._reminder_schedule()
+        return instance
+
+    def _reminder_schedule(self):
+        # отложенные поля не загружаются ради сравнения
+        return tuple(self.__dict__.get(name, models.DEFERRED) for name in self.REMINDER_FIELDS)
+
+    def reminder_schedule_changed(self):
+        return self._state.adding or getattr(self, "_loaded_schedule", None) != self._reminder_schedule()
+
+    @staticmethod
+    def overdue_q(now=None, prefix=""):
+        # то же условие, что у частичных индексов *_open_dl_idx, иначе планировщик их не выберет
+        return Q(**{f"{prefix}deadline__lt": now or timezone.now()}) & ~Q(**{f"{prefix}status": Task.Status.DONE})
+
+    @staticmethod
+    def not_overdue_q(now=None, prefix=""):
+        # без NOT поверх всего условия: каждая ветка OR читается своим индексом
+        return (
+            Q(**{f"{prefix}deadline__isnull": True})
+            | Q(**{f"{prefix}deadline__gte": now or timezone.now()})
+            | Q(**{f"{prefix}status": Task.Status.DONE})
+        )
+
+    def set_sort_ranks(self):
+        # отложенные поля не загружаются: их ключи и так не пересохраняются
+        if "status" in self.__dict__:
+            self.status_rank = self.STATUS_RANKS.get(self.status, 0)
+        if "priority" in self.__dict__:
+            self.priority_rank = self.PRIORITY_RANKS.get(self.priority, 0)
+
+    def reminder_time_after(self, moment):
+        """Ближайшее напоминание позже `moment` или None."""
+        if self.deadline is None or self.status == self.Status.DONE:
+            return None
+        times = [self.deadline - offset for offset in settings.TASK_REMINDER_OFFSETS]
+        return min((time for time in times if time > moment), default=None)
+
     @property
     def is_overdue(self):
+        # значение из аннотации with_overdue(), если задача загружена с ней
+        if "is_overdue" in self.__dict__:
+            return self.__dict__["is_overdue"]
         if self.deadline and self.status != self.Status.DONE:
             return timezone.now() > self.deadline
         return False
 
+    @is_overdue.setter
+    def is_overdue(self, value):
+        self.__dict__["is_overdue"] = value
+
 
 class TaskShare(models.Model):
     class Permission(models.TextChoices):
@@ -79,3 +232,223 @@ class Meta:
 
     def __str__(self):
         return f"{self.task.title} - {self.user.email} ({self.get_permission_display()})"
+
+
+class TaskAccess(models.Model):
+    """
+    Денормализованная таблица видимости: строка для владельца и для каждого
+    расшаривания. Поля сортировки скопированы из задачи, чтобы списки задач
+    читались диапазоном по индексу `(user, <поле>)`.
+
+    `seq` — отметка последнего изменения задачи или доступа к ней
+    (см. `task_api.tasks.sync`), по ней отдаются изменения с токена синхронизации.
+    """
+
+    class Level(models.TextChoices):
+        OWNER = "owner", "Владелец"
+        EDIT = "edit", "Редактирование"
+        VIEW = "view", "Просмотр"
+
+    SORT_FIELDS = ["status", "priority", "deadline", "created_at", "status_rank", "priority_rank"]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="task_access",
+        verbose_name="Пользователь",
+    )
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="access", verbose_name="Задача")
+    level = models.CharField("Уровень доступа", max_length=10, choices=Level.choices)
+    status = models.CharField("Статус", max_length=20, choices=Task.Status.choices)
+    priority = models.CharField("Приоритет", max_length=20, choices=Task.Priority.choices)
+    deadline = models.DateTimeField("Крайний срок", null=True, blank=True)
+    created_at = models.DateTimeField("Дата создания задачи")
+    status_rank = models.PositiveSmallIntegerField("Порядок статуса")
+    priority_rank = models.PositiveSmallIntegerField("Порядок приоритета")
+    seq = models.BigIntegerField("Отметка изменения", default=0)
+
+    class Meta:
+        verbose_name = "Доступ к задаче"
+        verbose_name_plural = "Доступы к задачам"
+        unique_together = ["user", "task"]
+        indexes = [
+            models.Index(fields=["user", "seq", "task"]),
+            models.Index(fields=["user", "-created_at", "-task"]),
+            models.Index(fields=["user", "deadline", "task"]),
+            models.Index(
+                fields=["user", "deadline", "task"], name="tasks_access_open_dl_idx", condition=~Q(status="done")
+            ),
+            models.Index(fields=["user", "priority_rank", "task"]),
+            models.Index(fields=["user", "status_rank", "task"]),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} - {self.user_id} ({self.get_level_display()})"
+
+
+class TaskStats(models.Model):
+    """
+    Сводка по задачам, которые видит пользователь: всего, по статусам, по приоритетам
+    и просроченные. Счетчики меняются приращениями при записи задач и расшариваний
+    (см. `task_api.tasks.stats`) и периодически пересчитываются заново.
+
+    `overdue` — просроченные на момент `checked_at`; задачи, срок которых истек
+    позже, досчитываются при чтении.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="task_stats",
+        verbose_name="Пользователь",
+    )
+    total = models.IntegerField("Всего", default=0)
+    status_new = models.IntegerField("Новые", default=0)
+    status_in_progress = models.IntegerField("В работе", default=0)
+    status_done = models.IntegerField("Завершенные", default=0)
+    priority_low = models.IntegerField("Низкий приоритет", default=0)
+    priority_medium = models.IntegerField("Средний приоритет", default=0)
+    priority_high = models.IntegerField("Высокий приоритет", default=0)
+    overdue = models.IntegerField("Просроченные", default=0)
+    checked_at = models.DateTimeField("Пересчитано")
+
+    COUNTERS = [
+        "total",
+        *(f"status_{status}" for status in Task.Status.values),
+        *(f"priority_{priority}" for priority in Task.Priority.values),
+        "overdue",
+    ]
+
+    class Meta:
+        verbose_name = "Сводка по задачам"
+        verbose_name_plural = "Сводки по задачам"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.total}"
+
+
+class TaskTombstone(models.Model):
+    """
+    След задачи, которую пользователь перестал видеть: задача удалена, доступ
+    отозван или задача передана другому владельцу. Нужен дельта-синхронизации,
+    строки старше срока жизни токена удаляются периодической задачей.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="task_tombstones",
+        verbose_name="Пользователь",
+    )
+    # без внешнего ключа: задачи уже может не быть
+    task_id = models.BigIntegerField("Задача")
+    seq = models.BigIntegerField("Отметка изменения")
+    deleted_at = models.DateTimeField("Дата удаления", auto_now=True)
+
+    class Meta:
+        verbose_name = "Удаленная задача"
+        verbose_name_plural = "Удаленные задачи"
+        unique_together = ["user", "task_id"]
+        indexes = [
+            models.Index(fields=["user", "seq", "task_id"]),
+            models.Index(fields=["deleted_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} - {self.user_id}"
+
+
+class TaskImport(models.Model):
+    """
+    Задание на импорт задач из файла. `processed_rows` — контрольная точка:
+    число строк файла, результат которых уже записан, с нее импорт и продолжается.
+    """
+
+    class Format(models.TextChoices):
+        NDJSON = "ndjson", "NDJSON"
+        CSV = "csv", "CSV"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Завершен"
+        FAILED = "failed", "Ошибка"
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="task_imports",
+        verbose_name="Владелец",
+    )
+    file = models.FileField("Файл", upload_to="task_imports/", blank=True)
+    format = models.CharField("Формат", max_length=10, choices=Format.choices)
+    status = models.CharField("Статус", max_length=10, choices=Status.choices, default=Status.PENDING)
+    batch_size = models.PositiveIntegerField("Размер пачки")
+    processed_rows = models.PositiveIntegerField("Обработано строк", default=0)
+    created_count = models.PositiveIntegerField("Создано задач", default=0)
+    error_count = models.PositiveIntegerField("Строк с ошибками", default=0)
+    errors = models.JSONField("Ошибки", default=list, blank=True)
+    detail = models.TextField("Причина ошибки", blank=True)
+    created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата обновления", auto_now=True)
+    finished_at = models.DateTimeField("Дата завершения", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Импорт задач"
+        verbose_name_plural = "Импорты задач"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.owner_id} - {self.get_format_display()} ({self.get_status_display()})"
+
+    @classmethod
+    def format_for(cls, filename):
+        extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        return {"csv": cls.Format.CSV, "ndjson": cls.Format.NDJSON, "jsonl": cls.Format.NDJSON}.get(extension)
+
+
+class TaskReminderDelivery(models.Model):
+    """
+    Журнал писем с напоминаниями: не больше одного письма владельцу за день срока.
+    Строка закрепляет письмо за отправителем (`claim`) до отправки, поэтому
+    повтор части рассылки пропускает уже отправленные и отправляемые письма.
+
+    Строки с `task` — напоминания по задаче, от которых рассылка отказалась
+    после TASK_REMINDER_MAX_ATTEMPTS неудачных попыток.
+    """
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="task_reminder_deliveries",
+        verbose_name="Владелец",
+    )
+    day = models.DateField("День срока")
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="reminder_failures",
+        verbose_name="Задача",
+    )
+    claim = models.CharField("Отправитель", max_length=32, blank=True)
+    created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+    sent_at = models.DateTimeField("Дата отправки", null=True, blank=True)
+    failed_at = models.DateTimeField("Дата отказа", null=True, blank=True)
+    error = models.TextField("Ошибка", blank=True)
+
+    class Meta:
+        verbose_name = "Отправка напоминания"
+        verbose_name_plural = "Отправки напоминаний"
+        constraints = [
+            # одно письмо-сводка владельцу за день; отказов по задачам может быть несколько
+            models.UniqueConstraint(
+                fields=["owner", "day"], condition=Q(task__isnull=True), name="tasks_reminder_delivery_owner_day_uniq"
+            ),
+        ]
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self):
+        return f"{self.owner_id} - {self.day}"
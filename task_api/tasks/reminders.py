@@ -0,0 +1,275 @@
+"""
+Напоминания о задачах, срок которых наступает в указанный день.
+
+Задачи читаются потоком по диапазону `deadline` (индекс по полю), упорядоченные
+по владельцу: каждому владельцу уходит одно письмо со всеми его задачами,
+все письма — через одно соединение с почтовым сервером.
+
+Рассылка делится на части по диапазонам id владельцев (`owner_ranges`). Перед
+отправкой письмо закрепляется в журнале `TaskReminderDelivery`, поэтому
+повторно запущенная часть не отправит одному владельцу два письма за день.
+
+Напоминания по каждой задаче (`drain_due_reminders`) выбираются по индексу
+`next_reminder_at` пачками с SELECT ... FOR UPDATE SKIP LOCKED: параллельные
+проходы очереди не берут одни и те же задачи, а стоимость прохода зависит от
+числа наступивших напоминаний, а не от размера таблицы.
+"""
+
+import time as clock
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import itemgetter
+from smtplib import SMTPException
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from task_api.tasks.models import Task, TaskReminderDelivery
+from task_api.utils.iterables import chunked
+
+# способ рассылки (TASK_REMINDER_MODE): по каждой задаче или дневной дайджест владельцу;
+# в расписании beat есть обе задачи, работает та, что соответствует настройке
+PER_TASK = "per_task"
+DIGEST = "digest"
+
+REMINDER_STATUSES = [Task.Status.NEW, Task.Status.IN_PROGRESS]
+COLUMNS = ["owner_id", "owner__email", "title", "description", "priority", "status", "deadline"]
+REMINDER_TASK_FIELDS = [
+    "owner__email",
+    "title",
+    "description",
+    "priority",
+    "status",
+    "deadline",
+    "next_reminder_at",
+    "reminder_attempts",
+]
+
+# сколько писем закрепляется в журнале одним запросом
+CLAIM_BATCH_SIZE = 100
+# сколько дней хранится журнал отправок
+DELIVERY_KEEP_DAYS = 7
+
+# ошибки отправки одному получателю: письмо уходит на повтор, остальные отправляются
+SEND_ERRORS = (SMTPException, OSError)
+
+_PRIORITIES = dict(Task.Priority.choices)
+_STATUSES = dict(Task.Status.choices)
+
+
+def due_window(day):
+    """Начало и конец дня в текущем часовом поясе, для условия по диапазону вместо `deadline__date`."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
+
+def due_tasks(day, owner_ids=None, owner_range=(None, None)):
+    start, end = due_window(day)
+    queryset = Task.objects.filter(deadline__gte=start, deadline__lt=end, status__in=REMINDER_STATUSES)
+    if owner_ids is not None:
+        queryset = queryset.filter(owner_id__in=owner_ids)
+    first, last = owner_range
+    if first is not None:
+        queryset = queryset.filter(owner_id__gte=first)
+    if last is not None:
+        queryset = queryset.filter(owner_id__lt=last)
+    return queryset.order_by("owner_id", "deadline", "pk").values(*COLUMNS)
+
+
+def owner_ranges(day, size):
+    """
+    Делит владельцев задач со сроком в `day` на диапазоны `[first, last)` по `size`
+    владельцев; у первого диапазона нет нижней границы, у последнего — верхней.
+    """
+    owner_ids = list(due_tasks(day).order_by("owner_id").values_list("owner_id", flat=True).distinct())
+    if not owner_ids:
+        return []
+    bounds = owner_ids[size::size]
+    return list(zip([None, *bounds], [*bounds, None], strict=True))
+
+
+def digests(rows):
+    """Группирует упорядоченные по владельцу строки: (owner_id, email, задачи)."""
+    for owner_id, group in groupby(rows, key=itemgetter("owner_id")):
+        tasks = list(group)
+        yield owner_id, tasks[0]["owner__email"], tasks
+
+
+def digest_message(email, tasks, day, connection=None):
+    if len(tasks) == 1:
+        subject = f"Напоминание: задача '{tasks[0]['title']}' должна быть выполнена {day:%d.%m.%Y}"
+    else:
+        subject = f"Напоминание: {len(tasks)} задач должны быть выполнены {day:%d.%m.%Y}"
+
+    items = "\n\n".join(
+        f"Название: {task['title']}\n"
+        f"Описание: {task['description']}\n"
+        f"Приоритет: {_PRIORITIES[task['priority']]}\n"
+        f"Статус: {_STATUSES[task['status']]}\n"
+        f"Срок: {timezone.localtime(task['deadline']):%H:%M}"
+        for task in tasks
+    )
+    body = (
+        f"Здравствуйте, {email}!\n\n"
+        f"Напоминаем, что {day:%d.%m.%Y} истекает срок выполнения задач:\n\n"
+        f"{items}\n\n"
+        "Не забудьте выполнить задачи вовремя!\n"
+    )
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [email], connection=connection)
+
+
+def claim(owner_ids, day):
+    """Закрепляет письма за вызывающим; возвращает владельцев, письма которым еще никто не отправлял."""
+    token = uuid4().hex
+    TaskReminderDelivery.objects.bulk_create(
+        [TaskReminderDelivery(owner_id=owner_id, day=day, claim=token) for owner_id in owner_ids],
+        ignore_conflicts=True,
+    )
+    return set(
+        TaskReminderDelivery.objects.filter(day=day, owner_id__in=owner_ids, claim=token).values_list(
+            "owner_id", flat=True
+        )
+    )
+
+
+def release(owner_ids, day):
+    """Снимает закрепление неотправленных писем, чтобы их можно было отправить повторно."""
+    if owner_ids:
+        TaskReminderDelivery.objects.filter(
+            day=day, owner_id__in=owner_ids, task__isnull=True, sent_at__isnull=True
+        ).delete()
+
+
+def mark_sent(owner_ids, day):
+    if owner_ids:
+        TaskReminderDelivery.objects.filter(day=day, owner_id__in=owner_ids, task__isnull=True).update(
+            sent_at=timezone.now()
+        )
+
+
+def purge_deliveries(day):
+    return TaskReminderDelivery.objects.filter(day__lt=day - timedelta(days=DELIVERY_KEEP_DAYS)).delete()[0]
+
+
+def send_reminders(day, owner_range=(None, None), chunk_size=None):
+    """
+    Отправляет письма владельцам задач со сроком в `day` из диапазона `owner_range`.
+
+    Возвращает сводку: число отправленных писем и задач в них, число пропущенных
+    писем (уже отправлены или отправляются) и id владельцев, письма которым
+    отправить не удалось.
+    """
+    rows = due_tasks(day, owner_range=owner_range).iterator(chunk_size=chunk_size or settings.TASK_REMINDER_CHUNK_SIZE)
+    summary = {"sent": 0, "reminded": 0, "skipped": 0, "failed": []}
+    with get_connection() as connection:
+        broken = False
+        for batch in chunked(digests(rows), CLAIM_BATCH_SIZE):
+            pending = claim([owner_id for owner_id, _, _ in batch], day)
+            summary["skipped"] += len(batch) - len(pending)
+            sent = []
+            try:
+                for owner_id, email, tasks in batch:
+                    if owner_id not in pending:
+                        continue
+                    try:
+                        if broken:
+                            # после ошибки сервер мог закрыть соединение
+                            connection.close()
+                            connection.open()
+                            broken = False
+                        digest_message(email, tasks, day, connection).send()
+                    except SEND_ERRORS:
+                        broken = True
+                        summary["failed"].append(owner_id)
+                        continue
+                    sent.append(owner_id)
+                    summary["sent"] += 1
+                    summary["reminded"] += len(tasks)
+            finally:
+                # в том числе при истечении лимита времени: неотправленные письма достанутся повтору
+                mark_sent(sent, day)
+                release(pending.difference(sent), day)
+    return summary
+
+
+def send_digest(owner_id, day):
+    """Письмо одному владельцу (повтор после ошибки); ошибки отправки не подавляются."""
+    tasks = list(due_tasks(day, owner_ids=[owner_id]))
+    if not tasks or not claim([owner_id], day):
+        return 0
+    try:
+        digest_message(tasks[0]["owner__email"], tasks, day).send()
+    except BaseException:
+        release([owner_id], day)
+        raise
+    mark_sent([owner_id], day)
+    return len(tasks)
+
+
+def _drain_batch(connection, now, batch_size):
+    tasks = list(
+        Task.objects.select_for_update(skip_locked=True, of=("self",))
+        .filter(next_reminder_at__lte=now)
+        .select_related("owner")
+        .only(*REMINDER_TASK_FIELDS)
+        .order_by("next_reminder_at")[:batch_size]
+    )
+    sent = failed = 0
+    given_up = []
+    for task in tasks:
+        task.next_reminder_at = task.reminder_time_after(now)
+        attempts, task.reminder_attempts = task.reminder_attempts + 1, 0
+        if task.deadline is None or task.deadline <= now or task.status not in REMINDER_STATUSES:
+            # срок или статус изменили в обход save(): напоминать уже не о чем
+            continue
+        day = timezone.localdate(task.deadline)
+        row = {field: getattr(task, field) for field in COLUMNS if field != "owner__email"}
+        try:
+            digest_message(task.owner.email, [row], day, connection).send()
+        except SEND_ERRORS as exc:
+            failed += 1
+            connection.close()
+            if attempts >= settings.TASK_REMINDER_MAX_ATTEMPTS:
+                # напоминание пропускается, следующее — по расписанию
+                given_up.append(
+                    TaskReminderDelivery(owner_id=task.owner_id, day=day, task=task, failed_at=now, error=str(exc))
+                )
+                continue
+            # повтор с удваивающейся паузой, но не позже следующего напоминания и срока
+            retry_at = now + timedelta(seconds=settings.TASK_REMINDER_RETRY_DELAY * 2 ** (attempts - 1))
+            task.next_reminder_at = min(retry_at, task.next_reminder_at or task.deadline)
+            task.reminder_attempts = attempts
+            continue
+        sent += 1
+    Task.objects.bulk_update(tasks, ["next_reminder_at", "reminder_attempts"])
+    if given_up:
+        TaskReminderDelivery.objects.bulk_create(given_up)
+        purge_deliveries(timezone.localdate(now))
+    return len(tasks), sent, failed
+
+
+def drain_due_reminders(now=None, batch_size=None, time_budget=None):
+    """
+    Отправляет наступившие напоминания пачками, каждая — в своей транзакции.
+
+    Останавливается, когда очередь пуста или истекло `time_budget` секунд;
+    оставшееся отправит следующий проход. Возвращает число отправленных и
+    не отправленных из-за ошибки напоминаний.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.TASK_REMINDER_BATCH_SIZE
+    deadline = clock.monotonic() + (time_budget or settings.TASK_REMINDER_DRAIN_TIME)
+    sent = failed = 0
+    with get_connection() as connection:
+        while clock.monotonic() < deadline:
+            with transaction.atomic():
+                taken, batch_sent, batch_failed = _drain_batch(connection, now, batch_size)
+            sent += batch_sent
+            failed += batch_failed
+            if taken < batch_size:
+                break
+    return sent, failed
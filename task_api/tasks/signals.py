@@ -0,0 +1,111 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from task_api.tasks import access, caching, counters, events, stats, sync
+from task_api.tasks.models import Task, TaskShare
+
+_per_row_hooks = ContextVar("task_per_row_hooks", default=True)
+# задачи, удаляемые построчно: их расшаривания уходят каскадом после task.deleted
+_deleting_tasks = ContextVar("task_deleting_tasks", default=frozenset())
+
+
+@contextmanager
+def bulk_hooks():
+    """Отключает построчные обработчики: массовая операция сама вызывает функции ниже для всего списка."""
+    token = _per_row_hooks.set(False)
+    try:
+        yield
+    finally:
+        _per_row_hooks.reset(token)
+
+
+def tasks_saved(tasks, *, created):
+    task_ids = [task.pk for task in tasks]
+    if created:
+        with stats.tracking(task_ids, created=True):
+            access.create_task_access(tasks)
+        audience = defaultdict(list)
+        for task in tasks:
+            audience[task.owner_id].append(task.pk)
+        caching.invalidate_task_lists(audience)
+        events.publish_tasks(events.TASK_CREATED, audience)
+    else:
+        # до синхронизации доступа, чтобы событие получил и прежний владелец
+        audience = access.task_audience(tasks)
+        caching.invalidate_task_lists(audience)
+        with stats.tracking(task_ids):
+            access.sync_task_access(tasks)
+        events.publish_tasks(events.TASK_UPDATED, audience)
+
+
+def tasks_deleted(tasks):
+    # вызывается до удаления: строки доступа удаляются каскадом вместе с задачей
+    audience = access.task_audience(tasks)
+    stats.forget([task.pk for task in tasks])
+    sync.add_tombstones((user_id, task_id) for user_id, task_ids in audience.items() for task_id in task_ids)
+    caching.invalidate_task_lists(audience)
+    events.publish_tasks(events.TASK_DELETED, audience)
+
+
+def _share_audience(shares):
+    # shared_with и updated_at задачи меняются у всех, кто ее видит, а не только у получателя
+    return access.task_audience({share.task_id: share.task for share in shares}.values())
+
+
+def shares_saved(shares, *, created):
+    with stats.tracking({share.task_id for share in shares}):
+        access.grant_share_access(shares)
+    if created:
+        counters.adjust_shares_count(shares, 1)
+        # shared_with изменился у всех, кто видит задачу
+        access.touch_task_access({share.task_id for share in shares})
+    audience = _share_audience(shares)
+    caching.invalidate_task_lists(audience)
+    events.publish_shares(events.SHARE_GRANTED, shares, audience if created else None)
+
+
+def shares_deleted(shares):
+    # до отзыва доступа, чтобы сбросить списки и у получателя
+    audience = _share_audience(shares)
+    with stats.tracking({share.task_id for share in shares}):
+        access.revoke_share_access(shares)
+    counters.adjust_shares_count(shares, -1)
+    access.touch_task_access({share.task_id for share in shares})
+    caching.invalidate_task_lists(audience)
+    # task.updated — только тем, кто по-прежнему видит задачу
+    events.publish_shares(events.SHARE_REVOKED, shares, _share_audience(shares))
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw and _per_row_hooks.get():
+        tasks_saved([instance], created=created)
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    if _per_row_hooks.get():
+        tasks_deleted([instance])
+        _deleting_tasks.set(_deleting_tasks.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Task)
+def task_removed(sender, instance, **kwargs):
+    _deleting_tasks.set(_deleting_tasks.get() - {instance.pk})
+
+
+@receiver(post_save, sender=TaskShare)
+def share_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw and _per_row_hooks.get():
+        shares_saved([instance], created=created)
+
+
+@receiver(post_delete, sender=TaskShare)
+def share_deleted(sender, instance, **kwargs):
+    # у удаленной задачи нечего обновлять: ее зрители уже получили task.deleted
+    if _per_row_hooks.get() and instance.task_id not in _deleting_tasks.get():
+        shares_deleted([instance])
@@ -0,0 +1,139 @@
+"""
+Сводка по задачам пользователя (`GET /api/tasks/stats/`) из таблицы `TaskStats`.
+
+Запись задач и расшариваний меняет счетчики приращениями: строки доступа
+затронутых задач подсчитываются до и после изменения, разница прибавляется
+одним UPDATE на группу пользователей с одинаковой разницей. Сводка создается при
+первом чтении и периодически пересчитывается по `Task`/`TaskShare`, что исправляет
+расхождения после изменений в обход сигналов.
+"""
+
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from task_api.tasks.models import Task, TaskAccess, TaskShare, TaskStats
+from task_api.utils.iterables import chunked
+
+
+def _counters(status, priority, count, overdue):
+    return Counter({"total": count, f"status_{status}": count, f"priority_{priority}": count, "overdue": overdue})
+
+
+def tally(task_ids):
+    """Вклад задач в сводки пользователей, у которых сводка уже есть: {user_id: Counter}."""
+    overdue = Q(deadline__lt=F("user__task_stats__checked_at")) & ~Q(status=Task.Status.DONE)
+    rows = (
+        TaskAccess.objects.filter(task_id__in=task_ids, user__task_stats__isnull=False)
+        .values("user_id", "status", "priority")
+        .annotate(count=Count("pk"), overdue=Count("pk", filter=overdue))
+    )
+    totals = defaultdict(Counter)
+    for row in rows:
+        totals[row["user_id"]] += _counters(row["status"], row["priority"], row["count"], row["overdue"])
+    return totals
+
+
+def apply(before, after):
+    """Прибавляет к сводкам разницу `after - before`."""
+    groups = defaultdict(list)
+    for user_id in before.keys() | after.keys():
+        delta = Counter(after.get(user_id))
+        delta.subtract(before.get(user_id, Counter()))
+        changes = tuple(sorted((field, value) for field, value in delta.items() if value))
+        if changes:
+            groups[changes].append(user_id)
+
+    for changes, user_ids in groups.items():
+        TaskStats.objects.filter(user_id__in=user_ids).update(**{field: F(field) + value for field, value in changes})
+
+
+@contextmanager
+def tracking(task_ids, created=False):
+    """Обновляет сводки по изменению строк доступа задач внутри блока."""
+    task_ids = list(task_ids)
+    before = {} if created else tally(task_ids)
+    yield
+    apply(before, tally(task_ids))
+
+
+def forget(task_ids):
+    """Вычитает задачи из сводок; вызывается до удаления задач."""
+    apply(tally(task_ids), {})
+
+
+def rebuild(user_ids, now=None):
+    """Пересчитывает сводки пользователей по задачам и расшариваниям."""
+    user_ids = list(user_ids)
+    now = now or timezone.now()
+    overdue = Q(deadline__lt=now) & ~Q(status=Task.Status.DONE)
+    shared_overdue = Q(task__deadline__lt=now) & ~Q(task__status=Task.Status.DONE)
+    totals = defaultdict(Counter)
+
+    with transaction.atomic():
+        # блокировка строк сводки: приращения, которые придут во время пересчета, применятся поверх него
+        list(TaskStats.objects.select_for_update().filter(user_id__in=user_ids).values_list("pk", flat=True))
+        own = (
+            Task.objects.filter(owner_id__in=user_ids)
+            .order_by()
+            .values("owner_id", "status", "priority")
+            .annotate(count=Count("pk"), overdue=Count("pk", filter=overdue))
+        )
+        for row in own:
+            totals[row["owner_id"]] += _counters(row["status"], row["priority"], row["count"], row["overdue"])
+        shared = (
+            TaskShare.objects.filter(user_id__in=user_ids)
+            .exclude(user=F("task__owner"))
+            .values("user_id", "task__status", "task__priority")
+            .annotate(count=Count("pk"), overdue=Count("pk", filter=shared_overdue))
+        )
+        for row in shared:
+            totals[row["user_id"]] += _counters(
+                row["task__status"], row["task__priority"], row["count"], row["overdue"]
+            )
+
+        rows = [
+            TaskStats(
+                user_id=user_id, checked_at=now, **{field: totals[user_id][field] for field in TaskStats.COUNTERS}
+            )
+            for user_id in user_ids
+        ]
+        TaskStats.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["user"], update_fields=[*TaskStats.COUNTERS, "checked_at"]
+        )
+    return rows
+
+
+def reconcile(batch_size=500):
+    """Пересчитывает все существующие сводки пачками пользователей, возвращает число сводок."""
+    user_ids = TaskStats.objects.order_by("pk").values_list("pk", flat=True)
+    total = 0
+    for batch in chunked(user_ids.iterator(chunk_size=batch_size), batch_size):
+        total += len(rebuild(batch))
+    return total
+
+
+def user_stats(user):
+    """Сводка пользователя с учетом задач, срок которых истек после последнего пересчета."""
+    stats = TaskStats.objects.filter(user=user).first()
+    if stats is None:
+        (stats,) = rebuild([user.pk])
+
+    now = timezone.now()
+    overdue = stats.overdue
+    if stats.checked_at < now:
+        overdue += (
+            TaskAccess.objects.filter(user=user, deadline__gte=stats.checked_at, deadline__lt=now)
+            .exclude(status=Task.Status.DONE)
+            .count()
+        )
+    return {
+        "total": stats.total,
+        "by_status": {status: getattr(stats, f"status_{status}") for status in Task.Status.values},
+        "by_priority": {priority: getattr(stats, f"priority_{priority}") for priority in Task.Priority.values},
+        "overdue": overdue,
+        "checked_at": stats.checked_at,
+    }
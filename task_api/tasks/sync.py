@@ -0,0 +1,123 @@
+"""
+Последовательность изменений для дельта-синхронизации (`GET /api/tasks/sync/`).
+
+Каждая запись строки доступа или следа удаления получает отметку `seq` текущей
+транзакции, клиент получает изменения диапазоном `(user, seq)` по индексу.
+В PostgreSQL отметка — идентификатор транзакции, а граница выдачи — самая старая
+еще выполняющаяся транзакция (`pg_snapshot_xmin`): все, что ниже границы, уже
+зафиксировано или откатилось, поэтому изменения, зафиксированные позже чтения,
+не теряются. Остальные СУБД выполняют пишущие транзакции по одной, там отметка —
+следующее число после наибольшей записанной.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from task_api.tasks.models import TaskAccess, TaskTombstone
+
+TOKEN_SALT = "task_api.tasks.sync"
+
+
+class TokenExpired(Exception):  # noqa: N818
+    """Следы удалений для токена уже удалены, клиенту нужна полная синхронизация."""
+
+
+def _postgresql(using):
+    return connections[using].vendor == "postgresql"
+
+
+def _scalar(using, sql):
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchone()[0]
+
+
+def _last_seq(using):
+    sql = "SELECT MAX(seq) FROM (SELECT MAX(seq) AS seq FROM {} UNION ALL SELECT MAX(seq) FROM {}) AS stamps"
+    return _scalar(using, sql.format(TaskAccess._meta.db_table, TaskTombstone._meta.db_table)) or 0
+
+
+def change_seq(using=DEFAULT_DB_ALIAS):
+    """Отметка изменений текущей транзакции; вызывать внутри той же транзакции, что и запись."""
+    if _postgresql(using):
+        return _scalar(using, "SELECT pg_current_xact_id()::text::bigint")
+    return _last_seq(using) + 1
+
+
+def visible_seq(using=DEFAULT_DB_ALIAS):
+    """
+    Граница: все изменения с отметкой меньше нее уже видны читающему.
+    Незафиксированные изменения собственной транзакции в PostgreSQL за границу не попадают.
+    """
+    if _postgresql(using):
+        return _scalar(using, "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+    return _last_seq(using) + 1
+
+
+def add_tombstones(pairs, seq=None):
+    """Записывает следы для пар (пользователь, задача) с отметкой текущей транзакции."""
+    pairs = set(pairs)
+    if not pairs:
+        return
+    seq = change_seq() if seq is None else seq
+    TaskTombstone.objects.bulk_create(
+        [TaskTombstone(user_id=user_id, task_id=task_id, seq=seq) for user_id, task_id in pairs],
+        update_conflicts=True,
+        unique_fields=["user", "task_id"],
+        update_fields=["seq", "deleted_at"],
+    )
+
+
+def make_token(seq, task_id=0):
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(f"{seq}.{task_id}")
+
+
+def read_token(token):
+    """Позиция `(seq, task_id)` из токена; `signing.BadSignature` для чужого или испорченного токена."""
+    try:
+        value = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=settings.TASK_SYNC_TOKEN_MAX_AGE)
+    except signing.SignatureExpired as exc:
+        raise TokenExpired from exc
+    seq, _, task_id = value.partition(".")
+    return int(seq), int(task_id)
+
+
+def changes(user, position, limit, with_deleted=True):
+    """
+    Изменения пользователя начиная с позиции `(seq, task_id)`, не больше `limit`.
+    Без `with_deleted` следы удалений не читаются (полная выгрузка).
+
+    Возвращает id измененных задач, id задач, которые пользователь больше не видит,
+    позицию, с которой продолжать, и признак того, что до границы видимости
+    остались еще изменения.
+    """
+    boundary = visible_seq()
+    seq, task_id = position
+
+    def window(model):
+        # две строгие границы вместо OR: каждая половина читается диапазоном индекса (user, seq, task)
+        queryset = model.objects.filter(user=user, seq__lt=boundary).values_list("seq", "task_id")
+        rows = queryset.filter(seq__gt=seq).union(queryset.filter(seq=seq, task_id__gte=task_id), all=True)
+        return list(rows.order_by("seq", "task_id")[: limit + 1])
+
+    live = window(TaskAccess)
+    gone = window(TaskTombstone) if with_deleted else []
+    merged = sorted([(*row, False) for row in live] + [(*row, True) for row in gone])
+
+    next_position = merged[limit][:2] if len(merged) > limit else None
+    merged = merged[:limit]
+    changed = [task_id for _, task_id, deleted in merged if not deleted]
+    # задача могла пропасть и снова стать видимой: тогда в выдаче есть и строка доступа
+    deleted = sorted({task_id for _, task_id, deleted in merged if deleted} - set(changed))
+    return changed, deleted, next_position or (boundary, 0), next_position is not None
+
+
+def purge_tombstones():
+    """Удаляет следы, которые уже не нужны ни одному действующему токену."""
+    cutoff = timezone.now() - settings.TASK_SYNC_TOKEN_MAX_AGE - timedelta(days=1)
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -1,40 +1,124 @@
-from datetime import timedelta
+from datetime import date, timedelta
+from smtplib import SMTPException
 
-from celery import shared_task
+from celery import chord, shared_task
+from celery.exceptions import SoftTimeLimitExceeded
 from django.conf import settings
-from django.core.mail import send_mail
+from django.db import DatabaseError
 from django.utils import timezone
 
 
+@shared_task
+def send_due_reminders():
+    # проход очереди напоминаний по задачам, запускается каждую минуту
+    from .reminders import PER_TASK, drain_due_reminders
+
+    if settings.TASK_REMINDER_MODE != PER_TASK:
+        return f"Напоминания по задачам отключены (TASK_REMINDER_MODE={settings.TASK_REMINDER_MODE})"
+    sent, failed = drain_due_reminders()
+    return f"Отправлено напоминаний: {sent}, на повтор: {failed}"
+
+
 @shared_task
 def send_deadline_reminders():
-    from .models import Task
-
-    tomorrow = timezone.now() + timedelta(days=1)
-    tasks = Task.objects.filter(
-        deadline__date=tomorrow.date(),
-        status__in=[Task.Status.NEW, Task.Status.IN_PROGRESS],
-    ).select_related("owner")
-
-    for task in tasks:
-        # здесь просто формируем, но лучше использовать шаблоны писем
-        send_mail(
-            subject=f"Напоминание: задача '{task.title}' должна быть выполнена завтра",
-            message=f"""
-Здравствуйте, {task.owner.email}!
-
-Напоминаем, что завтра ({tomorrow.strftime("%d.%m.%Y")}) истекает срок выполнения задачи:
-
-Название: {task.title}
-Описание: {task.description}
-Приоритет: {task.get_priority_display()}
-Статус: {task.get_status_display()}
-
-Не забудьте выполнить задачу вовремя!
-            """,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[task.owner.email],
-            fail_silently=True,
-        )
-
-    return f"Отправлено {tasks.count()} напоминаний"
+    # координатор: делит владельцев на части, сводку соберет summarize_deadline_reminders
+    from .reminders import DIGEST, owner_ranges, purge_deliveries
+
+    if settings.TASK_REMINDER_MODE != DIGEST:
+        return f"Дневная рассылка отключена (TASK_REMINDER_MODE={settings.TASK_REMINDER_MODE})"
+    day = timezone.localdate() + timedelta(days=1)
+    purge_deliveries(day)
+    ranges = owner_ranges(day, settings.TASK_REMINDER_SHARD_SIZE)
+    if not ranges:
+        return "Нет задач со сроком завтра"
+    chord(send_deadline_reminder_shard.s(day.isoformat(), first, last) for first, last in ranges)(
+        summarize_deadline_reminders.s(day.isoformat())
+    )
+    return f"Запущено частей рассылки: {len(ranges)}"
+
+
+@shared_task(
+    acks_late=True,
+    autoretry_for=(SoftTimeLimitExceeded, DatabaseError),
+    retry_backoff=True,
+    max_retries=5,
+    soft_time_limit=settings.TASK_REMINDER_SHARD_SOFT_TIME_LIMIT,
+    time_limit=settings.TASK_REMINDER_SHARD_TIME_LIMIT,
+)
+def send_deadline_reminder_shard(day, first_owner_id, last_owner_id):
+    # повтор после лимита времени пропускает письма, уже отмеченные в журнале
+    from .reminders import send_reminders
+
+    return send_reminders(date.fromisoformat(day), owner_range=(first_owner_id, last_owner_id))
+
+
+@shared_task
+def summarize_deadline_reminders(results, day):
+    total = {"sent": 0, "reminded": 0, "skipped": 0}
+    failed = []
+    for result in results:
+        for key in total:
+            total[key] += result[key]
+        failed.extend(result["failed"])
+    for owner_id in failed:
+        send_deadline_digest.apply_async((owner_id, day), countdown=settings.TASK_REMINDER_RETRY_DELAY)
+    return (
+        f"Отправлено {total['sent']} писем о {total['reminded']} задачах, "
+        f"пропущено: {total['skipped']}, на повтор: {len(failed)}"
+    )
+
+
+@shared_task(
+    autoretry_for=(SMTPException, OSError),
+    retry_backoff=settings.TASK_REMINDER_RETRY_DELAY,
+    retry_backoff_max=60 * 60,
+    max_retries=5,
+)
+def send_deadline_digest(owner_id, day):
+    from .reminders import send_digest
+
+    return send_digest(owner_id, date.fromisoformat(day))
+
+
+@shared_task(bind=True, acks_late=True, autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=5)
+def import_tasks(self, import_id):
+    # повтор и повторная доставка после падения воркера продолжают с контрольной точки
+    from .imports import ImportConflict, finish, run_import
+    from .models import TaskImport
+
+    job = TaskImport.objects.get(pk=import_id)
+    if job.status in (TaskImport.Status.DONE, TaskImport.Status.FAILED):
+        return job.status
+
+    def report(job):
+        if not self.request.is_eager:
+            self.update_state(
+                state="PROGRESS",
+                meta={"processed_rows": job.processed_rows, "created": job.created_count, "errors": job.error_count},
+            )
+
+    try:
+        with job.file.open("rb") as file:
+            run_import(job, file, on_progress=report)
+    except ImportConflict:
+        return "conflict"
+    except Exception as exc:
+        # ошибка базы уходит на повтор, остальные и последняя неудачная попытка завершают импорт
+        if not isinstance(exc, DatabaseError) or self.request.retries >= self.max_retries:
+            finish(job, TaskImport.Status.FAILED, f"Импорт прерван: {type(exc).__name__}: {exc}")
+        raise
+    return job.status
+
+
+@shared_task
+def reconcile_task_stats():
+    from .stats import reconcile
+
+    return f"Пересчитано {reconcile()} сводок по задачам"
+
+
+@shared_task
+def purge_task_tombstones():
+    from .sync import purge_tombstones
+
+    return f"Удалено {purge_tombstones()} следов удаленных задач"
@@ -0,0 +1,118 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from task_api.tasks.models import Task, TaskAccess, TaskShare
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.tests.factories import UserFactory
+
+
+def access_rows(task):
+    return set(TaskAccess.objects.filter(task=task).values_list("user_id", "level"))
+
+
+@pytest.mark.django_db
+class TestTaskAccessSync:
+    def test_owner_row_created_with_sort_copies(self):
+        task = TaskFactory.create()
+
+        access = TaskAccess.objects.get(task=task)
+
+        assert access.user_id == task.owner_id
+        assert access.level == TaskAccess.Level.OWNER
+        assert (access.status, access.priority, access.deadline, access.created_at) == (
+            task.status,
+            task.priority,
+            task.deadline,
+            task.created_at,
+        )
+
+    def test_share_create_update_delete(self):
+        task = TaskFactory.create()
+        share = TaskShareFactory.create(task=task, permission=TaskShare.Permission.VIEW)
+        assert access_rows(task) == {(task.owner_id, "owner"), (share.user_id, "view")}
+
+        share.permission = TaskShare.Permission.EDIT
+        share.save()
+        assert access_rows(task) == {(task.owner_id, "owner"), (share.user_id, "edit")}
+
+        share.delete()
+        assert access_rows(task) == {(task.owner_id, "owner")}
+
+    def test_task_update_refreshes_copies_for_every_row(self):
+        task = TaskFactory.create(status=Task.Status.NEW)
+        TaskShareFactory.create_batch(2, task=task)
+
+        task.status = Task.Status.DONE
+        task.deadline = None
+        task.save()
+
+        assert set(TaskAccess.objects.filter(task=task).values_list("status", "deadline")) == {(Task.Status.DONE, None)}
+
+    def test_reowned_task_moves_owner_row(self):
+        task = TaskFactory.create()
+        old_owner = task.owner
+        new_owner = UserFactory.create()
+
+        task.owner = new_owner
+        task.save()
+
+        assert access_rows(task) == {(new_owner.pk, "owner")}
+        assert not TaskAccess.objects.filter(user=old_owner).exists()
+
+    def test_task_delete_removes_rows(self):
+        task = TaskFactory.create()
+        TaskShareFactory.create(task=task)
+
+        task.delete()
+
+        assert not TaskAccess.objects.exists()
+
+    def test_visible_to_has_no_distinct(self):
+        user = UserFactory.create()
+        own = TaskFactory.create(owner=user)
+        shared = TaskShareFactory.create(user=user).task
+        TaskShareFactory.create(task=own)
+        TaskFactory.create()
+
+        queryset = Task.objects.visible_to(user)
+
+        assert "DISTINCT" not in str(queryset.query)
+        assert sorted(queryset.values_list("pk", flat=True)) == sorted([own.pk, shared.pk])
+
+
+@pytest.mark.django_db
+class TestRebuildTaskAccessCommand:
+    def test_check_passes_when_in_sync(self):
+        TaskShareFactory.create_batch(3)
+
+        call_command("rebuild_task_access", "--check", stdout=StringIO())
+
+    def test_rebuild_repairs_table(self):
+        shares = TaskShareFactory.create_batch(3)
+        orphan = TaskFactory.create()
+        TaskAccess.objects.filter(task=shares[0].task).delete()
+        TaskAccess.objects.filter(task=shares[1].task).update(status="bogus")
+        TaskAccess.objects.create(
+            user=UserFactory.create(),
+            task=orphan,
+            level=TaskAccess.Level.EDIT,
+            status=orphan.status,
+            priority=orphan.priority,
+            created_at=orphan.created_at,
+            status_rank=orphan.status_rank,
+            priority_rank=orphan.priority_rank,
+        )
+
+        with pytest.raises(CommandError):
+            call_command("rebuild_task_access", "--check", stdout=StringIO())
+
+        call_command("rebuild_task_access", stdout=StringIO())
+
+        call_command("rebuild_task_access", "--check", stdout=StringIO())
+        assert access_rows(shares[0].task) == {
+            (shares[0].task.owner_id, "owner"),
+            (shares[0].user_id, shares[0].permission),
+        }
+        assert access_rows(orphan) == {(orphan.owner_id, "owner")}
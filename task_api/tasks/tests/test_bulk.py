@@ -0,0 +1,341 @@
+from threading import Event, Thread
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from task_api.tasks import bulk
+from task_api.tasks.access import check_task_access
+from task_api.tasks.models import Task, TaskAccess, TaskShare
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.tests.factories import UserFactory
+
+BULK_URL = reverse("api:tasks:task-bulk")
+
+
+def count_queries(callback):
+    with CaptureQueriesContext(connection) as queries:
+        callback()
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestBulkCreate:
+    def test_create(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        items = [{"title": f"Задача {i}", "priority": "high"} for i in range(3)]
+
+        response = api_client.post(BULK_URL, {"items": items}, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["errors"] == []
+        assert [task["title"] for task in response.data["results"]] == ["Задача 0", "Задача 1", "Задача 2"]
+        assert all(task["owner"] == user.id for task in response.data["results"])
+        assert Task.objects.filter(owner=user, priority="high").count() == 3
+        assert TaskAccess.objects.filter(user=user, level=TaskAccess.Level.OWNER).count() == 3
+
+    def test_atomic_mode_rejects_whole_batch(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        items = [{"title": "Корректная"}, {"priority": "urgent"}]
+
+        response = api_client.post(BULK_URL, {"items": items}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["results"] == []
+        assert response.data["errors"][0]["index"] == 1
+        assert set(response.data["errors"][0]["errors"]) == {"title", "priority"}
+        assert not Task.objects.exists()
+
+    def test_partial_mode_saves_valid_items(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        items = [{"title": "Первая"}, {"title": ""}, {"title": "Третья"}]
+
+        response = api_client.post(BULK_URL, {"items": items, "mode": "partial"}, format="json")
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [task["title"] for task in response.data["results"]] == ["Первая", "Третья"]
+        assert [error["index"] for error in response.data["errors"]] == [1]
+        assert Task.objects.count() == 2
+
+    def test_partial_mode_without_valid_items(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = api_client.post(BULK_URL, {"items": [{"title": ""}], "mode": "partial"}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_size_limit(self, api_client, user, settings):
+        settings.TASK_BULK_MAX_ITEMS = 2
+        api_client.force_authenticate(user=user)
+
+        response = api_client.post(BULK_URL, {"items": [{"title": "x"}] * 3}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "items" in response.data
+
+    def test_queries_do_not_grow_with_batch(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        def create(size):
+            items = [{"title": f"Задача {i}"} for i in range(size)]
+            return lambda: api_client.post(BULK_URL, {"items": items}, format="json")
+
+        assert count_queries(create(5)) == count_queries(create(50))
+
+    def test_requires_authentication(self, api_client):
+        response = api_client.post(BULK_URL, {"items": [{"title": "x"}]}, format="json")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestBulkUpdate:
+    def test_update_own_and_editable_tasks(self, api_client, user):
+        own = TaskFactory.create(owner=user, status=Task.Status.NEW)
+        shared = TaskFactory.create(status=Task.Status.NEW)
+        TaskShareFactory.create(task=shared, user=user, permission=TaskShare.Permission.EDIT)
+        api_client.force_authenticate(user=user)
+        items = [{"id": own.id, "status": "done"}, {"id": shared.id, "title": "Переименована"}]
+
+        response = api_client.patch(BULK_URL, {"items": items}, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        own.refresh_from_db()
+        shared.refresh_from_db()
+        assert own.status == Task.Status.DONE
+        assert shared.title == "Переименована"
+        assert shared.status == Task.Status.NEW
+        assert TaskAccess.objects.get(task=own, user=user).status == Task.Status.DONE
+        assert check_task_access() == {"missing_owner": 0, "missing_share": 0, "orphaned": 0, "outdated": 0}
+
+    def test_update_touches_only_patched_fields(self, api_client, user):
+        task = TaskFactory.create(owner=user, title="Название", description="Описание")
+        api_client.force_authenticate(user=user)
+        items = [{"id": task.id, "title": "Новое название"}]
+        Task.objects.filter(pk=task.pk).update(description="Изменено параллельно")
+
+        api_client.patch(BULK_URL, {"items": items}, format="json")
+
+        task.refresh_from_db()
+        assert (task.title, task.description) == ("Новое название", "Изменено параллельно")
+
+    def test_per_item_errors(self, api_client, user):
+        own, other_own = TaskFactory.create_batch(2, owner=user)
+        viewable = TaskFactory.create()
+        TaskShareFactory.create(task=viewable, user=user, permission=TaskShare.Permission.VIEW)
+        foreign = TaskFactory.create()
+        api_client.force_authenticate(user=user)
+        items = [
+            {"id": own.id, "status": "done"},
+            {"id": viewable.id, "status": "done"},
+            {"id": foreign.id, "status": "done"},
+            {"id": own.id, "status": "new"},
+            {"status": "done"},
+            {"id": other_own.id, "status": "unknown"},
+        ]
+
+        response = api_client.patch(BULK_URL, {"items": items, "mode": "partial"}, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [task["id"] for task in response.data["results"]] == [own.id]
+        errors = {error["index"]: error["errors"] for error in response.data["errors"]}
+        assert set(errors) == {1, 2, 3, 4, 5}
+        assert errors[1]["id"] == ["Недостаточно прав для изменения задачи"]
+        assert errors[2]["id"] == ["Задача не найдена"]
+        assert errors[3]["id"] == ["Задача указана в запросе несколько раз"]
+        assert "id" in errors[4]
+        assert "status" in errors[5]
+        assert Task.objects.get(pk=viewable.pk).status == viewable.status
+
+    def test_atomic_mode_rejects_whole_batch(self, api_client, user):
+        task = TaskFactory.create(owner=user, title="Исходное")
+        api_client.force_authenticate(user=user)
+        items = [{"id": task.id, "title": "Новое"}, {"id": 0}]
+
+        response = api_client.patch(BULK_URL, {"items": items}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        task.refresh_from_db()
+        assert task.title == "Исходное"
+
+    def test_queries_do_not_grow_with_batch(self, api_client, user):
+        tasks = TaskFactory.create_batch(50, owner=user)
+        api_client.force_authenticate(user=user)
+
+        def update(batch):
+            items = [{"id": task.id, "title": "Новое"} for task in batch]
+            return lambda: api_client.patch(BULK_URL, {"items": items}, format="json")
+
+        assert count_queries(update(tasks[:5])) == count_queries(update(tasks))
+
+
+@pytest.mark.django_db
+class TestBulkDelete:
+    def test_delete_with_shares(self, api_client, user):
+        tasks = TaskFactory.create_batch(3, owner=user)
+        TaskShareFactory.create_batch(2, task=tasks[0])
+        kept = TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.delete(BULK_URL, {"ids": [task.id for task in tasks]}, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(response.data["results"]) == sorted(task.id for task in tasks)
+        assert list(Task.objects.values_list("id", flat=True)) == [kept.id]
+        assert not TaskShare.objects.exists()
+        assert list(TaskAccess.objects.values_list("task_id", flat=True)) == [kept.id]
+
+    def test_per_item_errors(self, api_client, user):
+        own = TaskFactory.create(owner=user)
+        viewable = TaskFactory.create()
+        TaskShareFactory.create(task=viewable, user=user, permission=TaskShare.Permission.VIEW)
+        api_client.force_authenticate(user=user)
+
+        atomic = api_client.delete(BULK_URL, {"ids": [own.id, viewable.id, 999]}, format="json")
+        partial = api_client.delete(BULK_URL, {"ids": [own.id, viewable.id, 999], "mode": "partial"}, format="json")
+
+        assert atomic.status_code == status.HTTP_400_BAD_REQUEST
+        assert partial.status_code == status.HTTP_200_OK
+        assert partial.data["results"] == [own.id]
+        assert [error["index"] for error in partial.data["errors"]] == [1, 2]
+        assert list(Task.objects.values_list("id", flat=True)) == [viewable.id]
+
+    def test_queries_do_not_grow_with_batch(self, api_client, user):
+        tasks = TaskFactory.create_batch(55, owner=user)
+        for task in tasks:
+            TaskShareFactory.create(task=task)
+        api_client.force_authenticate(user=user)
+
+        def delete(batch):
+            return lambda: api_client.delete(BULK_URL, {"ids": [task.id for task in batch]}, format="json")
+
+        assert count_queries(delete(tasks[:5])) == count_queries(delete(tasks[5:]))
+
+
+SHARE_URL = reverse("api:tasks:task-share-batch")
+
+
+@pytest.mark.django_db
+class TestBatchShare:
+    def test_share_many_tasks_with_many_users(self, api_client, user):
+        tasks = TaskFactory.create_batch(3, owner=user)
+        users = UserFactory.create_batch(2)
+        api_client.force_authenticate(user=user)
+        payload = {
+            "task_ids": [task.id for task in tasks],
+            "emails": [recipient.email for recipient in users],
+            "permission": "edit",
+        }
+
+        response = api_client.post(SHARE_URL, payload, format="json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["summary"] == {"created": 6, "updated": 0, "rejected": 0}
+        assert TaskShare.objects.filter(permission="edit").count() == 6
+        assert set(Task.objects.values_list("shares_count", flat=True)) == {2}
+        assert TaskAccess.objects.filter(level=TaskAccess.Level.EDIT).count() == 6
+        assert check_task_access() == {"missing_owner": 0, "missing_share": 0, "orphaned": 0, "outdated": 0}
+
+    def test_existing_shares_are_updated(self, api_client, user):
+        task = TaskFactory.create(owner=user)
+        existing = TaskShareFactory.create(task=task, permission=TaskShare.Permission.VIEW)
+        newcomer = UserFactory.create()
+        api_client.force_authenticate(user=user)
+        payload = {"task_ids": [task.id], "emails": [existing.user.email, newcomer.email], "permission": "edit"}
+
+        response = api_client.post(SHARE_URL, payload, format="json")
+
+        assert [(result["email"], result["status"]) for result in response.data["results"]] == [
+            (existing.user.email, "updated"),
+            (newcomer.email, "created"),
+        ]
+        existing.refresh_from_db()
+        task.refresh_from_db()
+        assert existing.permission == TaskShare.Permission.EDIT
+        assert task.shares_count == 2
+        assert TaskAccess.objects.get(task=task, user=existing.user).level == TaskAccess.Level.EDIT
+
+    def test_rejected_pairs(self, api_client, user):
+        own = TaskFactory.create(owner=user)
+        foreign = TaskFactory.create()
+        recipient = UserFactory.create()
+        api_client.force_authenticate(user=user)
+        payload = {
+            "task_ids": [own.id, foreign.id],
+            "emails": [recipient.email, user.email, "nobody@example.com"],
+            "permission": "view",
+        }
+
+        response = api_client.post(SHARE_URL, payload, format="json")
+
+        statuses = {(result["task"], result["email"]): result for result in response.data["results"]}
+        assert response.data["summary"] == {"created": 1, "updated": 0, "rejected": 5}
+        assert statuses[(own.id, recipient.email)]["status"] == "created"
+        assert statuses[(foreign.id, recipient.email)]["detail"] == "Задача не найдена"
+        assert statuses[(own.id, user.email)]["detail"] == "Нельзя поделиться задачей с владельцем"
+        assert statuses[(own.id, "nobody@example.com")]["detail"] == "Пользователь с таким email не найден"
+        assert not TaskShare.objects.filter(task=foreign).exists()
+
+    def test_pairs_limit(self, api_client, user, settings):
+        settings.TASK_SHARE_MAX_PAIRS = 3
+        tasks = TaskFactory.create_batch(2, owner=user)
+        api_client.force_authenticate(user=user)
+        payload = {"task_ids": [task.id for task in tasks], "emails": ["a@example.com", "b@example.com"]}
+
+        response = api_client.post(SHARE_URL, {**payload, "permission": "view"}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not TaskShare.objects.exists()
+
+    def test_queries_do_not_grow_with_pairs(self, api_client, user):
+        tasks = TaskFactory.create_batch(20, owner=user)
+        users = UserFactory.create_batch(10)
+        api_client.force_authenticate(user=user)
+
+        def share(task_batch, user_batch):
+            payload = {
+                "task_ids": [task.id for task in task_batch],
+                "emails": [recipient.email for recipient in user_batch],
+                "permission": "view",
+            }
+            return lambda: api_client.post(SHARE_URL, payload, format="json")
+
+        # 8x6 пар укладываются в одну пачку INSERT даже с лимитом переменных SQLite
+        assert count_queries(share(tasks[:2], users[:2])) == count_queries(share(tasks[2:10], users[2:8]))
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="блокировки строк есть только в PostgreSQL")
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_batch_shares_are_counted_once(user):
+    task = TaskFactory.create(owner=user)
+    recipient = UserFactory.create()
+    shared, release = Event(), Event()
+    results = {}
+
+    def share(name, permission, hold=False):
+        try:
+            with transaction.atomic():
+                results[name] = bulk.share_tasks([task], [recipient], permission)
+                if hold:
+                    shared.set()
+                    release.wait(5)
+        finally:
+            connection.close()
+
+    first = Thread(target=share, args=("first", TaskShare.Permission.VIEW, True))
+    first.start()
+    shared.wait(5)
+    second = Thread(target=share, args=("second", TaskShare.Permission.EDIT))
+    second.start()
+    second.join(0.5)
+    release.set()
+    first.join()
+    second.join()
+
+    task.refresh_from_db()
+    assert [len(shares) for shares in results["first"]] == [1, 0]
+    assert [len(shares) for shares in results["second"]] == [0, 1]
+    assert task.shares_count == 1
+    assert TaskShare.objects.get().permission == TaskShare.Permission.EDIT
@@ -0,0 +1,179 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from task_api.tasks import caching
+from task_api.tasks.models import Task, TaskShare
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.tests.factories import UserFactory
+
+
+@pytest.fixture
+def list_cache(settings):
+    settings.TASK_LIST_CACHE_ENABLED = True
+
+
+def list_titles(api_client, **params):
+    response = api_client.get(reverse("api:tasks:task-list"), params)
+    assert response.status_code == status.HTTP_200_OK
+    return response, [task["title"] for task in response.data["results"]]
+
+
+# поколения сбрасываются в on_commit, поэтому нужны настоящие фиксации транзакций
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("list_cache")
+class TestTaskListCache:
+    def test_repeated_request_is_served_from_cache(self, api_client, user):
+        TaskFactory.create(owner=user, title="Первая")
+        api_client.force_authenticate(user=user)
+
+        first, _ = list_titles(api_client)
+        Task.objects.filter(owner=user).update(title="Изменена в обход модели")
+        second, titles = list_titles(api_client)
+
+        assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+        assert titles == ["Первая"]
+        assert caching.cache_stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+    def test_query_string_is_normalized(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        api_client.get(reverse("api:tasks:task-list") + "?status=new&priority=high")
+        response = api_client.get(reverse("api:tasks:task-list") + "?priority=high&status=new")
+
+        assert response["X-Cache"] == "HIT"
+
+    def test_pages_are_per_user(self, api_client, user):
+        other = UserFactory.create()
+        TaskFactory.create(owner=user, title="Моя")
+        TaskFactory.create(owner=other, title="Чужая")
+
+        api_client.force_authenticate(user=user)
+        list_titles(api_client)
+        api_client.force_authenticate(user=other)
+        response, titles = list_titles(api_client)
+
+        assert response["X-Cache"] == "MISS"
+        assert titles == ["Чужая"]
+
+    def test_task_create_update_delete_invalidate(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        list_titles(api_client)
+
+        response = api_client.post(reverse("api:tasks:task-list"), {"title": "Новая"})
+        task_id = response.data["id"]
+        assert list_titles(api_client)[1] == ["Новая"]
+
+        api_client.patch(reverse("api:tasks:task-detail", kwargs={"pk": task_id}), {"title": "Обновлена"})
+        assert list_titles(api_client)[1] == ["Обновлена"]
+
+        api_client.delete(reverse("api:tasks:task-detail", kwargs={"pk": task_id}))
+        assert list_titles(api_client)[1] == []
+
+    def test_task_update_invalidates_shared_users(self, api_client, user):
+        task = TaskFactory.create(title="До")
+        TaskShareFactory.create(task=task, user=user)
+        api_client.force_authenticate(user=user)
+        list_titles(api_client)
+
+        task.title = "После"
+        task.save()
+
+        assert list_titles(api_client)[1] == ["После"]
+
+    def test_share_create_update_delete_invalidate(self, api_client, user):
+        task = TaskFactory.create(title="Общая")
+        api_client.force_authenticate(user=task.owner)
+        list_titles(api_client)
+        api_client.force_authenticate(user=user)
+        assert list_titles(api_client)[1] == []
+
+        share = TaskShareFactory.create(task=task, user=user, permission=TaskShare.Permission.VIEW)
+        assert list_titles(api_client)[1] == ["Общая"]
+        api_client.force_authenticate(user=task.owner)
+        assert list_titles(api_client)[0].data["results"][0]["shared_with"] == 1
+
+        share.permission = TaskShare.Permission.EDIT
+        share.save()
+        api_client.force_authenticate(user=user)
+        assert list_titles(api_client)[0]["X-Cache"] == "MISS"
+
+        share.delete()
+        assert list_titles(api_client)[1] == []
+
+    def test_share_changes_invalidate_other_recipients(self, api_client, user):
+        task = TaskFactory.create(title="Общая")
+        share = TaskShareFactory.create(task=task, user=user)
+        api_client.force_authenticate(user=user)
+        assert list_titles(api_client)[0].data["results"][0]["shared_with"] == 1
+
+        api_client.force_authenticate(user=task.owner)
+        response = api_client.post(
+            reverse("api:tasks:task-share", kwargs={"pk": task.pk}),
+            {"email": UserFactory().email, "permission": "view"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        api_client.force_authenticate(user=user)
+        response = list_titles(api_client)[0]
+        assert response["X-Cache"] == "MISS"
+        assert response.data["results"][0]["shared_with"] == 2
+
+        TaskShare.objects.exclude(pk=share.pk).get().delete()
+        response = list_titles(api_client)[0]
+        assert response["X-Cache"] == "MISS"
+        assert response.data["results"][0]["shared_with"] == 1
+
+    def test_errors_are_not_cached(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        api_client.get(reverse("api:tasks:task-list"), {"cursor": "broken"})
+        response = api_client.get(reverse("api:tasks:task-list"), {"cursor": "broken"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert caching.cache_stats()["hits"] == 0
+
+    def test_cache_can_be_disabled(self, api_client, user, settings):
+        settings.TASK_LIST_CACHE_ENABLED = False
+        api_client.force_authenticate(user=user)
+
+        list_titles(api_client)
+        response, _ = list_titles(api_client)
+
+        assert "X-Cache" not in response
+        assert caching.cache_stats()["misses"] == 0
+
+    def test_stats_command(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        list_titles(api_client)
+        list_titles(api_client)
+        out = StringIO()
+
+        call_command("task_list_cache_stats", "--reset", stdout=out)
+
+        assert "Попадания: 1" in out.getvalue()
+        assert "Промахи: 1" in out.getvalue()
+        assert caching.cache_stats()["hits"] == 0
+
+
+@pytest.mark.django_db
+class TestGenerations:
+    def test_bump_is_deferred_until_commit(self, user, django_capture_on_commit_callbacks):
+        generation = caching.get_generation(user.pk)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            TaskFactory.create(owner=user)
+            assert caching.get_generation(user.pk) == generation
+
+        for callback in callbacks:
+            callback()
+        assert caching.get_generation(user.pk) > generation
+
+    def test_lost_generation_is_not_reused(self, user):
+        generation = caching.get_generation(user.pk)
+        cache.delete(caching.GENERATION_KEY.format(user_id=user.pk))
+
+        assert caching.get_generation(user.pk) > generation
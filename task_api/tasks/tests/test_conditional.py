@@ -0,0 +1,174 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+
+from task_api.tasks.api import conditional
+from task_api.tasks.models import Task
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+
+
+def detail_url(task):
+    return reverse("api:tasks:task-detail", kwargs={"pk": task.pk})
+
+
+@pytest.mark.django_db
+class TestTaskDetailConditional:
+    def test_etag_match_returns_not_modified(self, api_client, user):
+        task = TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(detail_url(task))["ETag"]
+
+        response = api_client.get(detail_url(task), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert not response.content
+
+    def test_etag_changes_on_update_and_share(self, api_client, user):
+        task = TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+        first = api_client.get(detail_url(task))["ETag"]
+
+        TaskShareFactory.create(task=task)
+        second = api_client.get(detail_url(task), HTTP_IF_NONE_MATCH=first)
+        task.refresh_from_db()
+        task.title = "Новое название"
+        task.save()
+        third = api_client.get(detail_url(task), HTTP_IF_NONE_MATCH=second["ETag"])
+
+        assert second.status_code == third.status_code == status.HTTP_200_OK
+        assert len({first, second["ETag"], third["ETag"]}) == 3
+
+    def test_etag_changes_when_task_becomes_overdue(self, api_client, user):
+        task = TaskFactory.create(owner=user, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=1))
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(detail_url(task))["ETag"]
+
+        Task.objects.filter(pk=task.pk).update(deadline=timezone.now() - timedelta(days=1))
+        Task.objects.filter(pk=task.pk).update(updated_at=task.updated_at)
+        response = api_client.get(detail_url(task), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["is_overdue"] is True
+
+    def test_if_modified_since(self, api_client, user):
+        task = TaskFactory.create(owner=user, deadline=None)
+        api_client.force_authenticate(user=user)
+        last_modified = api_client.get(detail_url(task))["Last-Modified"]
+
+        not_modified = api_client.get(detail_url(task), HTTP_IF_MODIFIED_SINCE=last_modified)
+        stale = api_client.get(
+            detail_url(task), HTTP_IF_MODIFIED_SINCE=http_date((task.updated_at - timedelta(hours=1)).timestamp())
+        )
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert stale.status_code == status.HTTP_200_OK
+
+    def test_if_match_allows_update(self, api_client, user):
+        task = TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(detail_url(task))["ETag"]
+
+        response = api_client.patch(detail_url(task), {"title": "Обновлено"}, HTTP_IF_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_stale_if_match_rejects_update(self, api_client, user):
+        task = TaskFactory.create(owner=user, title="Исходное")
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(detail_url(task))["ETag"]
+        api_client.patch(detail_url(task), {"title": "Первое изменение"}, HTTP_IF_MATCH=etag)
+
+        response = api_client.put(
+            detail_url(task), {"title": "Второе изменение", "status": "new", "priority": "low"}, HTTP_IF_MATCH=etag
+        )
+
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        task.refresh_from_db()
+        assert task.title == "Первое изменение"
+
+    def test_concurrent_change_after_read_is_rejected(self, api_client, user, monkeypatch):
+        task = TaskFactory.create(owner=user, title="Исходное")
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(detail_url(task))["ETag"]
+
+        # конкурентная запись между чтением задачи и сохранением
+        def race(instance):
+            Task.objects.filter(pk=instance.pk).update(title="Чужое", updated_at=timezone.now())
+            conditional.claim_task_version(instance)
+
+        monkeypatch.setattr("task_api.tasks.api.views.claim_task_version", race)
+        response = api_client.patch(detail_url(task), {"title": "Мое"}, HTTP_IF_MATCH=etag)
+
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        task.refresh_from_db()
+        assert task.title != "Мое"
+
+    def test_if_match_wildcard(self, api_client, user):
+        task = TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.patch(detail_url(task), {"title": "Обновлено"}, HTTP_IF_MATCH="*")
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestTaskListConditional:
+    def test_etag_match_returns_not_modified(self, api_client, user, django_assert_max_num_queries):
+        TaskFactory.create_batch(3, owner=user)
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(reverse("api:tasks:task-list"))["ETag"]
+
+        # SAVEPOINT/RELEASE запроса и один агрегирующий запрос
+        with django_assert_max_num_queries(3):
+            response = api_client.get(reverse("api:tasks:task-list"), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            pytest.param(lambda user, task: TaskFactory.create(owner=user), id="create"),
+            pytest.param(lambda user, task: Task.objects.get(pk=task.pk).save(), id="update"),
+            pytest.param(lambda user, task: task.delete(), id="delete"),
+            pytest.param(lambda user, task: TaskShareFactory.create(user=user), id="shared-with-user"),
+            pytest.param(lambda user, task: TaskShareFactory.create(task=task), id="shared-by-user"),
+        ],
+    )
+    def test_etag_changes_on_visible_change(self, api_client, user, change):
+        task = TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(reverse("api:tasks:task-list"))["ETag"]
+
+        change(user, task)
+        response = api_client.get(reverse("api:tasks:task-list"), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_revoke_and_grant_change_etag(self, api_client, user):
+        revoked = TaskShareFactory.create(user=user)
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(reverse("api:tasks:task-list"))["ETag"]
+
+        revoked.delete()
+        TaskShareFactory.create(user=user)
+        response = api_client.get(reverse("api:tasks:task-list"), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_other_users_changes_keep_etag(self, api_client, user):
+        TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+        etag = api_client.get(reverse("api:tasks:task-list"))["ETag"]
+
+        TaskFactory.create()
+        response = api_client.get(reverse("api:tasks:task-list"), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
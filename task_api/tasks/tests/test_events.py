@@ -0,0 +1,287 @@
+import asyncio
+import functools
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.asgi import application
+from task_api.tasks import bulk, events
+from task_api.tasks.models import Task, TaskShare
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.tests.factories import UserFactory
+
+
+def run_async(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return async_to_sync(func)(*args, **kwargs)
+
+    return wrapper
+
+
+class Subscriber:
+    """Канал слоя, подписанный на группу событий пользователя."""
+
+    def __init__(self, user):
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(events.user_group(user.pk), self.channel)
+
+    def messages(self):
+        received = []
+        while True:
+            try:
+                received.append(async_to_sync(self.receive)())
+            except TimeoutError:
+                return received
+
+    async def receive(self):
+        return await asyncio.wait_for(self.layer.receive(self.channel), timeout=0.05)
+
+
+@pytest.fixture
+def flush_delay(settings):
+    settings.TASK_EVENTS_FLUSH_DELAY = 0.01
+    return settings
+
+
+class TestCoalesce:
+    def test_one_event_per_task(self):
+        pending = {}
+        for event in [
+            {"type": events.TASK_CREATED, "id": 1},
+            {"type": events.TASK_UPDATED, "id": 1},
+            {"type": events.TASK_UPDATED, "id": 2},
+            {"type": events.TASK_UPDATED, "id": 2},
+            {"type": events.TASK_UPDATED, "id": 3},
+            {"type": events.TASK_DELETED, "id": 3},
+            {"type": events.SHARE_GRANTED, "task": 1, "user": 5, "permission": "view"},
+            {"type": events.SHARE_REVOKED, "task": 1, "user": 5},
+        ]:
+            events.coalesce(pending, event)
+
+        assert list(pending.values()) == [
+            {"type": events.TASK_CREATED, "id": 1},
+            {"type": events.TASK_UPDATED, "id": 2},
+            {"type": events.TASK_DELETED, "id": 3},
+            {"type": events.SHARE_REVOKED, "task": 1, "user": 5},
+        ]
+
+
+@pytest.mark.django_db
+class TestPublish:
+    def test_created(self, user, django_capture_on_commit_callbacks):
+        subscriber = Subscriber(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task = TaskFactory.create(owner=user)
+
+        assert subscriber.messages() == [
+            {"type": events.MESSAGE_TYPE, "events": [{"type": events.TASK_CREATED, "id": task.pk}]}
+        ]
+
+    def test_update_reaches_owner_and_shared_users(self, user, django_capture_on_commit_callbacks):
+        share = TaskShareFactory.create(user=user)
+        owner, other = Subscriber(share.task.owner), Subscriber(UserFactory.create())
+        shared = Subscriber(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            share.task.title = "Новое название"
+            share.task.save()
+
+        expected = [{"type": events.MESSAGE_TYPE, "events": [{"type": events.TASK_UPDATED, "id": share.task.pk}]}]
+        assert owner.messages() == expected
+        assert shared.messages() == expected
+        assert other.messages() == []
+
+    def test_bulk_update_sends_one_message(self, user, django_capture_on_commit_callbacks):
+        tasks = TaskFactory.create_batch(30)
+        bulk.share_tasks(tasks, [user], TaskShare.Permission.EDIT)
+        subscriber = Subscriber(user)
+        for task in tasks:
+            task.status = Task.Status.DONE
+
+        with django_capture_on_commit_callbacks(execute=True):
+            bulk.update_tasks([(task, ["status"]) for task in tasks])
+
+        messages = subscriber.messages()
+        assert len(messages) == 1
+        assert [event["id"] for event in messages[0]["events"]] == sorted(task.pk for task in tasks)
+
+    def test_delete(self, user, django_capture_on_commit_callbacks):
+        share = TaskShareFactory.create(user=user)
+        task_id = share.task.pk
+        subscriber = Subscriber(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            bulk.delete_tasks([share.task])
+
+        assert subscriber.messages() == [
+            {"type": events.MESSAGE_TYPE, "events": [{"type": events.TASK_DELETED, "id": task_id}]}
+        ]
+
+    def test_delete_shared_task(self, user, django_capture_on_commit_callbacks):
+        task = TaskShareFactory.create(user=user).task
+        task_id = task.pk
+        owner, shared = Subscriber(task.owner), Subscriber(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            task.delete()
+
+        # каскадное удаление расшариваний не шлет task.updated после task.deleted
+        expected = [{"type": events.MESSAGE_TYPE, "events": [{"type": events.TASK_DELETED, "id": task_id}]}]
+        assert owner.messages() == expected
+        assert shared.messages() == expected
+
+    def test_share_granted_and_revoked(self, user, django_capture_on_commit_callbacks):
+        task = TaskFactory.create()
+        owner, shared = Subscriber(task.owner), Subscriber(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            share = TaskShare.objects.create(task=task, user=user, permission=TaskShare.Permission.VIEW)
+        with django_capture_on_commit_callbacks(execute=True):
+            share.delete()
+
+        granted = {"type": events.SHARE_GRANTED, "task": task.pk, "user": user.pk, "permission": "view"}
+        revoked = {"type": events.SHARE_REVOKED, "task": task.pk, "user": user.pk}
+        updated = {"type": events.TASK_UPDATED, "id": task.pk}
+        assert shared.messages() == [
+            {"type": events.MESSAGE_TYPE, "events": [granted, updated]},
+            {"type": events.MESSAGE_TYPE, "events": [revoked]},
+        ]
+        assert owner.messages() == [
+            {"type": events.MESSAGE_TYPE, "events": [granted, updated]},
+            {"type": events.MESSAGE_TYPE, "events": [revoked, updated]},
+        ]
+
+    def test_share_changes_reach_other_recipients(self, user, django_capture_on_commit_callbacks):
+        task = TaskShareFactory.create(user=user).task
+        shared, other = Subscriber(user), Subscriber(UserFactory.create())
+
+        with django_capture_on_commit_callbacks(execute=True):
+            share = TaskShare.objects.create(task=task, user=UserFactory.create(), permission=TaskShare.Permission.VIEW)
+        with django_capture_on_commit_callbacks(execute=True):
+            share.permission = TaskShare.Permission.EDIT
+            share.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            share.delete()
+
+        # смена уровня доступа не меняет задачу для остальных
+        expected = [{"type": events.MESSAGE_TYPE, "events": [{"type": events.TASK_UPDATED, "id": task.pk}]}] * 2
+        assert shared.messages() == expected
+        assert other.messages() == []
+
+    def test_nothing_sent_on_rollback(self, user):
+        subscriber = Subscriber(user)
+
+        TaskFactory.create(owner=user)
+
+        assert subscriber.messages() == []
+
+    def test_disabled(self, user, settings, django_capture_on_commit_callbacks):
+        settings.TASK_EVENTS_ENABLED = False
+        subscriber = Subscriber(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            TaskFactory.create(owner=user)
+
+        assert subscriber.messages() == []
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("flush_delay")
+class TestTaskEventsConsumer:
+    async def connect(self, path="/ws/tasks/", headers=None):
+        communicator = WebsocketCommunicator(application, path, headers=headers or [])
+        connected, code = await communicator.connect()
+        return communicator, connected, code
+
+    @run_async
+    async def test_token_in_query(self, user):
+        communicator, connected, _ = await self.connect(f"/ws/tasks/?token={AccessToken.for_user(user)}")
+
+        await communicator.send_json_to({"type": "ping"})
+
+        assert connected
+        assert await communicator.receive_json_from() == {"type": "pong"}
+        await communicator.disconnect()
+
+    @run_async
+    async def test_token_in_header(self, user):
+        headers = [(b"authorization", f"Bearer {AccessToken.for_user(user)}".encode())]
+
+        communicator, connected, _ = await self.connect(headers=headers)
+
+        assert connected
+        await communicator.disconnect()
+
+    @pytest.mark.parametrize("path", ["/ws/tasks/", "/ws/tasks/?token=invalid"])
+    @run_async
+    async def test_rejects_anonymous(self, path):
+        _, connected, code = await self.connect(path)
+
+        assert not connected
+        assert code == 4401
+
+    @run_async
+    async def test_coalesces_events(self, user):
+        communicator, _, _ = await self.connect(f"/ws/tasks/?token={AccessToken.for_user(user)}")
+        layer = get_channel_layer()
+        group = events.user_group(user.pk)
+
+        await layer.group_send(group, {"type": events.MESSAGE_TYPE, "events": [{"type": events.TASK_CREATED, "id": 1}]})
+        await layer.group_send(
+            group,
+            {
+                "type": events.MESSAGE_TYPE,
+                "events": [{"type": events.TASK_UPDATED, "id": 1}, {"type": events.TASK_UPDATED, "id": 2}],
+            },
+        )
+
+        assert await communicator.receive_json_from() == {
+            "type": "tasks.changed",
+            "data": {"events": [{"type": events.TASK_CREATED, "id": 1}, {"type": events.TASK_UPDATED, "id": 2}]},
+        }
+        assert await communicator.receive_nothing()
+        await communicator.disconnect()
+
+    @run_async
+    async def test_resync_for_large_batch(self, user, settings):
+        settings.TASK_EVENTS_MAX_BATCH = 2
+        communicator, _, _ = await self.connect(f"/ws/tasks/?token={AccessToken.for_user(user)}")
+
+        await get_channel_layer().group_send(
+            events.user_group(user.pk),
+            {"type": events.MESSAGE_TYPE, "events": [{"type": events.TASK_UPDATED, "id": pk} for pk in range(3)]},
+        )
+
+        assert await communicator.receive_json_from() == {"type": "tasks.resync"}
+        await communicator.disconnect()
+
+    @run_async
+    async def test_receives_own_changes(self, user, django_capture_on_commit_callbacks):
+        communicator, _, _ = await self.connect(f"/ws/tasks/?token={AccessToken.for_user(user)}")
+
+        def create():
+            with django_capture_on_commit_callbacks(execute=True):
+                return TaskFactory.create(owner=user)
+
+        task = await sync_to_async(create)()
+
+        assert await communicator.receive_json_from() == {
+            "type": "tasks.changed",
+            "data": {"events": [{"type": events.TASK_CREATED, "id": task.pk}]},
+        }
+        await communicator.disconnect()
+
+    @run_async
+    async def test_unknown_message(self, user):
+        communicator, _, _ = await self.connect(f"/ws/tasks/?token={AccessToken.for_user(user)}")
+
+        await communicator.send_json_to({"type": "subscribe"})
+
+        assert (await communicator.receive_json_from())["type"] == "error"
+        await communicator.disconnect()
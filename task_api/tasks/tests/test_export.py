@@ -0,0 +1,203 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from task_api.tasks import export
+from task_api.tasks.models import Task
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.tests.factories import UserFactory
+
+EXPORT_URL = reverse("api:tasks:task-export")
+LIST_URL = reverse("api:tasks:task-list")
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+
+def read_csv(response):
+    return list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+
+@pytest.fixture
+def staff(db):
+    return UserFactory(is_staff=True)
+
+
+@pytest.mark.django_db
+class TestTaskExport:
+    def test_ndjson_matches_list(self, api_client, user):
+        TaskFactory.create_batch(3, owner=user)
+        TaskShareFactory.create(user=user)
+        TaskFactory.create()
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(EXPORT_URL, {"format": "ndjson"})
+        listed = api_client.get(LIST_URL, {"ordering": "created_at"}).json()["results"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert response["Content-Disposition"] == 'attachment; filename="tasks.ndjson"'
+        assert read_ndjson(response) == sorted(listed, key=lambda task: task["id"])
+
+    def test_ndjson_is_default(self, api_client, user):
+        TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(EXPORT_URL)
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert len(read_ndjson(response)) == 1
+
+    def test_csv(self, api_client, user):
+        overdue = TaskFactory.create(
+            owner=user, title='Задача, с "кавычками"', deadline=timezone.now() - timedelta(days=1), status="new"
+        )
+        no_deadline = TaskFactory.create(owner=user, deadline=None)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(EXPORT_URL, {"format": "csv"})
+        rows = read_csv(response)
+
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+        assert [row["id"] for row in rows] == [str(overdue.id), str(no_deadline.id)]
+        assert rows[0]["title"] == overdue.title
+        assert rows[0]["is_overdue"] == "true"
+        assert rows[0]["owner_email"] == user.email
+        assert rows[1]["deadline"] == ""
+        assert rows[1]["is_overdue"] == "false"
+
+    def test_empty_csv_has_header(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(EXPORT_URL, {"format": "csv"})
+
+        assert b"".join(response.streaming_content).decode().splitlines() == [
+            "id,title,description,status,priority,deadline,owner,owner_email,is_overdue,shared_with,created_at,updated_at"
+        ]
+
+    def test_filters(self, api_client, user):
+        done = TaskFactory.create(owner=user, status=Task.Status.DONE)
+        TaskFactory.create(owner=user, status=Task.Status.NEW)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(EXPORT_URL, {"status": "done"})
+
+        assert [task["id"] for task in read_ndjson(response)] == [done.id]
+
+    def test_invalid_filter(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(EXPORT_URL, {"status": "unknown"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "status" in json.loads(response.content)
+
+    def test_staff_exports_all_tasks(self, api_client, staff):
+        tasks = TaskFactory.create_batch(3)
+        api_client.force_authenticate(user=staff)
+
+        response = api_client.get(EXPORT_URL)
+
+        assert [task["id"] for task in read_ndjson(response)] == [task.id for task in tasks]
+
+    def test_streams_in_chunks(self, api_client, user, settings):
+        settings.TASK_EXPORT_CHUNK_SIZE = 2
+        TaskFactory.create_batch(5, owner=user)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(EXPORT_URL)
+        chunks = list(response.streaming_content)
+
+        assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+
+    def test_streams_in_chunks_over_asgi(self, user, settings):
+        settings.TASK_EXPORT_CHUNK_SIZE = 2
+        TaskFactory.create_batch(5, owner=user)
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+        async def download():
+            response = await AsyncClient().get(EXPORT_URL, headers=headers)
+            return response, [chunk async for chunk in response.streaming_content]
+
+        response, chunks = async_to_sync(download)()
+
+        # асинхронный итератор: Django не собирает выгрузку в память перед отправкой
+        assert response.is_async
+        assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+
+    def test_not_atomic(self):
+        assert connection.alias in resolve(EXPORT_URL).func._non_atomic_requests
+
+    def test_requires_authentication(self, api_client):
+        assert api_client.get(EXPORT_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+# COPY читает в отдельном соединении, которому нужны закоммиченные данные
+@pytest.mark.django_db(transaction=True)
+class TestTaskDump:
+    def test_staff_dump(self, api_client, staff):
+        task = TaskFactory.create()
+        api_client.force_authenticate(user=staff)
+
+        response = api_client.get(EXPORT_URL, {"format": "csv", "dump": "true"})
+        rows = read_csv(response)
+
+        assert list(rows[0]) == export.DUMP_COLUMNS
+        assert [row["id"] for row in rows] == [str(task.id)]
+        assert rows[0]["owner_id"] == str(task.owner_id)
+
+    def test_staff_dump_over_asgi(self, staff):
+        tasks = TaskFactory.create_batch(3)
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(staff)}"}
+
+        async def download():
+            response = await AsyncClient().get(EXPORT_URL, {"format": "csv", "dump": "true"}, headers=headers)
+            return response, b"".join([chunk async for chunk in response.streaming_content])
+
+        response, content = async_to_sync(download)()
+
+        assert response.is_async
+        assert [int(row["id"]) for row in csv.DictReader(io.StringIO(content.decode()))] == [task.id for task in tasks]
+
+    def test_dump_honors_filters(self, api_client, staff):
+        TaskFactory.create(status=Task.Status.NEW)
+        done = TaskFactory.create(status=Task.Status.DONE)
+        api_client.force_authenticate(user=staff)
+
+        response = api_client.get(EXPORT_URL, {"format": "csv", "dump": "true", "status": "done"})
+
+        assert [row["id"] for row in read_csv(response)] == [str(done.id)]
+
+    def test_dump_requires_staff(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(EXPORT_URL, {"format": "csv", "dump": "true"})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_dump_requires_csv(self, api_client, staff):
+        api_client.force_authenticate(user=staff)
+
+        response = api_client.get(EXPORT_URL, {"format": "ndjson", "dump": "true"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="COPY есть только в PostgreSQL")
+    def test_copy_csv(self):
+        tasks = TaskFactory.create_batch(3)
+
+        rows = list(csv.DictReader(io.StringIO(b"".join(export.copy_csv(Task.objects.order_by("pk"))).decode())))
+
+        assert [int(row["id"]) for row in rows] == [task.id for task in tasks]
@@ -0,0 +1,286 @@
+import io
+import json
+
+import pytest
+from celery.exceptions import Retry
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from task_api.tasks.imports import ImportConflict, run_import
+from task_api.tasks.models import Task, TaskAccess, TaskImport
+from task_api.tasks.tasks import import_tasks
+from task_api.tasks.tests.factories import TaskFactory
+
+IMPORTS_URL = reverse("api:tasks:task-import-list")
+
+
+def ndjson(*records):
+    return "\n".join(record if isinstance(record, str) else json.dumps(record) for record in records).encode()
+
+
+def make_job(owner, format=TaskImport.Format.NDJSON, batch_size=2):
+    return TaskImport.objects.create(owner=owner, format=format, batch_size=batch_size)
+
+
+@pytest.mark.django_db
+class TestRunImport:
+    def test_ndjson(self, user):
+        job = make_job(user)
+        content = ndjson(
+            {"title": "Первая", "priority": "high", "deadline": "2030-01-01T10:00:00+03:00"},
+            "",
+            {"title": "Вторая", "status": "done", "id": 999, "owner": 999},
+            {"title": "", "priority": "urgent"},
+            "{не json",
+            "[1, 2]",
+        )
+
+        run_import(job, io.BytesIO(content))
+
+        job.refresh_from_db()
+        assert job.status == TaskImport.Status.DONE
+        assert (job.processed_rows, job.created_count, job.error_count) == (5, 2, 3)
+        assert [error["row"] for error in job.errors] == [3, 4, 5]
+        assert set(job.errors[0]["errors"]) == {"title", "priority"}
+        assert job.finished_at is not None
+        tasks = Task.objects.order_by("pk")
+        assert [(task.title, task.owner, task.status) for task in tasks] == [
+            ("Первая", user, Task.Status.NEW),
+            ("Вторая", user, Task.Status.DONE),
+        ]
+        assert TaskAccess.objects.filter(user=user).count() == 2
+
+    def test_csv(self, user):
+        job = make_job(user, TaskImport.Format.CSV)
+        content = (
+            "\ufefftitle,description,priority,deadline,extra\r\n"
+            'Задача,"многострочное\nописание",low,,x\r\n'
+            ",,,,\r\n"
+            "Еще,,medium,2030-01-01T10:00:00Z,y,лишнее\r\n"
+        ).encode()
+
+        run_import(job, io.BytesIO(content))
+
+        assert (job.processed_rows, job.created_count, job.error_count) == (3, 2, 1)
+        first, second = Task.objects.order_by("pk")
+        assert first.description == "многострочное\nописание"
+        assert first.deadline is None
+        assert second.priority == Task.Priority.MEDIUM
+        assert job.errors[0]["row"] == 2
+
+    def test_export_round_trip(self, api_client, user):
+        TaskFactory.create_batch(3, owner=user)
+        api_client.force_authenticate(user=user)
+        exported = b"".join(api_client.get(reverse("api:tasks:task-export"), {"format": "csv"}).streaming_content)
+        job = make_job(user, TaskImport.Format.CSV)
+
+        run_import(job, io.BytesIO(exported))
+
+        assert (job.created_count, job.error_count) == (3, 0)
+        titles = list(Task.objects.order_by("pk").values_list("title", flat=True))
+        assert titles[3:] == titles[:3]
+
+    def test_one_insert_per_batch(self, user):
+        job = make_job(user, batch_size=3)
+        content = ndjson(*({"title": f"Задача {number}"} for number in range(5)))
+
+        with CaptureQueriesContext(connection) as queries:
+            run_import(job, io.BytesIO(content))
+
+        inserts = [query for query in queries if query["sql"].startswith('INSERT INTO "tasks_task"')]
+        assert len(inserts) == 2
+        assert Task.objects.count() == 5
+
+    def test_resume_from_checkpoint(self, user):
+        job = make_job(user)
+        content = ndjson(*({"title": f"Задача {number}"} for number in range(5)))
+
+        def crash(job):
+            raise RuntimeError("worker lost")
+
+        with pytest.raises(RuntimeError):
+            run_import(job, io.BytesIO(content), on_progress=crash)
+        job = TaskImport.objects.get(pk=job.pk)
+        assert (job.status, job.processed_rows) == (TaskImport.Status.RUNNING, 2)
+
+        run_import(job, io.BytesIO(content))
+
+        assert job.processed_rows == 5
+        assert list(Task.objects.order_by("pk").values_list("title", flat=True)) == [
+            f"Задача {number}" for number in range(5)
+        ]
+
+    def test_stale_checkpoint_is_rejected(self, user):
+        job = make_job(user)
+        TaskImport.objects.filter(pk=job.pk).update(processed_rows=2)
+
+        with pytest.raises(ImportConflict):
+            run_import(job, io.BytesIO(ndjson({"title": "Дубль"})))
+
+        assert not Task.objects.exists()
+
+    def test_errors_are_capped(self, user, settings):
+        settings.TASK_IMPORT_MAX_ERRORS = 3
+        job = make_job(user)
+
+        run_import(job, io.BytesIO(ndjson(*({"title": ""} for _ in range(5)))))
+
+        assert job.error_count == 5
+        assert [error["row"] for error in TaskImport.objects.get(pk=job.pk).errors] == [1, 2, 3]
+
+    def test_unreadable_file(self, user):
+        job = make_job(user, TaskImport.Format.CSV)
+
+        run_import(job, io.BytesIO("title\nЗадача\n".encode("cp1251")))
+
+        job.refresh_from_db()
+        assert job.status == TaskImport.Status.FAILED
+        assert job.detail.startswith("Не удалось прочитать файл")
+
+
+@pytest.mark.django_db
+class TestTaskImportAPI:
+    def upload(self, api_client, name, content, **data):
+        return api_client.post(IMPORTS_URL, {"file": SimpleUploadedFile(name, content), **data}, format="multipart")
+
+    def test_import(self, api_client, user, django_capture_on_commit_callbacks):
+        api_client.force_authenticate(user=user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.upload(api_client, "tasks.ndjson", ndjson({"title": "Из файла"}, {"title": ""}))
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["status"] == TaskImport.Status.PENDING
+        assert response.data["format"] == TaskImport.Format.NDJSON
+        detail = api_client.get(reverse("api:tasks:task-import-detail", args=[response.data["id"]]))
+        assert detail.data["status"] == TaskImport.Status.DONE
+        assert (detail.data["created_count"], detail.data["error_count"]) == (1, 1)
+        assert Task.objects.get().owner == user
+
+    def test_format_from_extension(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = self.upload(api_client, "tasks.csv", b"title\n")
+
+        assert response.data["format"] == TaskImport.Format.CSV
+
+    def test_unknown_format(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = self.upload(api_client, "tasks.xlsx", b"title\n")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "format" in response.data
+
+    def test_batch_size_limit(self, api_client, user, settings):
+        settings.TASK_IMPORT_MAX_BATCH_SIZE = 10
+        api_client.force_authenticate(user=user)
+
+        response = self.upload(api_client, "tasks.csv", b"title\n", batch_size=11)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "batch_size" in response.data
+
+    def test_only_own_imports(self, api_client, user):
+        own = make_job(user)
+        other = make_job(TaskFactory.create().owner)
+        api_client.force_authenticate(user=user)
+
+        listed = api_client.get(IMPORTS_URL)
+        detail = api_client.get(reverse("api:tasks:task-import-detail", args=[other.pk]))
+
+        assert [job["id"] for job in listed.data["results"]] == [own.pk]
+        assert detail.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestImportCeleryTask:
+    def make_job(self, user, **fields):
+        job = make_job(user)
+        job.file.save("tasks.ndjson", ContentFile(ndjson(*({"title": f"Задача {number}"} for number in range(3)))))
+        TaskImport.objects.filter(pk=job.pk).update(**fields)
+        return job
+
+    def test_redelivery_resumes_from_checkpoint(self, user):
+        job = self.make_job(user, status=TaskImport.Status.RUNNING, processed_rows=2)
+
+        assert import_tasks.delay(job.pk).get() == TaskImport.Status.DONE
+        assert list(Task.objects.values_list("title", flat=True)) == ["Задача 2"]
+
+    def test_finished_import_is_skipped(self, user):
+        job = self.make_job(user, status=TaskImport.Status.DONE)
+
+        import_tasks.delay(job.pk)
+
+        assert not Task.objects.exists()
+
+    def test_unexpected_error_fails_job(self, user, monkeypatch):
+        job = self.make_job(user)
+
+        def broken(job, file, on_progress=None):
+            raise KeyError("title")
+
+        monkeypatch.setattr("task_api.tasks.imports.run_import", broken)
+        with pytest.raises(KeyError):
+            import_tasks.delay(job.pk)
+
+        job.refresh_from_db()
+        assert job.status == TaskImport.Status.FAILED
+        assert job.detail == "Импорт прерван: KeyError: 'title'"
+        assert job.finished_at is not None
+
+    @pytest.mark.parametrize(
+        ("retries", "raised", "expected"),
+        [
+            # до последней попытки задание уходит на повтор (в eager-режиме — исключение Retry)
+            (0, Retry, TaskImport.Status.PENDING),
+            (import_tasks.max_retries, DatabaseError, TaskImport.Status.FAILED),
+        ],
+    )
+    def test_database_error_fails_job_after_last_retry(self, user, monkeypatch, retries, raised, expected):
+        job = self.make_job(user)
+
+        def broken(job, file, on_progress=None):
+            raise DatabaseError("connection lost")
+
+        monkeypatch.setattr("task_api.tasks.imports.run_import", broken)
+        with pytest.raises(raised):
+            import_tasks.apply(args=[job.pk], retries=retries)
+
+        job.refresh_from_db()
+        assert job.status == expected
+
+
+@pytest.mark.django_db
+class TestImportCommand:
+    def test_import(self, user, tmp_path):
+        path = tmp_path / "tasks.ndjson"
+        path.write_bytes(ndjson(*({"title": f"Задача {number}"} for number in range(3))))
+        out = io.StringIO()
+
+        call_command("import_tasks", str(path), "--owner", user.email, "--batch-size", "2", stdout=out)
+
+        assert Task.objects.filter(owner=user).count() == 3
+        assert "создано 3" in out.getvalue()
+
+    def test_resume(self, user, tmp_path):
+        path = tmp_path / "tasks.txt"
+        path.write_bytes(ndjson(*({"title": f"Задача {number}"} for number in range(3))))
+        job = make_job(user)
+        TaskImport.objects.filter(pk=job.pk).update(processed_rows=2)
+
+        call_command("import_tasks", str(path), "--resume", str(job.pk), stdout=io.StringIO())
+
+        assert list(Task.objects.values_list("title", flat=True)) == ["Задача 2"]
+
+    def test_requires_owner(self, tmp_path):
+        path = tmp_path / "tasks.csv"
+        path.write_bytes(b"title\n")
+
+        with pytest.raises(CommandError, match="--owner"):
+            call_command("import_tasks", str(path))
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from task_api.tasks import bulk
+from task_api.tasks.models import Task
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.tests.factories import UserFactory
+
+URL = reverse("api:tasks:task-list")
+
+
+@pytest.fixture
+def tasks(user):
+    now = timezone.now()
+    return {
+        "overdue": TaskFactory.create(owner=user, deadline=now - timedelta(days=1), status=Task.Status.NEW),
+        "shared_overdue": TaskShareFactory.create(
+            user=user, task__deadline=now - timedelta(hours=1), task__status=Task.Status.IN_PROGRESS
+        ).task,
+        "done": TaskFactory.create(owner=user, deadline=now - timedelta(days=1), status=Task.Status.DONE),
+        "future": TaskFactory.create(owner=user, deadline=now + timedelta(days=1), status=Task.Status.NEW),
+        "no_deadline": TaskFactory.create(owner=user, deadline=None, status=Task.Status.NEW),
+    }
+
+
+def ids(*tasks):
+    return sorted(task.pk for task in tasks)
+
+
+@pytest.mark.django_db
+class TestOverdueFilter:
+    @pytest.fixture(autouse=True)
+    def authenticate(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+    def test_overdue(self, api_client, tasks):
+        response = api_client.get(URL, {"is_overdue": "true"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(item["id"] for item in response.data["results"]) == ids(tasks["overdue"], tasks["shared_overdue"])
+        assert all(item["is_overdue"] for item in response.data["results"])
+
+    def test_not_overdue(self, api_client, tasks):
+        response = api_client.get(URL, {"is_overdue": "false"})
+
+        assert sorted(item["id"] for item in response.data["results"]) == ids(
+            tasks["done"], tasks["future"], tasks["no_deadline"]
+        )
+
+    @pytest.mark.parametrize("ordering", ["-is_overdue,deadline", "is_overdue"])
+    def test_ordering(self, api_client, tasks, ordering):
+        response = api_client.get(URL, {"ordering": ordering})
+
+        flags = [item["is_overdue"] for item in response.data["results"]]
+        assert flags == sorted(flags, reverse=ordering.startswith("-"))
+        assert flags.count(True) == 2
+
+    def test_cursor_ordering(self, api_client, user, tasks):
+        TaskFactory.create_batch(25, owner=user, deadline=timezone.now() - timedelta(days=2), status=Task.Status.NEW)
+
+        response = api_client.get(URL, {"cursor": "", "ordering": "-is_overdue"})
+        pages = [response.data]
+        while response.data["next"]:
+            response = api_client.get(response.data["next"])
+            pages.append(response.data)
+
+        flags = [item["is_overdue"] for page in pages for item in page["results"]]
+        assert flags == [True] * 27 + [False] * 3
+
+
+@pytest.mark.django_db
+def test_is_overdue_in_sql(user, tasks):
+    rows = dict(Task.objects.filter(owner=user).with_overdue().values_list("pk", "is_overdue"))
+    totals = Task.objects.with_overdue().aggregate(overdue=Count("pk", filter=Q(is_overdue=True)))
+
+    assert rows == {task.pk: task.is_overdue for task in Task.objects.filter(owner=user)}
+    assert totals["overdue"] == 2
+    assert Task.objects.with_overdue().get(pk=tasks["overdue"].pk).is_overdue is True
+
+
+@pytest.mark.django_db
+class TestOverduePlans:
+    """Планы запросов на заполненной таблице: просроченные читаются частичными индексами."""
+
+    @pytest.fixture
+    def user(self):
+        users = UserFactory.create_batch(20)
+        now = timezone.now()
+        bulk.create_tasks(
+            Task(
+                owner=users[number % 20],
+                title=f"Задача №{number}",
+                status=Task.Status.values[number % 3],
+                deadline=now + timedelta(days=number % 40 - 20) if number % 7 else None,
+            )
+            for number in range(4000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return users[0]
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            # на небольшой таблице планировщик может предпочесть полный просмотр
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def visible(self, user, value):
+        queryset = Task.objects.visible_to(user).with_access_fields()
+        return queryset.overdue(value, prefix="access_").order_by("access_deadline")[:20]
+
+    def test_overdue_uses_partial_index(self, user):
+        plan = self.explain(self.visible(user, True))
+
+        assert "tasks_access_open_dl_idx" in plan
+
+    def test_not_overdue_has_no_full_scan_or_subquery(self, user):
+        plan = self.explain(self.visible(user, False))
+
+        assert "Seq Scan on tasks_taskaccess" not in plan
+        assert "SCAN viewer_access" not in plan
+        assert "SUBQUERY" not in plan.upper()
+        assert "SubPlan" not in plan
+
+    def test_owner_overdue_uses_partial_index(self, user):
+        plan = self.explain(Task.objects.filter(owner=user).overdue())
+
+        assert "tasks_task_owner_open_dl_idx" in plan
@@ -0,0 +1,396 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from config.celery_app import app as celery_app
+from task_api.tasks import bulk, reminders
+from task_api.tasks.models import Task, TaskReminderDelivery
+from task_api.tasks.tasks import (
+    send_deadline_digest,
+    send_deadline_reminder_shard,
+    send_deadline_reminders,
+    send_due_reminders,
+    summarize_deadline_reminders,
+)
+from task_api.tasks.tests.factories import TaskFactory
+from task_api.users.tests.factories import UserFactory
+
+
+class FlakyBackend(EmailBackend):
+    """locmem, который считает соединения, один раз отказывает адресам fail-* и всегда — dead-*."""
+
+    connections = 0
+    refused = set()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        FlakyBackend.connections += 1
+
+    def send_messages(self, messages):
+        for message in messages:
+            for recipient in message.to:
+                if recipient.startswith("dead-") or recipient.startswith("fail-") and recipient not in self.refused:
+                    self.refused.add(recipient)
+                    raise SMTPRecipientsRefused({recipient: (550, b"mailbox unavailable")})
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def backend(settings):
+    settings.EMAIL_BACKEND = f"{__name__}.FlakyBackend"
+    FlakyBackend.connections = 0
+    FlakyBackend.refused = set()
+    return FlakyBackend
+
+
+def tomorrow_at(hour, minute=0):
+    day = timezone.localdate() + timedelta(days=1)
+    start, _ = reminders.due_window(day)
+    return start + timedelta(hours=hour, minutes=minute)
+
+
+def tomorrow():
+    return timezone.localdate() + timedelta(days=1)
+
+
+def sent_owner_ids():
+    return set(TaskReminderDelivery.objects.filter(sent_at__isnull=False).values_list("owner_id", flat=True))
+
+
+@pytest.mark.django_db
+class TestDeadlineReminders:
+    @pytest.fixture(autouse=True)
+    def digest_mode(self, settings):
+        settings.TASK_REMINDER_MODE = reminders.DIGEST
+
+    def test_one_digest_per_owner(self, backend):
+        first, second = UserFactory.create(), UserFactory.create()
+        TaskFactory.create_batch(3, owner=first, status=Task.Status.NEW, deadline=tomorrow_at(10))
+        TaskFactory.create(owner=second, status=Task.Status.IN_PROGRESS, deadline=tomorrow_at(18), title="Отчет")
+        TaskFactory.create(owner=second, status=Task.Status.DONE, deadline=tomorrow_at(12))
+        TaskFactory.create(owner=second, status=Task.Status.NEW, deadline=tomorrow_at(24))
+        TaskFactory.create(owner=second, status=Task.Status.NEW, deadline=tomorrow_at(-1))
+
+        result = send_deadline_reminders.delay().get()
+
+        assert result == "Запущено частей рассылки: 1"
+        assert sorted(message.to[0] for message in mail.outbox) == sorted([first.email, second.email])
+        digest = next(message for message in mail.outbox if message.to == [second.email])
+        assert digest.subject.startswith("Напоминание: задача 'Отчет'")
+        assert "Статус: В работе" in digest.body
+        assert backend.connections == 1
+        assert sent_owner_ids() == {first.pk, second.pk}
+
+    def test_window_boundaries(self, backend):
+        owner = UserFactory.create()
+        inside = [
+            TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(0)),
+            TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(23, 59)),
+        ]
+
+        send_deadline_reminders.delay()
+
+        (digest,) = mail.outbox
+        assert all(task.title in digest.body for task in inside)
+        assert digest.subject.startswith("Напоминание: 2 задач")
+
+    def test_queries_do_not_depend_on_task_count(self, backend, django_assert_num_queries):
+        for owner in UserFactory.create_batch(5):
+            TaskFactory.create_batch(4, owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(9))
+
+        # задачи, закрепление писем в журнале (вставка и проверка), отметка об отправке
+        with django_assert_num_queries(4):
+            summary = reminders.send_reminders(tomorrow(), chunk_size=3)
+
+        assert summary == {"sent": 5, "reminded": 20, "skipped": 0, "failed": []}
+
+    def test_sharded_by_owner(self, backend, settings):
+        settings.TASK_REMINDER_SHARD_SIZE = 2
+        owners = UserFactory.create_batch(5)
+        for owner in owners:
+            TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(9))
+
+        assert send_deadline_reminders.delay().get() == "Запущено частей рассылки: 3"
+        assert sorted(message.to[0] for message in mail.outbox) == sorted(owner.email for owner in owners)
+        assert backend.connections == 3
+
+    def test_owner_ranges_cover_all_owners(self):
+        owners = UserFactory.create_batch(5)
+        for owner in owners:
+            TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(9))
+        ids = sorted(owner.pk for owner in owners)
+
+        assert reminders.owner_ranges(tomorrow(), 2) == [(None, ids[2]), (ids[2], ids[4]), (ids[4], None)]
+        assert reminders.owner_ranges(tomorrow() + timedelta(days=1), 2) == []
+
+    def test_retried_shard_does_not_resend(self, backend):
+        owners = UserFactory.create_batch(3)
+        for owner in owners:
+            TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(9))
+        day = tomorrow().isoformat()
+
+        first = send_deadline_reminder_shard.delay(day, None, None).get()
+        second = send_deadline_reminder_shard.delay(day, None, None).get()
+
+        assert (first["sent"], second["sent"], second["skipped"]) == (3, 0, 3)
+        assert len(mail.outbox) == 3
+
+    def test_interrupted_shard_resumes(self, backend, monkeypatch):
+        owners = UserFactory.create_batch(3)
+        for owner in owners:
+            TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(9))
+        message = reminders.digest_message
+        calls = []
+
+        def interrupted(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise SoftTimeLimitExceeded()
+            return message(*args, **kwargs)
+
+        monkeypatch.setattr(reminders, "digest_message", interrupted)
+        with pytest.raises(SoftTimeLimitExceeded):
+            reminders.send_reminders(tomorrow())
+        assert sent_owner_ids() == {min(owner.pk for owner in owners)}
+        assert TaskReminderDelivery.objects.count() == 1
+
+        summary = reminders.send_reminders(tomorrow())
+
+        assert (summary["sent"], summary["skipped"]) == (2, 1)
+        assert sorted(message.to[0] for message in mail.outbox) == sorted(owner.email for owner in owners)
+
+    def test_failed_recipient_is_retried(self, backend):
+        failing = UserFactory.create(email="fail-owner@example.com")
+        others = UserFactory.create_batch(2)
+        for owner in [failing, *others]:
+            TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(9))
+
+        send_deadline_reminders.delay()
+
+        assert sorted(message.to[0] for message in mail.outbox) == sorted(owner.email for owner in [failing, *others])
+        assert sent_owner_ids() == {owner.pk for owner in [failing, *others]}
+
+    def test_summary(self, monkeypatch):
+        queued = []
+        monkeypatch.setattr(send_deadline_digest, "apply_async", lambda args, **options: queued.append(args))
+        results = [
+            {"sent": 2, "reminded": 5, "skipped": 1, "failed": [7]},
+            {"sent": 1, "reminded": 1, "skipped": 0, "failed": []},
+        ]
+
+        result = summarize_deadline_reminders.delay(results, "2030-01-02").get()
+
+        assert result == "Отправлено 3 писем о 6 задачах, пропущено: 1, на повтор: 1"
+        assert queued == [(7, "2030-01-02")]
+
+    def test_nothing_due(self, backend):
+        TaskFactory.create(status=Task.Status.NEW, deadline=tomorrow_at(30))
+
+        assert send_deadline_reminders.delay().get() == "Нет задач со сроком завтра"
+        assert mail.outbox == []
+
+    def test_old_deliveries_are_purged(self, backend, user):
+        TaskReminderDelivery.objects.create(owner=user, day=tomorrow() - timedelta(days=30), claim="old")
+        TaskReminderDelivery.objects.create(owner=user, day=tomorrow() - timedelta(days=1), claim="recent")
+
+        send_deadline_reminders.delay()
+
+        assert list(TaskReminderDelivery.objects.values_list("claim", flat=True)) == ["recent"]
+
+
+@pytest.mark.django_db
+def test_benchmark_command_rolls_back():
+    out = StringIO()
+
+    call_command("benchmark_deadline_reminders", "--tasks", "20", "--owners", "4", stdout=out)
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 3
+    assert lines[1].split()[-1] == "20"
+    assert lines[2].split()[-1] == "4"
+    assert not Task.objects.exists()
+
+
+def reminder_at(task):
+    return Task.objects.values_list("next_reminder_at", flat=True).get(pk=task.pk)
+
+
+@pytest.mark.django_db
+class TestReminderSchedule:
+    @pytest.fixture
+    def task(self, user):
+        return TaskFactory.create(owner=user, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3))
+
+    def test_scheduled_at_nearest_offset(self, task):
+        assert reminder_at(task) == task.deadline - timedelta(days=1)
+
+    def test_offsets_are_configurable(self, user, settings):
+        settings.TASK_REMINDER_OFFSETS = [timedelta(days=5)]
+        task = TaskFactory.create(owner=user, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3))
+
+        assert reminder_at(task) is None
+
+    def test_unrelated_changes_keep_schedule(self, task):
+        planned = timezone.now() + timedelta(minutes=5)
+        Task.objects.filter(pk=task.pk).update(next_reminder_at=planned)
+        task = Task.objects.get(pk=task.pk)
+
+        task.title = "Изменена"
+        task.save()
+        bulk.update_tasks([(task, ["priority"])])
+
+        assert reminder_at(task) == planned
+
+    def test_rescheduled_on_deadline_and_status(self, task):
+        task.deadline = timezone.now() + timedelta(minutes=90)
+        task.save()
+        assert reminder_at(task) == task.deadline - timedelta(hours=1)
+
+        task.status = Task.Status.DONE
+        task.save(update_fields=["status"])
+        assert reminder_at(task) is None
+
+    def test_bulk_paths(self, user):
+        deadline = timezone.now() + timedelta(days=10)
+        (created,) = bulk.create_tasks([Task(owner=user, title="Новая", deadline=deadline)])
+        assert reminder_at(created) == deadline - timedelta(weeks=1)
+
+        created.deadline = deadline - timedelta(days=5)
+        bulk.update_tasks([(created, ["deadline"])])
+        assert reminder_at(created) == created.deadline - timedelta(days=1)
+
+
+@pytest.mark.django_db
+class TestDueReminders:
+    def test_sends_due_and_moves_to_next_offset(self, backend, user):
+        task = TaskFactory.create(owner=user, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3))
+        now = reminder_at(task) + timedelta(minutes=1)
+
+        assert reminders.drain_due_reminders(now=now) == (1, 0)
+        assert reminders.drain_due_reminders(now=now) == (0, 0)
+
+        (message,) = mail.outbox
+        assert message.to == [user.email]
+        assert task.title in message.subject
+        assert reminder_at(task) == task.deadline - timedelta(hours=1)
+
+    def test_skips_tasks_changed_behind_save(self, backend, user):
+        task = TaskFactory.create(owner=user, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3))
+        Task.objects.filter(pk=task.pk).update(status=Task.Status.DONE)
+
+        assert reminders.drain_due_reminders(now=task.deadline - timedelta(hours=2)) == (0, 0)
+        assert mail.outbox == []
+        assert reminder_at(task) is None
+
+    def test_failed_reminder_is_retried(self, backend, settings):
+        owner = UserFactory.create(email="fail-owner@example.com")
+        task = TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3))
+        now = reminder_at(task)
+
+        assert reminders.drain_due_reminders(now=now) == (0, 1)
+        assert reminder_at(task) == now + timedelta(seconds=settings.TASK_REMINDER_RETRY_DELAY)
+        assert reminders.drain_due_reminders(now=reminder_at(task)) == (1, 0)
+        assert [message.to for message in mail.outbox] == [[owner.email]]
+
+    def test_retries_back_off_and_give_up(self, backend, settings):
+        settings.TASK_REMINDER_MAX_ATTEMPTS = 3
+        owner = UserFactory.create(email="dead-owner@example.com")
+        task = TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3))
+        now = reminder_at(task)
+
+        delays = []
+        for _ in range(2):
+            assert reminders.drain_due_reminders(now=now) == (0, 1)
+            delays.append(reminder_at(task) - now)
+            now = reminder_at(task)
+        assert reminders.drain_due_reminders(now=now) == (0, 1)
+
+        delay = timedelta(seconds=settings.TASK_REMINDER_RETRY_DELAY)
+        assert delays == [delay, 2 * delay]
+        # после последней попытки — следующее напоминание по расписанию, счет попыток заново
+        assert reminder_at(task) == task.deadline - timedelta(hours=1)
+        assert Task.objects.get(pk=task.pk).reminder_attempts == 0
+        (failure,) = TaskReminderDelivery.objects.filter(task=task)
+        assert (failure.owner_id, failure.day, failure.failed_at) == (owner.pk, timezone.localdate(task.deadline), now)
+        assert "mailbox unavailable" in failure.error
+
+    def test_reschedule_resets_attempts(self, backend, settings):
+        owner = UserFactory.create(email="dead-owner@example.com")
+        task = TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3))
+        reminders.drain_due_reminders(now=reminder_at(task))
+        task.refresh_from_db()
+        assert task.reminder_attempts == 1
+
+        task.deadline += timedelta(days=1)
+        task.save()
+
+        assert Task.objects.get(pk=task.pk).reminder_attempts == 0
+
+    def test_give_up_does_not_block_digest(self, backend, settings):
+        owner = UserFactory.create(email="dead-owner@example.com")
+        task = TaskFactory.create(owner=owner, status=Task.Status.NEW, deadline=tomorrow_at(10))
+        TaskReminderDelivery.objects.create(owner=owner, day=tomorrow(), task=task, failed_at=timezone.now())
+
+        assert reminders.claim([owner.pk], tomorrow()) == {owner.pk}
+        reminders.release([owner.pk], tomorrow())
+
+        assert TaskReminderDelivery.objects.filter(task=task).exists()
+
+    def test_drains_in_batches(self, backend):
+        tasks = TaskFactory.create_batch(5, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3))
+
+        sent, _ = reminders.drain_due_reminders(now=max(reminder_at(task) for task in tasks), batch_size=2)
+
+        assert sent == 5
+        assert backend.connections == 1
+
+    def test_queries_do_not_depend_on_table_size(self, backend, user, django_assert_num_queries):
+        TaskFactory.create_batch(30, owner=user, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=30))
+        due = TaskFactory.create_batch(
+            2, owner=user, status=Task.Status.NEW, deadline=timezone.now() + timedelta(days=3)
+        )
+
+        now = max(reminder_at(task) for task in due)
+
+        # SAVEPOINT, выборка наступивших напоминаний, обновление расписания, RELEASE
+        with django_assert_num_queries(4):
+            sent, _ = reminders.drain_due_reminders(now=now)
+
+        assert sent == 2
+
+    def test_task(self, backend):
+        assert send_due_reminders.delay().get() == "Отправлено напоминаний: 0, на повтор: 0"
+
+
+@pytest.mark.django_db
+class TestReminderMode:
+    @pytest.fixture
+    def task(self):
+        task = TaskFactory.create(status=Task.Status.NEW, deadline=tomorrow_at(10))
+        Task.objects.filter(pk=task.pk).update(next_reminder_at=timezone.now() - timedelta(minutes=1))
+        return task
+
+    def test_both_reminders_are_scheduled(self):
+        tasks = {entry["task"] for entry in celery_app.conf.beat_schedule.values()}
+
+        assert {"task_api.tasks.tasks.send_due_reminders", "task_api.tasks.tasks.send_deadline_reminders"} <= tasks
+
+    def test_per_task_mode_skips_digest(self, backend, task):
+        assert send_deadline_reminders.delay().get() == "Дневная рассылка отключена (TASK_REMINDER_MODE=per_task)"
+        assert send_due_reminders.delay().get() == "Отправлено напоминаний: 1, на повтор: 0"
+        assert len(mail.outbox) == 1
+
+    def test_digest_mode_skips_per_task(self, backend, settings, task):
+        settings.TASK_REMINDER_MODE = reminders.DIGEST
+
+        assert send_due_reminders.delay().get() == "Напоминания по задачам отключены (TASK_REMINDER_MODE=digest)"
+        assert send_deadline_reminders.delay().get() == "Запущено частей рассылки: 1"
+        assert len(mail.outbox) == 1
+        assert Task.objects.get(pk=task.pk).next_reminder_at < timezone.now()
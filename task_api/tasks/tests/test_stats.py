@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from task_api.tasks import bulk, stats
+from task_api.tasks.models import Task, TaskShare, TaskStats
+from task_api.tasks.tasks import reconcile_task_stats
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.tests.factories import UserFactory
+
+URL = reverse("api:tasks:task-stats")
+
+
+def counters(user):
+    row = TaskStats.objects.get(user=user)
+    return {field: getattr(row, field) for field in TaskStats.COUNTERS}
+
+
+def assert_matches_rebuild(*users):
+    for user in users:
+        incremental = counters(user)
+        stats.rebuild([user.pk], now=TaskStats.objects.get(user=user).checked_at)
+        assert incremental == counters(user)
+
+
+@pytest.mark.django_db
+class TestTaskStatsView:
+    def test_counts(self, api_client, user):
+        TaskFactory.create(owner=user, status=Task.Status.NEW, priority=Task.Priority.HIGH)
+        TaskFactory.create(owner=user, status=Task.Status.DONE, priority=Task.Priority.LOW)
+        yesterday = timezone.now() - timedelta(days=1)
+        TaskFactory.create(
+            owner=user, deadline=yesterday, status=Task.Status.IN_PROGRESS, priority=Task.Priority.MEDIUM
+        )
+        TaskFactory.create(owner=user, deadline=yesterday, status=Task.Status.DONE, priority=Task.Priority.MEDIUM)
+        TaskShareFactory.create(user=user, task__status=Task.Status.NEW, task__priority=Task.Priority.HIGH)
+        TaskFactory.create()
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(URL)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["total"] == 5
+        assert response.data["by_status"] == {"new": 2, "in_progress": 1, "done": 2}
+        assert response.data["by_priority"] == {"low": 1, "medium": 2, "high": 2}
+        assert response.data["overdue"] == 1
+
+    def test_queries_do_not_depend_on_task_count(self, api_client, user, django_assert_num_queries):
+        TaskFactory.create_batch(30, owner=user)
+        api_client.force_authenticate(user=user)
+        api_client.get(URL)
+
+        # SAVEPOINT, сводка, досчет просроченных после пересчета, RELEASE
+        with django_assert_num_queries(4):
+            response = api_client.get(URL)
+
+        assert response.data["total"] == 30
+
+    def test_overdue_after_reconcile(self, api_client, user):
+        task = TaskFactory.create(owner=user, deadline=timezone.now() + timedelta(hours=1), status=Task.Status.NEW)
+        stats.user_stats(user)
+        TaskStats.objects.filter(user=user).update(checked_at=timezone.now() - timedelta(hours=2))
+        Task.objects.filter(pk=task.pk).update(deadline=timezone.now() - timedelta(hours=1))
+        task.refresh_from_db()
+        task.save()
+        api_client.force_authenticate(user=user)
+
+        assert api_client.get(URL).data["overdue"] == 1
+
+    def test_requires_authentication(self, api_client):
+        assert api_client.get(URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestIncrementalStats:
+    @pytest.fixture
+    def owner(self, user):
+        TaskFactory.create_batch(3, owner=user, status=Task.Status.NEW)
+        stats.user_stats(user)
+        return user
+
+    def test_created(self, owner):
+        TaskFactory.create(owner=owner, status=Task.Status.DONE)
+        bulk.create_tasks([Task(owner=owner, title=str(index)) for index in range(3)])
+
+        assert counters(owner)["total"] == 7
+        assert_matches_rebuild(owner)
+
+    def test_updated(self, owner):
+        task = owner.owned_tasks.first()
+        task.status = Task.Status.DONE
+        task.priority = Task.Priority.HIGH
+        task.deadline = timezone.now() - timedelta(days=1)
+        task.save()
+        tasks = list(owner.owned_tasks.exclude(pk=task.pk))
+        for item in tasks:
+            item.deadline = timezone.now() - timedelta(days=1)
+        bulk.update_tasks([(item, ["deadline"]) for item in tasks])
+
+        assert counters(owner)["overdue"] == 2
+        assert_matches_rebuild(owner)
+
+    def test_deleted(self, owner):
+        tasks = list(owner.owned_tasks.all())
+        tasks[0].delete()
+        bulk.delete_tasks(tasks[1:2])
+
+        assert counters(owner)["total"] == 1
+        assert_matches_rebuild(owner)
+
+    def test_shares(self, owner):
+        other = UserFactory.create()
+        stats.user_stats(other)
+        tasks = list(owner.owned_tasks.all())
+
+        share = TaskShare.objects.create(task=tasks[0], user=other)
+        bulk.share_tasks(tasks[1:], [other], TaskShare.Permission.EDIT)
+        assert counters(other)["total"] == 3
+        share.delete()
+
+        assert counters(other)["total"] == 2
+        assert counters(owner)["total"] == 3
+        assert_matches_rebuild(owner, other)
+
+    def test_reowned(self, owner):
+        other = UserFactory.create()
+        stats.user_stats(other)
+        task = owner.owned_tasks.first()
+
+        task.owner = other
+        task.save()
+
+        assert (counters(owner)["total"], counters(other)["total"]) == (2, 1)
+        assert_matches_rebuild(owner, other)
+
+    def test_users_without_stats_are_skipped(self, owner):
+        other = UserFactory.create()
+
+        TaskShareFactory.create(task=owner.owned_tasks.first(), user=other)
+
+        assert not TaskStats.objects.filter(user=other).exists()
+
+
+@pytest.mark.django_db
+class TestReconcile:
+    def test_fixes_drift(self, user):
+        TaskFactory.create_batch(2, owner=user)
+        stats.user_stats(user)
+        TaskStats.objects.filter(user=user).update(total=100, status_new=-1)
+
+        reconcile_task_stats.delay()
+
+        row = TaskStats.objects.get(user=user)
+        assert row.total == 2
+        assert row.status_new + row.status_in_progress + row.status_done == 2
@@ -1,11 +1,16 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from task_api.utils.pagination import EstimatedCountPaginator
+
 from .models import User
 
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
+    # на больших таблицах количество — оценка планировщика, без второго COUNT по всей таблице
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_display = [
         "email",
         "full_name_display",
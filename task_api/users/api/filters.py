@@ -0,0 +1,31 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models.functions import Greatest
+from rest_framework.filters import SearchFilter
+
+
+class UserTrigramSearchFilter(SearchFilter):
+    """
+    Поиск пользователей по подстроке с ранжированием по сходству триграмм.
+
+    В PostgreSQL `icontains` (`UPPER(col) LIKE UPPER('%term%')`) обслуживается
+    GIN-индексами `gin_trgm_ops` по `UPPER(col)`, а результаты сортируются по
+    `word_similarity`. На других СУБД — обычный `SearchFilter` с сортировкой по email.
+    """
+
+    similarity_field = "similarity"
+
+    def filter_queryset(self, request, queryset, view):
+        queryset = super().filter_queryset(request, queryset, view)
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        if connections[queryset.db].vendor != "postgresql":
+            return queryset.order_by(*view.ordering)
+
+        term = " ".join(terms)
+        similarity = Greatest(*(TrigramWordSimilarity(term, field) for field in view.search_fields))
+        return queryset.annotate(**{self.similarity_field: similarity}).order_by(
+            f"-{self.similarity_field}", *view.ordering
+        )
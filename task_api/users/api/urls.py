@@ -1,12 +1,17 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
+    AsyncUserSearchView,
     UserProfileView,
     UserSearchView,
 )
 
 app_name = "users"
 
+if settings.API_ASYNC_VIEWS:
+    UserSearchView = AsyncUserSearchView  # noqa: F811
+
 urlpatterns = [
     path("", UserSearchView.as_view(), name="user-search"),
     path("me/", UserProfileView.as_view(), name="user-profile"),
@@ -1,10 +1,17 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import generics
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 
+from task_api.users.api.filters import UserTrigramSearchFilter
 from task_api.users.models import User
+from task_api.utils.async_views import AsyncAPIViewMixin, afetch
+from task_api.utils.pagination import CAPPED, ESTIMATED, CountingPageNumberPagination
 
 from .serializers import (
     UserProfileSerializer,
@@ -22,12 +29,15 @@
             OpenApiParameter(
                 "search",
                 OpenApiTypes.STR,
-                description="Поиск по email, имени или фамилии",
+                description=(
+                    "Поиск по email, имени или фамилии (не короче USER_SEARCH_MIN_LENGTH символов). "
+                    "Результаты упорядочены по сходству и ограничены USER_SEARCH_MAX_RESULTS"
+                ),
             ),
             OpenApiParameter(
                 "ordering",
                 OpenApiTypes.STR,
-                description="Сортировка (доступные поля: email, first_name, last_name, date_joined)",
+                description="Сортировка без поиска (доступные поля: email, first_name, last_name, date_joined)",
             ),
         ],
     ),
@@ -35,7 +45,11 @@
 class UserSearchView(generics.ListAPIView):
     serializer_class = UserSearchSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [SearchFilter, OrderingFilter]
+    pagination_class = CountingPageNumberPagination
+    # без поиска список охватывает всю таблицу пользователей
+    count_strategy = CAPPED
+    staff_count_strategy = ESTIMATED
+    filter_backends = [UserTrigramSearchFilter, OrderingFilter]
     search_fields = ["email", "first_name", "last_name"]
     ordering_fields = ["email", "first_name", "last_name", "date_joined"]
     ordering = ["email"]
@@ -47,6 +61,100 @@ def get_queryset(self):
             .only("email", "first_name", "last_name")
         )
 
+    def list(self, request, *args, **kwargs):
+        term = " ".join(UserTrigramSearchFilter().get_search_terms(request))
+        if not term:
+            return super().list(request, *args, **kwargs)
+
+        # кэш общий для всех пользователей, поэтому текущий исключается уже после него
+        rows = [row for row in self.search(term) if row["email"] != request.user.email]
+        page = self.paginate_queryset(rows[: settings.USER_SEARCH_MAX_RESULTS])
+        return self.get_paginated_response(page)
+
+    def search(self, term):
+        term = term.lower()
+        if len(term) < settings.USER_SEARCH_MIN_LENGTH:
+            return []
+
+        if not settings.USER_SEARCH_CACHE_TIMEOUT:
+            return self.search_rows(list(self.search_queryset()))
+        keys = self.search_keys(term)
+        rows = self.cached_search(term, keys, cache.get_many(list(keys)))
+        if rows is None:
+            rows = self.search_rows(list(self.search_queryset()))
+            cache.add(self.search_key(term), rows, settings.USER_SEARCH_CACHE_TIMEOUT)
+        return rows
+
+    def search_queryset(self):
+        queryset = User.objects.filter(is_active=True).only("email", "first_name", "last_name")
+        queryset = UserTrigramSearchFilter().filter_queryset(self.request, queryset, self)
+        return queryset[: settings.USER_SEARCH_MAX_RESULTS + 1]
+
+    def search_rows(self, users):
+        return [dict(row) for row in self.get_serializer(users, many=True).data]
+
+    def search_key(self, term):
+        return "user-search:" + hashlib.sha256(term.encode()).hexdigest()
+
+    def search_keys(self, term):
+        # ключи самого запроса и его префиксов не короче USER_SEARCH_MIN_LENGTH, от длинных к коротким
+        prefixes = dict.fromkeys(
+            term[:length].strip() for length in range(len(term), settings.USER_SEARCH_MIN_LENGTH - 1, -1)
+        )
+        return {
+            self.search_key(prefix): prefix for prefix in prefixes if len(prefix) >= settings.USER_SEARCH_MIN_LENGTH
+        }
+
+    def cached_search(self, term, keys, found):
+        """
+        Результат из кэша: свой или отфильтрованный в памяти результат более короткого префикса.
+
+        Каждое слово префикса — подстрока слова запроса, поэтому совпадения запроса входят
+        в совпадения префикса. Префикс подходит, только если его результат не обрезан
+        USER_SEARCH_MAX_RESULTS; порядок (сходство с префиксом) сохраняется.
+        """
+        for key, prefix in keys.items():
+            rows = found.get(key)
+            if rows is None:
+                continue
+            if prefix == term:
+                return rows
+            if len(rows) <= settings.USER_SEARCH_MAX_RESULTS:
+                return [row for row in rows if self.matches(row, term.split())]
+        return None
+
+    def matches(self, row, words):
+        # как SearchFilter: каждое слово встречается хотя бы в одном поле поиска
+        values = [(row[field] or "").lower() for field in self.search_fields]
+        return all(any(word in value for value in values) for word in words)
+
+
+class AsyncUserSearchView(AsyncAPIViewMixin, UserSearchView):
+    async def aget(self, request, *args, **kwargs):
+        term = " ".join(UserTrigramSearchFilter().get_search_terms(request))
+        if not term:
+            queryset = self.filter_queryset(self.get_queryset())
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+        rows = [row for row in await self.asearch(term) if row["email"] != request.user.email]
+        page = self.paginate_queryset(rows[: settings.USER_SEARCH_MAX_RESULTS])
+        return self.get_paginated_response(page)
+
+    async def asearch(self, term):
+        term = term.lower()
+        if len(term) < settings.USER_SEARCH_MIN_LENGTH:
+            return []
+
+        if not settings.USER_SEARCH_CACHE_TIMEOUT:
+            return self.search_rows(await afetch(self.search_queryset()))
+        keys = self.search_keys(term)
+        rows = self.cached_search(term, keys, await cache.aget_many(list(keys)))
+        if rows is None:
+            rows = self.search_rows(await afetch(self.search_queryset()))
+            await cache.aadd(self.search_key(term), rows, settings.USER_SEARCH_CACHE_TIMEOUT)
+        return rows
+
 
 @extend_schema_view(
     retrieve=extend_schema(
@@ -0,0 +1,157 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import QuerySet
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.pagination import PageNumberPagination
+
+
+async def afetch(object_list):
+    if isinstance(object_list, QuerySet):
+        return [item async for item in object_list]
+    return list(object_list)
+
+
+async def aiterate(iterable):
+    """
+    Асинхронный итератор поверх синхронного: элементы читаются по одному в потоке.
+
+    Под ASGI StreamingHttpResponse с синхронным итератором читается целиком
+    (`sync_to_async(list)`) до отправки первого байта; с этим итератором поток
+    уходит клиенту по кускам.
+    """
+    iterator = iter(iterable)
+    done = object()
+    try:
+        while (item := await sync_to_async(next)(iterator, done)) is not done:
+            yield item
+    finally:
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination с асинхронным `apaginate_queryset`: количество через `acount`,
+    страница через асинхронную итерацию queryset.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count — cached_property, заранее посчитанное значение заменяет синхронный COUNT
+        paginator.count = await queryset.acount() if isinstance(queryset, QuerySet) else len(queryset)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise exceptions.NotFound(msg) from exc
+
+        self.page.object_list = await afetch(self.page.object_list)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+
+# Асинхронный dispatch для generic-представлений DRF: GET и HEAD обрабатываются
+# корутинами `aget`/`ahead` в цикле событий, аутентификация — через `aauthenticate`
+# (если есть у класса аутентификации). Остальные методы выполняет синхронное
+# представление в потоке, в транзакции по ATOMIC_REQUESTS.
+# Без docstring, иначе drf-spectacular подставит его в описание операций.
+class AsyncAPIViewMixin:
+    view_is_async = True
+    async_methods = ("get", "head")
+    # ответы в этих форматах рендерятся сразу, без перехода в поток
+    inline_render_formats = ("json",)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # с ATOMIC_REQUESTS Django не принимает корутины; транзакции открывает синхронный путь
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() in self.async_methods:
+            return self.adispatch(request, *args, **kwargs)
+        return self.sync_dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            method = request.method.lower()
+            handler = getattr(self, "a" + method, None)
+            if method == "head" and handler is None:
+                handler = getattr(self, "aget", None)
+            if handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        if hasattr(self.response, "render") and request.accepted_renderer.format in self.inline_render_formats:
+            self.response.render()
+        return self.response
+
+    async def sync_dispatch(self, request, *args, **kwargs):
+        dispatch = super().dispatch
+        if connections[DEFAULT_DB_ALIAS].settings_dict["ATOMIC_REQUESTS"]:
+            dispatch = transaction.atomic(using=DEFAULT_DB_ALIAS)(dispatch)
+
+        def render():
+            response = dispatch(request, *args, **kwargs)
+            return response.render() if hasattr(response, "render") else response
+
+        return await sync_to_async(render)()
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, "aauthenticate", None) or sync_to_async(authenticator.authenticate)
+            try:
+                user_auth_tuple = await authenticate(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404 from None
+
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -0,0 +1,9 @@
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Splits an iterable into lists of at most `size` items without materializing it."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
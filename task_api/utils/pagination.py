@@ -0,0 +1,276 @@
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework import exceptions
+from rest_framework.fields import BooleanField
+from rest_framework.response import Response
+
+from task_api.utils.async_views import AsyncPageNumberPagination, afetch
+
+# способы подсчета количества строк
+EXACT = "exact"
+CACHED = "cached"
+CAPPED = "capped"
+ESTIMATED = "estimated"
+
+# точность количества в ответе
+COUNT_EXACT = "exact"
+COUNT_AT_LEAST = "at_least"
+COUNT_ESTIMATED = "estimated"
+
+COUNT_KEY = "pagination:count:{scope}:{digest}"
+
+
+def estimate_count(queryset):
+    """Число строк по оценке планировщика PostgreSQL (EXPLAIN) без выполнения запроса; None на других СУБД."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для админки: на больших таблицах количество берется из оценки
+    планировщика, точный COUNT — только когда оценка меньше PAGINATION_ESTIMATE_THRESHOLD.
+    """
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class CountingPageNumberPagination(AsyncPageNumberPagination):
+    """
+    Постраничная пагинация с выбором способа подсчета количества.
+
+    Способ задает `count_strategy` представления (для персонала — `staff_count_strategy`):
+
+    - `exact` — COUNT(*) на каждый запрос;
+    - `cached` — COUNT(*) кэшируется по набору фильтров в пространстве
+      `view.get_count_scope()`; представление меняет пространство при записи.
+      Выборки с параметрами из `view.time_dependent_params` меняются со временем
+      без записи, их количество считается точно;
+    - `capped` — счет останавливается на PAGINATION_COUNT_CAP строк (или на
+      конце запрошенной страницы, если она дальше), в ответе «N+»;
+    - `estimated` — оценка планировщика из EXPLAIN, точный счет на небольших выборках.
+
+    С `?count=false` количество не считается: страница читается с одной
+    лишней строкой, по которой видно, есть ли следующая.
+    """
+
+    count_query_param = "count"
+    count_strategy = EXACT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        paginator = self.start(queryset, request, view)
+        if paginator is None:
+            return None
+        if self.strategy is None:
+            rows = list(self.lookahead_queryset(paginator))
+        else:
+            self.set_count(paginator, self.get_count(paginator, view))
+            rows = None
+        self.finish(paginator, rows)
+        return list(self.page)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        paginator = self.start(queryset, request, view)
+        if paginator is None:
+            return None
+        if self.strategy is None:
+            rows = await afetch(self.lookahead_queryset(paginator))
+        else:
+            self.set_count(paginator, await self.aget_count(paginator, view))
+            rows = None
+        self.finish(paginator, rows)
+        if rows is None:
+            self.page.object_list = await afetch(self.page.object_list)
+        return list(self.page)
+
+    def start(self, queryset, request, view):
+        self.request = request
+        self.per_page = self.get_page_size(request)
+        if not self.per_page:
+            return None
+
+        self.strategy = self.get_count_strategy(request, view)
+        self.number = request.query_params.get(self.page_query_param) or 1
+        if self.number in self.last_page_strings and self.strategy != EXACT:
+            # номер последней страницы известен только по точному количеству
+            self.strategy = EXACT
+        self.count = None
+        self.count_accuracy = None
+        return self.django_paginator_class(queryset, self.per_page)
+
+    def finish(self, paginator, rows):
+        if rows is not None:
+            # без подсчета количество — конец прочитанного куска, лишняя строка добавляет следующую страницу
+            paginator.count = self.bottom + len(rows)
+        number = self.get_page_number(self.request, paginator)
+        try:
+            self.page = paginator.page(number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=number, message=str(exc))
+            raise exceptions.NotFound(msg) from exc
+
+        if rows is not None:
+            self.page.object_list = rows[: self.per_page]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+    def get_count_strategy(self, request, view):
+        if not self.wants_count(request):
+            return None
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff and getattr(view, "staff_count_strategy", None):
+            return view.staff_count_strategy
+        return getattr(view, "count_strategy", self.count_strategy)
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, "").lower() not in BooleanField.FALSE_VALUES
+
+    def page_index(self):
+        # неверный номер отклонит Paginator.page(), здесь достаточно разумной границы
+        try:
+            return max(int(self.number), 1)
+        except (TypeError, ValueError):
+            return 1
+
+    def lookahead_queryset(self, paginator):
+        self.bottom = (self.page_index() - 1) * self.per_page
+        return paginator.object_list[self.bottom : self.bottom + self.per_page + 1]
+
+    def set_count(self, paginator, counted):
+        # Paginator.count — cached_property, заранее посчитанное значение заменяет его COUNT
+        paginator.count, self.count, self.count_accuracy = counted
+
+    def count_limit(self):
+        # страница дальше предела тоже должна открываться
+        return max(settings.PAGINATION_COUNT_CAP, self.page_index() * self.per_page)
+
+    def get_count(self, paginator, view):
+        """Возвращает количество для Paginator, количество для ответа и его точность."""
+        queryset = paginator.object_list
+        if not isinstance(queryset, QuerySet):
+            return self.exact(len(queryset))
+
+        if self.strategy == CAPPED:
+            limit = self.count_limit()
+            return self.capped(queryset[: limit + 1].count(), limit)
+        if self.strategy == ESTIMATED:
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD:
+                return estimate, estimate, COUNT_ESTIMATED
+        if self.strategy == CACHED and self.caches_count(view):
+            key = self.get_count_key(view.get_count_scope() if hasattr(view, "get_count_scope") else None)
+            if key is not None:
+                return self.exact(cache.get_or_set(key, queryset.count, settings.PAGINATION_COUNT_CACHE_TIMEOUT))
+        return self.exact(queryset.count())
+
+    async def aget_count(self, paginator, view):
+        queryset = paginator.object_list
+        if not isinstance(queryset, QuerySet):
+            return self.exact(len(queryset))
+
+        if self.strategy == CAPPED:
+            limit = self.count_limit()
+            return self.capped(await queryset[: limit + 1].acount(), limit)
+        if self.strategy == ESTIMATED:
+            estimate = await sync_to_async(estimate_count)(queryset)
+            if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD:
+                return estimate, estimate, COUNT_ESTIMATED
+        if self.strategy == CACHED and self.caches_count(view):
+            key = self.get_count_key(await view.aget_count_scope() if hasattr(view, "aget_count_scope") else None)
+            if key is not None:
+                count = await cache.aget(key)
+                if count is None:
+                    count = await queryset.acount()
+                    await cache.aset(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+                return self.exact(count)
+        return self.exact(await queryset.acount())
+
+    def exact(self, count):
+        return count, count, COUNT_EXACT
+
+    def capped(self, count, limit):
+        if count <= limit:
+            return self.exact(count)
+        # на одну строку больше предела: у последней посчитанной страницы есть следующая
+        return count, limit, COUNT_AT_LEAST
+
+    def caches_count(self, view):
+        params = getattr(view, "time_dependent_params", ())
+        return not any(name in self.request.query_params for name in params)
+
+    def get_count_key(self, scope):
+        if scope is None or not settings.PAGINATION_COUNT_CACHE_TIMEOUT:
+            return None
+        # номер и размер страницы в ключ не входят: количество от них не зависит
+        ignored = {self.page_query_param, self.page_size_query_param, self.count_query_param}
+        query = urlencode(
+            sorted((name, values) for name, values in self.request.query_params.lists() if name not in ignored),
+            doseq=True,
+        )
+        source = f"{self.request.path}?{query}"
+        return COUNT_KEY.format(scope=scope, digest=hashlib.sha256(source.encode()).hexdigest())
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "count_accuracy": self.count_accuracy,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        properties = response_schema["properties"]
+        properties["count"] = {**properties["count"], "nullable": True}
+        properties = {
+            "count": properties.pop("count"),
+            "count_accuracy": {
+                "type": "string",
+                "nullable": True,
+                "enum": [COUNT_EXACT, COUNT_AT_LEAST, COUNT_ESTIMATED],
+                "description": (
+                    "exact — точное количество, at_least — не меньше count (count+), "
+                    "estimated — оценка; null, если количество не запрашивалось"
+                ),
+            },
+            **properties,
+        }
+        return {**response_schema, "properties": properties}
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "false — не считать общее количество (count и count_accuracy будут null)",
+                "schema": {"type": "boolean"},
+            },
+        ]
@@ -0,0 +1,35 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# даты и время кодирует JSONEncoder из DRF, чтобы формат ответа не менялся
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+_default = JSONEncoder().default
+
+_ESCAPES = [("\u2028".encode(), b"\\u2028"), ("\u2029".encode(), b"\\u2029")]
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson с тем же выводом, что и у рендерера DRF.
+
+    Отступы, ASCII-вывод и значения, которые orjson не умеет кодировать
+    (например, целые больше 64 бит), отдаются стандартному рендереру.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # как и DRF, экранируем разделители строк, недопустимые в JavaScript
+        for char, escaped in _ESCAPES:
+            if char in ret:
+                ret = ret.replace(char, escaped)
+        return ret
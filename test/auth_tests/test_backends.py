@@ -0,0 +1,56 @@
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from task_api.authentication.backends import AsyncJWTAuthentication
+
+
+def authenticate(header=None):
+    extra = {"HTTP_AUTHORIZATION": header} if header is not None else {}
+    request = APIRequestFactory().get("/", **extra)
+    return async_to_sync(AsyncJWTAuthentication().aauthenticate)(request)
+
+
+@pytest.mark.django_db
+class TestAsyncJWTAuthentication:
+    def test_authenticates(self, user):
+        token = AccessToken.for_user(user)
+
+        authenticated, validated_token = authenticate(f"Bearer {token}")
+
+        assert authenticated == user
+        assert validated_token["user_id"] == str(user.pk)
+
+    def test_same_result_as_sync(self, user):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+        assert AsyncJWTAuthentication().authenticate(request)[0] == authenticate(request.META["HTTP_AUTHORIZATION"])[0]
+
+    @pytest.mark.parametrize("header", [None, "", "Basic abc"])
+    def test_no_token(self, header):
+        assert authenticate(header) is None
+
+    def test_invalid_token(self):
+        with pytest.raises(InvalidToken):
+            authenticate("Bearer invalid")
+
+    def test_unknown_user(self, user):
+        token = AccessToken.for_user(user)
+        user.delete()
+
+        with pytest.raises(AuthenticationFailed) as exc_info:
+            authenticate(f"Bearer {token}")
+
+        assert exc_info.value.detail["code"] == "user_not_found"
+
+    def test_inactive_user(self, user):
+        token = AccessToken.for_user(user)
+        user.is_active = False
+        user.save()
+
+        with pytest.raises(AuthenticationFailed) as exc_info:
+            authenticate(f"Bearer {token}")
+
+        assert exc_info.value.detail["code"] == "user_inactive"
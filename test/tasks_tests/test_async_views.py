@@ -0,0 +1,211 @@
+import io
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient
+from django.urls import path
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from task_api.authentication.backends import AsyncJWTAuthentication
+from task_api.tasks.api.views import (
+    AsyncTaskDetailView,
+    AsyncTaskListCreateView,
+    TaskDetailView,
+    TaskListCreateView,
+)
+from task_api.tasks.models import Task
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+
+# для проверки через ASGI-обработчик целиком (@pytest.mark.urls)
+urlpatterns = [
+    path("tasks/", AsyncTaskListCreateView.as_view()),
+    path("tasks/<int:pk>/", AsyncTaskDetailView.as_view()),
+]
+
+
+def auth_headers(user):
+    return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+
+def call(view_class, request, **kwargs):
+    view = view_class.as_view()
+    if iscoroutinefunction(view):
+        return async_to_sync(view)(request, **kwargs)
+    return view(request, **kwargs).render()
+
+
+def get_both(sync_view, async_view, user, path="/api/tasks/", data=None, **kwargs):
+    request = APIRequestFactory().get(path, data, **auth_headers(user))
+    return call(sync_view, request, **kwargs), call(async_view, request, **kwargs)
+
+
+@pytest.mark.django_db
+class TestAsyncTaskViews:
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {},
+            {"page": 2},
+            {"status": ["new", "done"], "ordering": "deadline"},
+            {"fields": "id,title,is_overdue"},
+            {"include": "owner_profile,shares"},
+            {"cursor": ""},
+            {"count": "false", "page": 2},
+        ],
+    )
+    def test_list_matches_sync(self, user, params):
+        TaskFactory.create_batch(22, owner=user)
+        TaskShareFactory.create(user=user)
+
+        sync_response, async_response = get_both(TaskListCreateView, AsyncTaskListCreateView, user, data=params)
+
+        assert async_response.status_code == status.HTTP_200_OK
+        assert json.loads(async_response.content) == json.loads(sync_response.content)
+        assert async_response["ETag"] == sync_response["ETag"]
+
+    def test_list_cursor_pages(self, user):
+        TaskFactory.create_batch(25, owner=user)
+        request = APIRequestFactory().get("/api/tasks/", {"cursor": ""}, **auth_headers(user))
+        first = json.loads(call(AsyncTaskListCreateView, request).content)
+
+        request = APIRequestFactory().get(first["next"], **auth_headers(user))
+        second = json.loads(call(AsyncTaskListCreateView, request).content)
+
+        ids = [task["id"] for task in first["results"] + second["results"]]
+        assert sorted(ids) == sorted(Task.objects.values_list("id", flat=True))
+
+    def test_list_not_modified(self, user):
+        TaskFactory.create(owner=user)
+        request = APIRequestFactory().get("/api/tasks/", **auth_headers(user))
+        etag = call(AsyncTaskListCreateView, request)["ETag"]
+
+        request = APIRequestFactory().get("/api/tasks/", HTTP_IF_NONE_MATCH=etag, **auth_headers(user))
+        response = call(AsyncTaskListCreateView, request)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_list_cache(self, user, settings):
+        settings.TASK_LIST_CACHE_ENABLED = True
+        TaskFactory.create(owner=user)
+
+        responses = [
+            call(AsyncTaskListCreateView, APIRequestFactory().get("/api/tasks/", **auth_headers(user)))
+            for _ in range(2)
+        ]
+
+        assert [response["X-Cache"] for response in responses] == ["MISS", "HIT"]
+        assert responses[0].content == responses[1].content
+
+    def test_detail_matches_sync(self, user):
+        task = TaskFactory.create(owner=user)
+
+        sync_response, async_response = get_both(
+            TaskDetailView,
+            AsyncTaskDetailView,
+            user,
+            f"/api/tasks/{task.pk}/",
+            {"include": "owner_profile"},
+            pk=task.pk,
+        )
+
+        assert async_response.status_code == status.HTTP_200_OK
+        assert json.loads(async_response.content) == json.loads(sync_response.content)
+        assert async_response["Last-Modified"] == sync_response["Last-Modified"]
+
+    def test_detail_of_foreign_task(self, user):
+        task = TaskFactory.create()
+        request = APIRequestFactory().get(f"/api/tasks/{task.pk}/", **auth_headers(user))
+
+        assert call(AsyncTaskDetailView, request, pk=task.pk).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_write_goes_through_sync_view(self, user):
+        task = TaskFactory.create(owner=user)
+        request = APIRequestFactory().patch(
+            f"/api/tasks/{task.pk}/", {"title": "Новое"}, format="json", **auth_headers(user)
+        )
+
+        response = call(AsyncTaskDetailView, request, pk=task.pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Task.objects.get(pk=task.pk).title == "Новое"
+
+    def test_requires_authentication(self):
+        response = call(AsyncTaskListCreateView, APIRequestFactory().get("/api/tasks/"))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response["WWW-Authenticate"].startswith("Bearer")
+
+    def test_invalid_token(self):
+        request = APIRequestFactory().get("/api/tasks/", HTTP_AUTHORIZATION="Bearer invalid")
+
+        response = call(AsyncTaskListCreateView, request)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert json.loads(response.content)["code"] == "token_not_valid"
+
+    def test_authentication_is_async(self, user, monkeypatch):
+        def authenticate(self, request):
+            raise AssertionError("синхронная аутентификация")
+
+        monkeypatch.setattr(AsyncJWTAuthentication, "authenticate", authenticate)
+        request = APIRequestFactory().get("/api/tasks/", **auth_headers(user))
+
+        assert call(AsyncTaskListCreateView, request).status_code == status.HTTP_200_OK
+
+    def test_not_atomic(self):
+        view = AsyncTaskListCreateView.as_view()
+
+        assert iscoroutinefunction(view)
+        assert connection.alias in view._non_atomic_requests
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(__name__)
+class TestAsyncTaskViewsOverASGI:
+    def test_read_and_write(self, user):
+        client = AsyncClient()
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+        async def exchange():
+            created = await client.post(
+                "/tasks/", {"title": "Через ASGI"}, content_type="application/json", headers=headers
+            )
+            listed = await client.get("/tasks/", headers=headers)
+            detail = await client.get(f"/tasks/{created.json()['id']}/", headers=headers)
+            return created, listed, detail
+
+        created, listed, detail = async_to_sync(exchange)()
+
+        assert created.status_code == status.HTTP_201_CREATED
+        assert [task["title"] for task in listed.json()["results"]] == ["Через ASGI"]
+        assert detail.json()["owner_email"] == user.email
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrencyBenchmark:
+    def test_command(self, live_server, user):
+        TaskFactory.create(owner=user)
+        out = io.StringIO()
+
+        call_command(
+            "benchmark_concurrency",
+            f"first={live_server.url}",
+            f"second={live_server.url}",
+            "--email",
+            user.email,
+            "--requests",
+            "4",
+            # SQLite в памяти: живой сервер и тест делят одно соединение
+            "--concurrency",
+            "1",
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        assert [line.split()[0] for line in lines[1:]] == ["first", "second"]
+        assert all(line.split()[-1] == "0" for line in lines[1:])
@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from task_api.tasks.models import TaskShare
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+
+LIST_URL = reverse("api:tasks:task-list")
+
+
+def task_select(queries):
+    return next(query["sql"] for query in queries if query["sql"].startswith('SELECT "tasks_task"."id"'))
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_fields_trim_response_and_columns(self, api_client, user):
+        TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(LIST_URL, {"fields": "id,title,status,priority"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data["results"][0]) == ["id", "title", "status", "priority"]
+        sql = task_select(queries)
+        assert '"tasks_task"."description"' not in sql
+        assert "users_user" not in sql
+
+    def test_default_response_is_unchanged(self, api_client, user):
+        TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(LIST_URL)
+
+        assert "description" in response.data["results"][0]
+        assert "owner_email" in response.data["results"][0]
+        assert "owner_profile" not in response.data["results"][0]
+        assert "shares" not in response.data["results"][0]
+
+    def test_computed_fields_load_their_columns(self, api_client, user, django_assert_max_num_queries):
+        TaskFactory.create_batch(3, owner=user)
+        api_client.force_authenticate(user=user)
+
+        with django_assert_max_num_queries(5):
+            response = api_client.get(LIST_URL, {"fields": "id,is_overdue,owner_email,shared_with"})
+
+        assert set(response.data["results"][0]) == {"id", "is_overdue", "owner_email", "shared_with"}
+        assert response.data["results"][0]["owner_email"] == user.email
+
+    def test_include_owner_profile(self, api_client, user):
+        TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(LIST_URL, {"fields": "id", "include": "owner_profile"})
+
+        assert response.data["results"][0]["owner_profile"]["email"] == user.email
+        assert set(response.data["results"][0]) == {"id", "owner_profile"}
+
+    def test_include_shares_only_for_owner(self, api_client, user):
+        own = TaskFactory.create(owner=user)
+        share = TaskShareFactory.create(task=own, permission=TaskShare.Permission.EDIT)
+        shared = TaskFactory.create()
+        TaskShareFactory.create(task=shared, user=user)
+        TaskShareFactory.create(task=shared)
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(LIST_URL, {"fields": "id", "include": "shares"})
+
+        shares = {task["id"]: task["shares"] for task in response.data["results"]}
+        assert shares[own.id] == [{"user": share.user_id, "user_email": share.user.email, "permission": "edit"}]
+        assert shares[shared.id] == []
+
+    def test_unknown_fields_are_rejected(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(LIST_URL, {"fields": "id,secret", "include": "everything"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data) == {"fields", "include"}
+
+    def test_cursor_pagination_with_fields(self, api_client, user, django_assert_max_num_queries):
+        TaskFactory.create_batch(3, owner=user)
+        api_client.force_authenticate(user=user)
+
+        # SAVEPOINT, ETag, страница, RELEASE — без догрузки отложенных полей сортировки
+        with django_assert_max_num_queries(4):
+            response = api_client.get(LIST_URL, {"fields": "id", "cursor": "", "ordering": "deadline"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 3
+
+    def test_detail_fields(self, api_client, user, django_assert_max_num_queries):
+        task = TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+        url = reverse("api:tasks:task-detail", kwargs={"pk": task.pk})
+
+        with django_assert_max_num_queries(3):
+            response = api_client.get(url, {"fields": "title"})
+
+        assert response.data == {"title": task.title}
+        assert response["ETag"]
+
+    def test_writes_ignore_fields(self, api_client, user):
+        task = TaskFactory.create(owner=user)
+        api_client.force_authenticate(user=user)
+        url = reverse("api:tasks:task-detail", kwargs={"pk": task.pk}) + "?fields=id"
+
+        response = api_client.patch(url, {"title": "Новое"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["title"] == "Новое"
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from task_api.tasks.api.rows import TaskRowSerializer
+from task_api.tasks.api.serializers import TaskSerializer
+from task_api.tasks.api.views import TaskListCreateView
+from task_api.tasks.models import Task
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+
+LIST_URL = reverse("api:tasks:task-list")
+
+
+@pytest.fixture
+def varied_tasks(user):
+    now = timezone.now()
+    tasks = [
+        TaskFactory.create(owner=user, deadline=None, description=""),
+        TaskFactory.create(owner=user, deadline=now - timedelta(days=1), status=Task.Status.NEW),
+        TaskFactory.create(owner=user, deadline=now - timedelta(days=1), status=Task.Status.DONE),
+        TaskFactory.create(owner=user, deadline=now + timedelta(days=3), title='Юникод — «кавычки» "и" \\ слэш'),
+    ]
+    TaskShareFactory.create_batch(2, task=tasks[0])
+    shared = TaskFactory.create(deadline=now.replace(microsecond=0))
+    TaskShareFactory.create(task=shared, user=user)
+    return [*tasks, shared]
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+def fetch(api_client, monkeypatch, fast, params=None):
+    monkeypatch.setattr(TaskListCreateView, "fast_serialization", fast)
+    response = api_client.get(LIST_URL, params or {})
+    assert response.status_code == 200
+    return response.content
+
+
+@pytest.mark.django_db
+class TestTaskRowSerializerParity:
+    def test_rows_match_task_serializer(self, user, varied_tasks):
+        request = APIRequestFactory().get(LIST_URL)
+        force_authenticate(request, user=user)
+        serializer = TaskSerializer(context={"request": request})
+        queryset = Task.objects.visible_to(user).select_related("owner").order_by("pk")
+
+        rows = TaskRowSerializer(serializer)
+        fast = rows.to_representation(list(rows.values(queryset)))
+        slow = TaskSerializer(list(queryset), many=True, context={"request": request}).data
+
+        assert render(fast) == render(slow)
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {},
+            {"page": 1},
+            {"ordering": "deadline"},
+            {"ordering": "-priority,status"},
+            {"status": ["new", "done"]},
+            {"is_overdue": "true"},
+            {"search": "кавычки"},
+            {"fields": "id,title,status,priority"},
+            {"fields": "is_overdue,owner_email,shared_with,deadline"},
+            {"cursor": ""},
+            {"cursor": "", "ordering": "deadline"},
+        ],
+    )
+    def test_list_responses_are_identical(self, api_client, user, varied_tasks, monkeypatch, params):
+        api_client.force_authenticate(user=user)
+
+        assert fetch(api_client, monkeypatch, True, params) == fetch(api_client, monkeypatch, False, params)
+
+    def test_cursor_pages_are_identical(self, api_client, user, varied_tasks, monkeypatch):
+        TaskFactory.create_batch(25, owner=user)
+        api_client.force_authenticate(user=user)
+        pages = {}
+        for fast in (True, False):
+            monkeypatch.setattr(TaskListCreateView, "fast_serialization", fast)
+            first = api_client.get(LIST_URL, {"cursor": "", "ordering": "deadline"})
+            second = api_client.get(first.data["next"])
+            pages[fast] = [first.content, second.content]
+
+        assert pages[True] == pages[False]
+
+    def test_expansions_use_model_serializer(self, api_client, user, varied_tasks, monkeypatch):
+        api_client.force_authenticate(user=user)
+        params = {"include": "owner_profile,shares"}
+
+        assert fetch(api_client, monkeypatch, True, params) == fetch(api_client, monkeypatch, False, params)
+
+    def test_fast_path_does_not_build_models(self, api_client, user, varied_tasks, monkeypatch):
+        api_client.force_authenticate(user=user)
+        built = []
+        original = Task.from_db.__func__
+        monkeypatch.setattr(Task, "from_db", classmethod(lambda cls, *args: built.append(1) or original(cls, *args)))
+
+        fetch(api_client, monkeypatch, True)
+
+        assert built == []
+
+
+@pytest.mark.django_db
+def test_benchmark_command_rolls_back():
+    out = StringIO()
+
+    call_command("benchmark_task_serialization", "--rows", "3", "5", "--repeat", "1", stdout=out)
+
+    assert len(out.getvalue().splitlines()) == 3
+    assert not Task.objects.exists()
@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from task_api.tasks.tests.factories import TaskFactory
+
+postgres_only = pytest.mark.skipif(connection.vendor != "postgresql", reason="полнотекстовый поиск только в PostgreSQL")
+
+
+@pytest.mark.django_db
+class TestTaskSearch:
+    def test_search_matches_title_and_description(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create(owner=user, title="Quarterly report", description="")
+        TaskFactory.create(owner=user, title="Misc", description="Prepare the quarterly report")
+        TaskFactory.create(owner=user, title="Misc", description="Nothing here")
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"search": "report"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 2
+
+    def test_rank_ordering_without_search_is_ignored(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create_batch(2, owner=user)
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"ordering": "rank"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 2
+
+    def test_snippet_only_on_request(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create(owner=user, title="Report", description="Quarterly report draft")
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"search": "report"})
+
+        assert "search_snippet" not in response.data["results"][0]
+
+    @postgres_only
+    def test_russian_morphology(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create(owner=user, title="Встреча с клиентами", description="")
+        TaskFactory.create(owner=user, title="Отчет", description="")
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"search": "встречи клиента"})
+
+        assert [item["title"] for item in response.data["results"]] == ["Встреча с клиентами"]
+
+    @postgres_only
+    def test_rank_ordering_prefers_title_matches(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        in_description = TaskFactory.create(owner=user, title="Misc", description="Budget review")
+        in_title = TaskFactory.create(owner=user, title="Budget", description="")
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"search": "budget", "ordering": "rank"})
+
+        assert [item["id"] for item in response.data["results"]] == [in_title.pk, in_description.pk]
+
+    @postgres_only
+    def test_rank_ordering_with_cursor(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create_batch(25, owner=user, title="Budget", description="budget")
+        TaskFactory.create_batch(5, owner=user, title="Budget", description="")
+
+        response = api_client.get(
+            reverse("api:tasks:task-list"), {"search": "budget", "ordering": "rank", "cursor": ""}
+        )
+        ids = [item["id"] for item in response.data["results"]]
+        response = api_client.get(response.data["next"])
+        ids += [item["id"] for item in response.data["results"]]
+
+        assert len(ids) == len(set(ids)) == 30
+
+    @postgres_only
+    def test_highlight(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create(owner=user, title="Report", description="Quarterly report draft")
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"search": "report", "highlight": "true"})
+
+        assert response.data["results"][0]["search_snippet"] == "Quarterly <mark>report</mark> draft"
+
+    @postgres_only
+    def test_vector_follows_updates(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        task = TaskFactory.create(owner=user, title="Old title", description="")
+
+        api_client.patch(reverse("api:tasks:task-detail", kwargs={"pk": task.pk}), data={"title": "Budget"})
+        response = api_client.get(reverse("api:tasks:task-list"), {"search": "budget"})
+
+        assert response.data["count"] == 1
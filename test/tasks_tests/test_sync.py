@@ -0,0 +1,196 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from task_api.tasks import bulk, sync
+from task_api.tasks.models import Task, TaskShare, TaskTombstone
+from task_api.tasks.tasks import purge_task_tombstones
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.tests.factories import UserFactory
+
+URL = reverse("api:tasks:task-sync")
+
+
+def get_sync(api_client, token=None):
+    response = api_client.get(URL, {"since": token} if token else {})
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def task_ids(data):
+    return sorted(task["id"] for task in data["tasks"])
+
+
+@pytest.fixture
+def client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+# изменения фиксируются до запроса: в PostgreSQL незафиксированная транзакция теста
+# остается за границей видимости
+@pytest.mark.django_db(transaction=True)
+class TestTaskSyncView:
+    def test_full_sync_without_token(self, client, user):
+        own = TaskFactory.create_batch(2, owner=user)
+        share = TaskShareFactory.create(user=user)
+        TaskFactory.create()
+
+        data = get_sync(client)
+
+        assert data["reset"] is True
+        assert data["has_more"] is False
+        assert data["deleted"] == []
+        assert task_ids(data) == sorted([task.pk for task in own] + [share.task_id])
+        assert data["tasks"][0].keys() >= {"id", "title", "status", "owner_email", "shared_with"}
+
+    def test_nothing_changed(self, client, user):
+        TaskFactory.create_batch(3, owner=user)
+        token = get_sync(client)["token"]
+
+        data = get_sync(client, token)
+
+        assert (data["reset"], data["tasks"], data["deleted"]) == (False, [], [])
+
+    def test_only_changed_tasks(self, client, user):
+        tasks = TaskFactory.create_batch(3, owner=user)
+        token = get_sync(client)["token"]
+
+        tasks[1].title = "Изменена"
+        tasks[1].save()
+        created = TaskFactory.create(owner=user)
+        data = get_sync(client, token)
+
+        assert task_ids(data) == sorted([tasks[1].pk, created.pk])
+        assert {task["title"] for task in data["tasks"] if task["id"] == tasks[1].pk} == {"Изменена"}
+        assert get_sync(client, data["token"])["tasks"] == []
+
+    def test_deleted_task(self, client, user):
+        tasks = TaskFactory.create_batch(2, owner=user)
+        token = get_sync(client)["token"]
+        deleted_id = tasks[0].pk
+
+        tasks[0].delete()
+        data = get_sync(client, token)
+
+        assert data["tasks"] == []
+        assert data["deleted"] == [deleted_id]
+
+    def test_bulk_deleted_tasks(self, client, user):
+        tasks = TaskFactory.create_batch(3, owner=user)
+        token = get_sync(client)["token"]
+
+        bulk.delete_tasks(tasks[:2])
+
+        assert get_sync(client, token)["deleted"] == sorted(task.pk for task in tasks[:2])
+
+    def test_share_granted_and_revoked(self, client, user):
+        task = TaskFactory.create()
+        token = get_sync(client)["token"]
+
+        share = TaskShare.objects.create(task=task, user=user)
+        data = get_sync(client, token)
+        assert task_ids(data) == [task.pk]
+
+        share.delete()
+        data = get_sync(client, data["token"])
+        assert (data["tasks"], data["deleted"]) == ([], [task.pk])
+
+    def test_regranted_share_is_not_deleted(self, client, user):
+        share = TaskShareFactory.create(user=user)
+        token = get_sync(client)["token"]
+
+        share.delete()
+        TaskShare.objects.create(task=share.task, user=user)
+        data = get_sync(client, token)
+
+        assert task_ids(data) == [share.task_id]
+        assert data["deleted"] == []
+
+    def test_share_changes_reach_owner(self, client, user):
+        task = TaskFactory.create(owner=user)
+        token = get_sync(client)["token"]
+
+        TaskShareFactory.create(task=task)
+        data = get_sync(client, token)
+
+        assert [(item["id"], item["shared_with"]) for item in data["tasks"]] == [(task.pk, 1)]
+
+    def test_reowned_task_is_deleted_for_former_owner(self, client, user):
+        task = TaskFactory.create(owner=user)
+        token = get_sync(client)["token"]
+
+        task.owner = UserFactory.create()
+        task.save()
+
+        assert get_sync(client, token)["deleted"] == [task.pk]
+
+    def test_pages_until_no_more(self, client, user, settings):
+        settings.TASK_SYNC_PAGE_SIZE = 2
+        tasks = TaskFactory.create_batch(5, owner=user)
+        token = get_sync(client)["token"]
+        bulk.update_tasks([(task, ["status"]) for task in tasks])
+        bulk.delete_tasks(tasks[:1])
+
+        pages = [get_sync(client, token)]
+        while pages[-1]["has_more"]:
+            pages.append(get_sync(client, pages[-1]["token"]))
+
+        assert [len(page["tasks"]) + len(page["deleted"]) for page in pages] == [2, 2, 1]
+        changed = [task["id"] for page in pages for task in page["tasks"]]
+        deleted = [task_id for page in pages for task_id in page["deleted"]]
+        assert sorted(changed) == sorted(task.pk for task in tasks[1:])
+        assert deleted == [tasks[0].pk]
+
+    def test_queries_do_not_depend_on_dataset_size(self, client, user, django_assert_max_num_queries):
+        TaskFactory.create_batch(50, owner=user)
+        changed = TaskFactory.create(owner=user)
+        token = get_sync(client)["token"]
+        changed.title = "Изменена"
+        changed.save()
+
+        # SAVEPOINT, граница видимости, две порции изменений (доступ и следы), задачи, RELEASE
+        with django_assert_max_num_queries(6):
+            data = get_sync(client, token)
+
+        assert task_ids(data) == [changed.pk]
+
+    def test_invalid_token(self, client):
+        response = client.get(URL, {"since": "1.0:подделка"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "since" in response.data
+
+    def test_expired_token_forces_full_sync(self, client, user, settings):
+        task = TaskFactory.create(owner=user)
+        token = get_sync(client)["token"]
+        settings.TASK_SYNC_TOKEN_MAX_AGE = timedelta(seconds=-1)
+
+        data = get_sync(client, token)
+
+        assert data["reset"] is True
+        assert task_ids(data) == [task.pk]
+
+    def test_requires_authentication(self, api_client):
+        assert api_client.get(URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestTombstones:
+    def test_token_round_trip(self):
+        assert sync.read_token(sync.make_token(42, 7)) == (42, 7)
+
+    def test_purge_keeps_recent(self, user, settings):
+        tasks = TaskFactory.create_batch(2, owner=user)
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).delete()
+        old = TaskTombstone.objects.get(task_id=tasks[0].pk)
+        TaskTombstone.objects.filter(pk=old.pk).update(
+            deleted_at=timezone.now() - settings.TASK_SYNC_TOKEN_MAX_AGE - timedelta(days=2)
+        )
+
+        purge_task_tombstones.delay()
+
+        assert list(TaskTombstone.objects.values_list("task_id", flat=True)) == [tasks[1].pk]
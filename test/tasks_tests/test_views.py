@@ -1,8 +1,12 @@
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 
-from task_api.tasks.models import Task, TaskShare
+from task_api.tasks import bulk
+from task_api.tasks.models import Task, TaskAccess, TaskShare
 from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
 from task_api.users.tests.factories import UserFactory
 
@@ -90,6 +94,19 @@ def test_delete_task(self, api_client, user):
         assert response.status_code == status.HTTP_204_NO_CONTENT
         assert not Task.objects.filter(pk=task.pk).exists()
 
+    @pytest.mark.parametrize("shares", [1, 5])
+    def test_delete_shared_task_queries(self, api_client, user, shares, django_assert_num_queries):
+        task = TaskFactory.create(owner=user)
+        TaskShareFactory.create_batch(shares, task=task)
+        api_client.force_authenticate(user=user)
+
+        # тот же путь, что у массового удаления: число запросов не зависит от числа расшариваний
+        with django_assert_num_queries(15):
+            response = api_client.delete(reverse("api:tasks:task-detail", kwargs={"pk": task.pk}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not TaskShare.objects.filter(task_id=task.pk).exists()
+
     def test_cannot_update_others_task(self, api_client):
         user1 = UserFactory.create()
         user2 = UserFactory.create()
@@ -164,3 +181,261 @@ def test_shared_user_with_view_cannot_update(self, api_client):
         )
 
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestTaskListCursorPagination:
+    def _collect(self, api_client, params, direction="next"):
+        response = api_client.get(reverse("api:tasks:task-list"), {"cursor": "", **params})
+        pages = [response.data]
+        while response.data[direction]:
+            response = api_client.get(response.data[direction])
+            assert response.status_code == status.HTTP_200_OK
+            pages.append(response.data)
+        return pages
+
+    def _collect_page_numbers(self, api_client, ordering):
+        response = api_client.get(reverse("api:tasks:task-list"), {"ordering": ordering, "page": 1})
+        results = list(response.data["results"])
+        while response.data["next"]:
+            response = api_client.get(response.data["next"])
+            results.extend(response.data["results"])
+        return results
+
+    def test_cursor_mode_skips_count(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create_batch(3, owner=user)
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"cursor": ""})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert response.data["previous"] is None
+        assert response.data["next"] is None
+        assert len(response.data["results"]) == 3
+
+    @pytest.mark.parametrize(
+        "ordering",
+        [
+            "-created_at",
+            "created_at",
+            "deadline",
+            "-deadline",
+            "priority",
+            "-status",
+            "status,-deadline",
+            "-is_overdue,deadline",
+        ],
+    )
+    def test_cursor_walks_every_task_once(self, api_client, user, ordering):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create_batch(15, owner=user)
+        TaskFactory.create_batch(10, owner=user, deadline=None)
+        TaskFactory.create_batch(20, owner=user, status=Task.Status.NEW, priority=Task.Priority.HIGH)
+
+        pages = self._collect(api_client, {"ordering": ordering})
+        ids = [item["id"] for page in pages for item in page["results"]]
+        expected = [item["id"] for item in self._collect_page_numbers(api_client, ordering)]
+
+        assert len(pages) == 3
+        assert len(ids) == len(set(ids)) == 45
+        assert sorted(ids) == sorted(expected)
+
+    def test_cursor_previous_link_returns_same_pages(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create_batch(45, owner=user)
+
+        forward = self._collect(api_client, {"ordering": "priority"})
+        last_page = api_client.get(reverse("api:tasks:task-list"), {"cursor": "", "ordering": "priority"})
+        while last_page.data["next"]:
+            last_page = api_client.get(last_page.data["next"])
+        backward = [last_page.data]
+        response = last_page
+        while response.data["previous"]:
+            response = api_client.get(response.data["previous"])
+            backward.append(response.data)
+
+        forward_ids = [[item["id"] for item in page["results"]] for page in forward]
+        backward_ids = [[item["id"] for item in page["results"]] for page in reversed(backward)]
+        assert forward_ids == backward_ids
+
+    def test_cursor_includes_shared_tasks(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create_batch(2, owner=user)
+        TaskShareFactory.create(user=user)
+        TaskFactory.create()
+
+        pages = self._collect(api_client, {})
+
+        assert sum(len(page["results"]) for page in pages) == 3
+
+    def test_invalid_cursor(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"cursor": "broken"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_page_number_mode_still_counts(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        TaskFactory.create_batch(25, owner=user)
+
+        response = api_client.get(reverse("api:tasks:task-list"), {"page": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 25
+        assert len(response.data["results"]) == 5
+
+
+@pytest.mark.django_db
+class TestSemanticOrdering:
+    @pytest.fixture
+    def tasks(self, user):
+        tasks = [
+            TaskFactory.create(owner=user, status=status_value, priority=priority)
+            for status_value, priority in [
+                (Task.Status.DONE, Task.Priority.LOW),
+                (Task.Status.NEW, Task.Priority.HIGH),
+                (Task.Status.IN_PROGRESS, Task.Priority.MEDIUM),
+            ]
+        ]
+        TaskShareFactory.create(user=user, task__status=Task.Status.NEW, task__priority=Task.Priority.LOW)
+        return tasks
+
+    @pytest.mark.parametrize(
+        ("ordering", "field", "expected"),
+        [
+            ("priority", "priority", ["low", "low", "medium", "high"]),
+            ("-priority", "priority", ["high", "medium", "low", "low"]),
+            ("status", "status", ["new", "new", "in_progress", "done"]),
+            ("-status", "status", ["done", "in_progress", "new", "new"]),
+        ],
+    )
+    @pytest.mark.parametrize("cursor", [False, True])
+    def test_order_follows_choices(self, api_client, user, tasks, ordering, field, expected, cursor):
+        api_client.force_authenticate(user=user)
+        params = {"ordering": ordering, "page_size": 2, **({"cursor": ""} if cursor else {})}
+
+        response = api_client.get(reverse("api:tasks:task-list"), params)
+        results = list(response.data["results"])
+        while response.data["next"]:
+            response = api_client.get(response.data["next"])
+            results.extend(response.data["results"])
+
+        assert [item[field] for item in results] == expected
+
+    def test_ranks_follow_changes(self, user):
+        task = TaskFactory.create(owner=user, status=Task.Status.NEW, priority=Task.Priority.LOW)
+
+        task.status = Task.Status.DONE
+        task.save(update_fields=["status"])
+        task.priority = Task.Priority.HIGH
+        bulk.update_tasks([(task, ["priority"])])
+
+        assert Task.objects.values_list("status_rank", "priority_rank").get(pk=task.pk) == (3, 3)
+        assert set(TaskAccess.objects.filter(task=task).values_list("status_rank", "priority_rank")) == {(3, 3)}
+
+
+@pytest.mark.django_db
+class TestSharesCount:
+    def test_share_paths_keep_counter_exact(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        task = TaskFactory.create(owner=user)
+        other_user = UserFactory.create()
+        url = reverse("api:tasks:task-share", kwargs={"pk": task.pk})
+
+        api_client.post(url, data={"email": other_user.email, "permission": "view"})
+        api_client.post(url, data={"email": other_user.email, "permission": "edit"})
+        task.refresh_from_db()
+        assert task.shares_count == 1
+
+        share = TaskShare.objects.get(task=task)
+        api_client.delete(reverse("api:tasks:task-share-delete", kwargs={"pk": share.pk}))
+        task.refresh_from_db()
+        assert task.shares_count == 0
+
+    def test_drifted_counter_does_not_block_unshare(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        share = TaskShareFactory.create(task=TaskFactory.create(owner=user))
+        Task.objects.filter(pk=share.task_id).update(shares_count=0)
+
+        response = api_client.delete(reverse("api:tasks:task-share-delete", kwargs={"pk": share.pk}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert Task.objects.get(pk=share.task_id).shares_count == 0
+
+    def test_task_update_does_not_overwrite_counter(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        task = TaskFactory.create(owner=user)
+        TaskShareFactory.create(task=task)
+
+        response = api_client.patch(reverse("api:tasks:task-detail", kwargs={"pk": task.pk}), data={"title": "New"})
+
+        assert response.data["shared_with"] == 1
+        task.refresh_from_db()
+        assert task.shares_count == 1
+
+    def test_list_reports_counter_without_loading_shares(self, api_client, user, django_assert_max_num_queries):
+        api_client.force_authenticate(user=user)
+        for task in TaskFactory.create_batch(5, owner=user):
+            TaskShareFactory.create_batch(3, task=task)
+
+        # SAVEPOINT/RELEASE запроса, ETag списка, count и страница — без запросов к расшариваниям
+        with django_assert_max_num_queries(5):
+            response = api_client.get(reverse("api:tasks:task-list"))
+
+        assert [item["shared_with"] for item in response.data["results"]] == [3] * 5
+
+    def test_recount_command(self):
+        tasks = TaskFactory.create_batch(3)
+        TaskShareFactory.create_batch(2, task=tasks[0])
+        Task.objects.update(shares_count=7)
+
+        call_command("recount_task_shares", stdout=StringIO())
+
+        assert dict(Task.objects.values_list("pk", "shares_count")) == {tasks[0].pk: 2, tasks[1].pk: 0, tasks[2].pk: 0}
+
+
+@pytest.fixture(params=["owner", "edit", "view"])
+def task_for_role(request, user):
+    if request.param == "owner":
+        return request.param, TaskFactory.create(owner=user)
+    task = TaskFactory.create()
+    TaskShareFactory.create(task=task, user=user, permission=request.param)
+    return request.param, task
+
+
+@pytest.mark.django_db
+class TestTaskPermissionQueries:
+    # уровень доступа приходит аннотацией в том же запросе, что и задача:
+    # SAVEPOINT, SELECT задачи, RELEASE (ROLLBACK TO при отказе)
+    def test_retrieve(self, api_client, user, task_for_role, django_assert_num_queries):
+        _, task = task_for_role
+        api_client.force_authenticate(user=user)
+
+        with django_assert_num_queries(3):
+            response = api_client.get(reverse("api:tasks:task-detail", kwargs={"pk": task.pk}))
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_partial_update(self, api_client, user, task_for_role, django_assert_num_queries):
+        role, task = task_for_role
+        api_client.force_authenticate(user=user)
+
+        # разрешенное изменение добавляет UPDATE задачи и синхронизацию TaskAccess
+        # (пользователи задачи, вклад в сводки до и после, SAVEPOINT, отметка изменения,
+        # UPDATE копий, прежние владельцы для следов удаления, DELETE, upsert владельца, RELEASE)
+        with django_assert_num_queries(4 if role == "view" else 14):
+            response = api_client.patch(reverse("api:tasks:task-detail", kwargs={"pk": task.pk}), {"title": "Новое"})
+
+        expected = status.HTTP_403_FORBIDDEN if role == "view" else status.HTTP_200_OK
+        assert response.status_code == expected
+
+    def test_no_access_is_not_found(self, api_client, user, django_assert_num_queries):
+        task = TaskFactory.create()
+        api_client.force_authenticate(user=user)
+
+        with django_assert_num_queries(4):
+            response = api_client.patch(reverse("api:tasks:task-detail", kwargs={"pk": task.pk}), {"title": "Новое"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,7 +1,16 @@
+import json
+
+import factory
 import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 
+from task_api.users.api.views import AsyncUserSearchView, UserSearchView
 from task_api.users.tests.factories import UserFactory
 
 
@@ -330,3 +339,116 @@ def test_ordering_descending(self, api_client, user):
         assert response.status_code == status.HTTP_200_OK
         emails = [result["email"] for result in response.data["results"]]
         assert emails == sorted(emails, reverse=True)
+
+
+@pytest.mark.django_db
+class TestUserSearchDirectory:
+    def test_short_query_returns_nothing(self, api_client, user, settings):
+        settings.USER_SEARCH_MIN_LENGTH = 3
+        api_client.force_authenticate(user=user)
+        UserFactory.create(email="alice@example.com")
+
+        response = api_client.get(reverse("api:users:user-search"), {"search": "al"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 0
+
+    def test_results_are_capped(self, api_client, user, settings):
+        settings.USER_SEARCH_MAX_RESULTS = 5
+        api_client.force_authenticate(user=user)
+        UserFactory.create_batch(8)
+
+        response = api_client.get(reverse("api:users:user-search"), {"search": "example"})
+
+        assert response.data["count"] == 5
+
+    def test_repeated_query_is_served_from_cache(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        UserFactory.create(email="cached@example.com")
+        api_client.get(reverse("api:users:user-search"), {"search": "cached"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("api:users:user-search"), {"search": "CACHED"})
+
+        assert not [query for query in queries if "users_user" in query["sql"]]
+
+        assert [row["email"] for row in response.data["results"]] == ["cached@example.com"]
+
+    def test_longer_term_is_served_from_prefix_cache(self, api_client, user):
+        api_client.force_authenticate(user=user)
+        UserFactory.create(email="alexander@example.com", first_name="Александр", last_name="Иванов")
+        UserFactory.create(email="alena@example.com", first_name="Алена", last_name="Петрова")
+        api_client.get(reverse("api:users:user-search"), {"search": "ale"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("api:users:user-search"), {"search": "alex"})
+
+        assert not [query for query in queries if "users_user" in query["sql"]]
+        assert [row["email"] for row in response.data["results"]] == ["alexander@example.com"]
+
+    def test_truncated_prefix_is_not_reused(self, api_client, user, settings):
+        settings.USER_SEARCH_MAX_RESULTS = 2
+        api_client.force_authenticate(user=user)
+        for name in ["aleftina", "alena", "alesya", "alexander"]:
+            # имена заданы явно: случайные от Faker могут совпасть с запросом
+            UserFactory.create(email=f"{name}@example.com", first_name="Мария", last_name="Иванова")
+        api_client.get(reverse("api:users:user-search"), {"search": "ale"})
+
+        response = api_client.get(reverse("api:users:user-search"), {"search": "alex"})
+
+        assert [row["email"] for row in response.data["results"]] == ["alexander@example.com"]
+
+    def test_cached_results_exclude_each_requester(self, api_client):
+        first = UserFactory.create(email="shared-first@example.com")
+        second = UserFactory.create(email="shared-second@example.com")
+
+        api_client.force_authenticate(user=first)
+        first_response = api_client.get(reverse("api:users:user-search"), {"search": "shared"})
+        api_client.force_authenticate(user=second)
+        second_response = api_client.get(reverse("api:users:user-search"), {"search": "shared"})
+
+        assert [row["email"] for row in first_response.data["results"]] == [second.email]
+        assert [row["email"] for row in second_response.data["results"]] == [first.email]
+
+    def test_cache_can_be_disabled(self, api_client, user, settings):
+        settings.USER_SEARCH_CACHE_TIMEOUT = 0
+        api_client.force_authenticate(user=user)
+        api_client.get(reverse("api:users:user-search"), {"search": "late"})
+        UserFactory.create(email="late@example.com")
+
+        response = api_client.get(reverse("api:users:user-search"), {"search": "late"})
+
+        assert response.data["count"] == 1
+
+
+@pytest.mark.django_db
+class TestAsyncUserSearchView:
+    def get(self, view_class, user, params):
+        request = APIRequestFactory().get(
+            "/api/users/", params, HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        view = view_class.as_view()
+        if iscoroutinefunction(view):
+            return async_to_sync(view)(request)
+        return view(request).render()
+
+    @pytest.mark.parametrize("params", [{"search": "match"}, {"ordering": "-email"}, {"page": 2}])
+    def test_matches_sync(self, user, params):
+        UserFactory.create_batch(25, email=factory.Sequence(lambda n: f"match-{n}@example.com"))
+
+        expected = self.get(UserSearchView, user, params)
+        response = self.get(AsyncUserSearchView, user, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert json.loads(response.content) == json.loads(expected.content)
+
+    def test_shares_cache_with_sync_view(self, user):
+        UserFactory.create(email="cached@example.com")
+        self.get(UserSearchView, user, {"search": "cached"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(AsyncUserSearchView, user, {"search": "cached"})
+
+        # остается только чтение пользователя из токена
+        assert len([query for query in queries if "users_user" in query["sql"]]) == 1
+        assert [row["email"] for row in json.loads(response.content)["results"]] == ["cached@example.com"]
@@ -0,0 +1,156 @@
+import datetime
+import decimal
+import io
+import uuid
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from task_api.tasks.api.serializers import TaskSerializer
+from task_api.tasks.models import Task
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.utils.parsers import ORJSONParser
+from task_api.utils.renderers import ORJSONRenderer
+
+MOSCOW = ZoneInfo("Europe/Moscow")
+
+
+def render_both(data, accepted_media_type=None, renderer_context=None):
+    expected = JSONRenderer().render(data, accepted_media_type, renderer_context)
+    actual = ORJSONRenderer().render(data, accepted_media_type, renderer_context)
+    return actual, expected
+
+
+class TestORJSONRenderer:
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"status": "Новая", "priority": "Высокий", "title": 'Задача «срочно» — "кавычки" \\ слэш'},
+            [1, 2.5, True, False, None, "", [], {}],
+            {1: "число", "вложенный": {"список": [{"a": 1}]}},
+            {"null": None, "unicode": "😀 emoji \t\n\r\x00"},
+            {"separators": "строка\u2028абзац\u2029конец"},
+            ReturnDict({"id": 1, "title": "Задача"}, serializer=None),
+            ReturnList([{"id": 1}, {"id": 2}], serializer=None),
+            {"lazy": gettext_lazy("Новая")},
+            {"decimal": decimal.Decimal("1.50"), "uuid": uuid.UUID(int=1)},
+            {"tuple": (1, 2), "set": {1}},
+            {"big": 2**70},
+        ],
+    )
+    def test_matches_drf_renderer(self, data):
+        actual, expected = render_both(data)
+
+        assert actual == expected
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.UTC),
+            datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.UTC),
+            datetime.datetime(2024, 5, 1, 12, 30, tzinfo=MOSCOW),
+            datetime.datetime(2024, 5, 1, 12, 30),
+            datetime.date(2024, 5, 1),
+            datetime.time(12, 30, 15, 500),
+            datetime.timedelta(hours=1, seconds=1),
+        ],
+    )
+    def test_datetimes_keep_drf_format(self, value):
+        actual, expected = render_both({"value": value})
+
+        assert actual == expected
+
+    def test_none_renders_empty_body(self):
+        assert ORJSONRenderer().render(None) == b""
+
+    def test_indent_uses_drf_renderer(self):
+        data = {"title": "Задача", "tags": [1, 2]}
+
+        actual, expected = render_both(data, "application/json; indent=4")
+
+        assert actual == expected
+        assert b"\n    " in actual
+
+    @pytest.mark.django_db
+    def test_task_serializer_output(self, user):
+        tasks = [TaskFactory.create(owner=user, deadline=None), *TaskFactory.create_batch(5, owner=user)]
+        TaskShareFactory.create_batch(2, task=tasks[1])
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=user)
+        data = TaskSerializer(Task.objects.order_by("pk"), many=True, context={"request": request}).data
+
+        actual, expected = render_both(data)
+
+        assert actual == expected
+
+
+class TestORJSONParser:
+    def parse(self, body, encoding="utf-8"):
+        return ORJSONParser().parse(io.BytesIO(body), parser_context={"encoding": encoding})
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            '{"title": "Задача", "priority": "high", "items": [1, 2.5, null, true]}',
+            '[{"id": 1}, {"id": 2}]',
+            '"строка"',
+        ],
+    )
+    def test_matches_drf_parser(self, body):
+        expected = JSONParser().parse(io.BytesIO(body.encode()), parser_context={"encoding": "utf-8"})
+
+        assert self.parse(body.encode()) == expected
+
+    @pytest.mark.parametrize("body", [b"", b"{", b'{"a": NaN}', b"\xff"])
+    def test_invalid_json(self, body):
+        with pytest.raises(ParseError, match="JSON parse error"):
+            self.parse(body)
+
+    def test_other_encodings_use_drf_parser(self):
+        body = '{"title": "Задача"}'.encode("cp1251")
+
+        assert self.parse(body, encoding="cp1251") == {"title": "Задача"}
+
+
+@pytest.mark.django_db
+class TestJSONSettings:
+    def test_api_uses_orjson(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = api_client.post(
+            reverse("api:tasks:task-list"),
+            '{"title": "Задача", "priority": "high"}',
+            content_type="application/json",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert isinstance(response.accepted_renderer, ORJSONRenderer)
+        assert response.json()["title"] == "Задача"
+
+    def test_malformed_body(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+        response = api_client.post(reverse("api:tasks:task-list"), "{", content_type="application/json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"].startswith("JSON parse error")
+
+
+@pytest.mark.django_db
+def test_benchmark_command():
+    out, err = io.StringIO(), io.StringIO()
+
+    call_command("benchmark_json_rendering", "--rows", "3", "--repeat", "1", stdout=out, stderr=err)
+
+    assert len(out.getvalue().splitlines()) == 3
+    assert err.getvalue() == ""
+    assert not Task.objects.exists()
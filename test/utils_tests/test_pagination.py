@@ -0,0 +1,214 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from task_api.tasks.models import Task
+from task_api.tasks.tests.factories import TaskFactory, TaskShareFactory
+from task_api.users.models import User
+from task_api.users.tests.factories import UserFactory
+from task_api.utils.pagination import CountingPageNumberPagination, EstimatedCountPaginator
+
+TASKS_URL = reverse("api:tasks:task-list")
+USERS_URL = reverse("api:users:user-search")
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(CountingPageNumberPagination, "page_size", 2)
+
+
+def count_queries(queries):
+    # COUNT(*) пагинации; ETag списка считает строки доступа отдельным агрегатом
+    return [query["sql"] for query in queries.captured_queries if query["sql"].startswith("SELECT COUNT(*)")]
+
+
+@pytest.mark.django_db
+class TestCountStrategies:
+    @pytest.fixture(autouse=True)
+    def authenticate(self, api_client, user):
+        api_client.force_authenticate(user=user)
+
+    def test_exact(self, api_client, user):
+        TaskFactory.create_batch(3, owner=user)
+        TaskShareFactory.create(user=user)
+
+        response = api_client.get(TASKS_URL)
+
+        assert response.data["count"] == 4
+        assert response.data["count_accuracy"] == "exact"
+
+    def test_shares_list(self, api_client, user):
+        task = TaskFactory.create(owner=user)
+        shares = TaskShareFactory.create_batch(3, task=task)
+        url = reverse("api:tasks:task-shares", kwargs={"pk": task.pk})
+
+        response = api_client.get(url)
+        last = api_client.get(url, {"page": 2})
+
+        assert (response.data["count"], response.data["count_accuracy"]) == (3, "exact")
+        assert response.data["next"] is not None
+        # страницы идут в порядке выдачи доступа, без пропусков и повторов
+        emails = [row["user_email"] for row in response.data["results"] + last.data["results"]]
+        assert emails == [share.user.email for share in shares]
+
+    @pytest.mark.parametrize("url", [TASKS_URL, USERS_URL])
+    def test_count_can_be_skipped(self, api_client, user, url):
+        TaskFactory.create_batch(5, owner=user)
+        UserFactory.create_batch(5)
+
+        response = api_client.get(url, {"count": "false"})
+        second = api_client.get(response.data["next"])
+        last = api_client.get(url, {"count": "false", "page": 3})
+
+        assert (response.data["count"], response.data["count_accuracy"]) == (None, None)
+        assert response.data["previous"] is None
+        assert len(second.data["results"]) == 2
+        assert second.data["previous"] is not None
+        assert len(last.data["results"]) == 1
+        assert last.data["next"] is None
+
+    def test_skipped_count_runs_no_count_query(self, api_client, user, django_assert_max_num_queries):
+        TaskFactory.create_batch(3, owner=user)
+
+        with django_assert_max_num_queries(10) as queries:
+            api_client.get(TASKS_URL, {"count": "false"})
+
+        assert count_queries(queries) == []
+
+    def test_skipped_count_page_out_of_range(self, api_client, user):
+        TaskFactory.create_batch(3, owner=user)
+
+        response = api_client.get(TASKS_URL, {"count": "false", "page": 5})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_last_page_is_counted(self, api_client, user):
+        TaskFactory.create_batch(5, owner=user)
+
+        response = api_client.get(TASKS_URL, {"count": "false", "page": "last"})
+
+        assert len(response.data["results"]) == 1
+        assert response.data["count"] == 5
+
+    def test_capped(self, api_client, settings):
+        settings.PAGINATION_COUNT_CAP = 5
+        UserFactory.create_batch(8)
+
+        first = api_client.get(USERS_URL)
+        last = api_client.get(USERS_URL, {"page": 4})
+
+        assert (first.data["count"], first.data["count_accuracy"]) == (5, "at_least")
+        assert first.data["next"] is not None
+        # страница за пределом считается до своего конца
+        assert (last.data["count"], last.data["count_accuracy"]) == (8, "exact")
+        assert last.data["next"] is None
+
+    def test_capped_below_cap_is_exact(self, api_client):
+        UserFactory.create_batch(3)
+
+        response = api_client.get(USERS_URL)
+
+        assert (response.data["count"], response.data["count_accuracy"]) == (3, "exact")
+
+    def test_estimated_falls_back_to_exact(self, api_client, user, settings):
+        settings.PAGINATION_ESTIMATE_THRESHOLD = 10**9
+        user.is_staff = True
+        user.save()
+        UserFactory.create_batch(3)
+
+        response = api_client.get(USERS_URL)
+
+        assert (response.data["count"], response.data["count_accuracy"]) == (3, "exact")
+
+    @pytest.mark.skipif(connection.vendor != "postgresql", reason="EXPLAIN с оценкой строк только в PostgreSQL")
+    def test_estimated_for_staff(self, api_client, user, settings):
+        settings.PAGINATION_ESTIMATE_THRESHOLD = 0
+        user.is_staff = True
+        user.save()
+        UserFactory.create_batch(3)
+
+        response = api_client.get(USERS_URL)
+
+        assert response.data["count_accuracy"] == "estimated"
+        assert response.data["count"] >= 0
+
+
+# поколения списков задач сбрасываются в on_commit, поэтому нужны настоящие фиксации транзакций
+@pytest.mark.django_db(transaction=True)
+class TestCachedCount:
+    @pytest.fixture(autouse=True)
+    def count_cache(self, settings, api_client, user):
+        settings.PAGINATION_COUNT_CACHE_TIMEOUT = 300
+        api_client.force_authenticate(user=user)
+
+    def test_count_is_cached_per_filters(self, api_client, user, django_assert_max_num_queries):
+        TaskFactory.create_batch(3, owner=user, status=Task.Status.NEW)
+        TaskFactory.create(owner=user, status=Task.Status.DONE)
+        api_client.get(TASKS_URL)
+
+        with django_assert_max_num_queries(10) as queries:
+            response = api_client.get(TASKS_URL, {"page": 2})
+        assert count_queries(queries) == []
+        assert response.data["count"] == 4
+
+        with django_assert_max_num_queries(10) as queries:
+            response = api_client.get(TASKS_URL, {"status": "new"})
+        assert len(count_queries(queries)) == 1
+        assert response.data["count"] == 3
+
+    def test_writes_invalidate(self, api_client, user):
+        task = TaskFactory.create(owner=user)
+        assert api_client.get(TASKS_URL).data["count"] == 1
+
+        api_client.post(TASKS_URL, {"title": "Новая"})
+        assert api_client.get(TASKS_URL).data["count"] == 2
+
+        TaskShareFactory.create(user=user)
+        assert api_client.get(TASKS_URL).data["count"] == 3
+
+        api_client.delete(reverse("api:tasks:task-detail", kwargs={"pk": task.pk}))
+        assert api_client.get(TASKS_URL).data["count"] == 2
+
+    def test_overdue_count_follows_clock(self, api_client, user, monkeypatch):
+        now = timezone.now()
+        TaskFactory.create(owner=user, status=Task.Status.NEW, deadline=now + timedelta(minutes=1))
+        assert api_client.get(TASKS_URL, {"is_overdue": "true"}).data["count"] == 0
+
+        monkeypatch.setattr(timezone, "now", lambda: now + timedelta(minutes=2))
+
+        assert api_client.get(TASKS_URL, {"is_overdue": "true"}).data["count"] == 1
+        assert api_client.get(TASKS_URL, {"is_overdue": "false"}).data["count"] == 0
+
+    def test_counts_are_per_user(self, api_client, user):
+        TaskFactory.create(owner=user)
+        other = UserFactory()
+        TaskFactory.create_batch(2, owner=other)
+        api_client.get(TASKS_URL)
+
+        api_client.force_authenticate(user=other)
+
+        assert api_client.get(TASKS_URL).data["count"] == 2
+
+
+@pytest.mark.django_db
+def test_admin_paginator_counts_small_tables_exactly():
+    UserFactory.create_batch(3)
+
+    paginator = EstimatedCountPaginator(User.objects.order_by("pk"), 2)
+
+    assert paginator.count == 3
+    assert paginator.num_pages == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [reverse("admin:tasks_task_changelist"), reverse("admin:users_user_changelist")])
+def test_admin_changelists(admin_client, url):
+    TaskFactory.create_batch(3)
+
+    response = admin_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK